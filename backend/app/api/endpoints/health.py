@@ -1,9 +1,19 @@
 """Health endpoint."""
+from typing import Any, Dict
+
 from fastapi import APIRouter
 
+from app.core import metrics
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 async def health() -> dict[str, str]:
-    return {"status": "ok"}
+    return {"status": "ok"}
+
+
+@router.get("/health/metrics")
+async def health_metrics() -> Dict[str, Dict[str, Any]]:
+    """Report runtime counters of caches, queues and upstream clients."""
+    return metrics.snapshot()
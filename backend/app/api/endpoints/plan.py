@@ -1,13 +1,47 @@
 """Plan endpoints."""
-from fastapi import APIRouter
+import json
 
-from app.schemas.plan import PlanRequest, PlanResponse
-from app.services.plan_service import generate_plan
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
+
+from app.schemas.plan import (
+    PlanBatchRequest,
+    PlanBatchResponse,
+    PlanProjectionRequest,
+    PlanProjectionResponse,
+    PlanRequest,
+    PlanResponse,
+)
+from app.services.plan_service import generate_plan_batch, parse_plan_batch, plan_response_bytes
+from app.services.projection_service import project_plans
 
 router = APIRouter(prefix="/plan", tags=["plan"])
 
 
 @router.post("/", response_model=PlanResponse)
-async def create_plan(request: PlanRequest) -> PlanResponse:
+async def create_plan(request: PlanRequest) -> Response:
     """Generate tailored plans."""
-    return generate_plan(request)
+    return Response(content=plan_response_bytes(request), media_type="application/json")
+
+
+@router.post(
+    "/batch",
+    response_model=PlanBatchResponse,
+    openapi_extra={
+        "requestBody": {"required": True, "content": {"application/json": {"schema": PlanBatchRequest.schema()}}}
+    },
+)
+async def create_plan_batch(request: Request) -> Response:
+    """Score many profiles at once; the body is validated column-wise rather than per item."""
+    try:
+        risk_scores, horizons = parse_plan_batch(json.loads(await request.body()))
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error)) from error
+    body = json.dumps(generate_plan_batch(risk_scores, horizons), separators=(",", ":"))
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/projection", response_model=PlanProjectionResponse)
+async def create_projection(request: PlanProjectionRequest) -> PlanProjectionResponse:
+    """Simulate terminal value percentiles for each plan over the requested horizon."""
+    return await project_plans(request)
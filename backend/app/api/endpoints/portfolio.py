@@ -1,14 +1,105 @@
 """Portfolio endpoints."""
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from datetime import datetime
+from typing import Literal
 
-from app.core.db import get_session
-from app.schemas.portfolio import PortfolioSchema
-from app.services.portfolio_service import build_portfolio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import engine, get_async_session
+from app.core.serialization import fast_response, fast_serialization_enabled
+from app.schemas.portfolio import ActivityPage, PortfolioSchema
+from app.services.portfolio_service import (
+    history_page_async,
+    history_payload_async,
+    portfolio_snapshot,
+    stream_history_export,
+)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
 
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
 
 
 @router.get("/{user_address}", response_model=PortfolioSchema)
-async def get_portfolio(user_address: str, session: Session = Depends(get_session)) -> PortfolioSchema:
-    return build_portfolio(session, address=user_address.lower())
+async def get_portfolio(
+    user_address: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Return the dashboard portfolio, or 304 when ``If-None-Match`` still matches its ETag.
+
+    The ETag covers the latest logged activity, the indexed block and the block
+    of the cached vault state, so revalidation never touches the chain.
+    Responses may come from a recent snapshot; the ``Age`` header says how old.
+    """
+    fast = fast_serialization_enabled()
+    snapshot = await portfolio_snapshot(session, user_address.lower(), fast, if_none_match)
+    if isinstance(snapshot, str):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": snapshot})
+    headers = {"ETag": snapshot.etag, "Age": str(int(snapshot.age))}
+    if fast:
+        return fast_response(snapshot.body, headers=headers)
+    response.headers.update(headers)
+    return snapshot.body
+
+
+@router.get("/{user_address}/history", response_model=ActivityPage)
+async def get_history(
+    user_address: str,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    tx_type: str | None = Query(default=None),
+    vault: str | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Page through activity newest first; pass ``next_cursor`` back as ``cursor``."""
+    fast = fast_serialization_enabled()
+    try:
+        page = await (history_payload_async if fast else history_page_async)(
+            session,
+            user_address.lower(),
+            limit=limit,
+            cursor=cursor,
+            tx_type=tx_type,
+            vault=vault,
+            since=since,
+            until=until,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)) from error
+    return fast_response(page) if fast else page
+
+
+@router.get("/{user_address}/history/export", response_class=StreamingResponse)
+async def export_history(
+    user_address: str,
+    format: Literal["ndjson", "csv"] = Query(default="ndjson"),
+    gzip: bool = Query(default=False, description="Gzip the stream (sent with Content-Encoding: gzip)."),
+    tx_type: str | None = Query(default=None),
+    vault: str | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+) -> StreamingResponse:
+    """Stream the complete activity history, newest first, in constant memory."""
+    address = user_address.lower()
+    headers = {"Content-Disposition": f'attachment; filename="{address}-history.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_history_export(
+            engine,
+            address,
+            fmt=format,
+            compress=gzip,
+            tx_type=tx_type,
+            vault=vault,
+            since=since,
+            until=until,
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
@@ -1,25 +1,50 @@
 """Risk preference endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import get_session
+from app.core.db import get_async_session
+from app.core.serialization import fast_response, fast_serialization_enabled
+from app.models.preferences import RiskPreference
 from app.schemas.preferences import RiskPreferencePayload, RiskPreferenceResponse
-from app.services.preferences_service import get_preference, upsert_preference
+from app.services.preferences_service import get_preference_async, preference_payload, upsert_preference_async
+from app.utils.helpers import etag_matches, strong_etag
 
 router = APIRouter(prefix="/preferences", tags=["preferences"])
 
 
+def _etag(record: RiskPreference) -> str:
+    return strong_etag("preference", record.address, record.updated_at.isoformat())
+
+
+def _respond(record: RiskPreference, response: Response, etag: str):
+    if fast_serialization_enabled():
+        return fast_response(preference_payload(record), headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return RiskPreferenceResponse.from_orm(record)
+
+
 @router.get("/{address}", response_model=RiskPreferenceResponse)
-async def read_preference(address: str, session: Session = Depends(get_session)) -> RiskPreferenceResponse:
-    record = get_preference(session, address.lower())
+async def read_preference(
+    address: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    record = await get_preference_async(session, address.lower())
     if record is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Preference not found")
-    return RiskPreferenceResponse.from_orm(record)
+    etag = _etag(record)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return _respond(record, response, etag)
 
 
 @router.put("/{address}", response_model=RiskPreferenceResponse)
 async def update_preference(
-    address: str, payload: RiskPreferencePayload, session: Session = Depends(get_session)
-) -> RiskPreferenceResponse:
-    record = upsert_preference(session, address.lower(), payload)
-    return RiskPreferenceResponse.from_orm(record)
+    address: str,
+    payload: RiskPreferencePayload,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+):
+    record = await upsert_preference_async(session, address.lower(), payload)
+    return _respond(record, response, _etag(record))
@@ -0,0 +1,93 @@
+"""Push channels for portfolio updates (Server-Sent Events and WebSocket)."""
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import suppress
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import async_engine, get_async_session
+from app.services.portfolio_service import portfolio_snapshot
+from app.services.push_service import PushMessage, Subscription, TooManySubscribers, encode, push_hub
+
+router = APIRouter(prefix="/portfolio", tags=["portfolio"])
+
+
+async def _initial(session: AsyncSession, address: str) -> PushMessage:
+    snapshot = await portfolio_snapshot(session, address, fast=True)
+    return encode("portfolio", snapshot.body)
+
+
+async def _sse(subscription: Subscription, initial: PushMessage) -> AsyncIterator[str]:
+    keepalive = get_settings().push_keepalive_seconds
+    try:
+        yield initial.sse
+        while True:
+            try:
+                message = await subscription.next(keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            yield message.sse
+    finally:
+        push_hub.unsubscribe(subscription)
+
+
+@router.get("/{user_address}/events", response_class=StreamingResponse)
+async def portfolio_events(user_address: str, session: AsyncSession = Depends(get_async_session)) -> StreamingResponse:
+    """Stream the portfolio, then ``activity`` and ``positions`` deltas, as Server-Sent Events."""
+    address = user_address.lower()
+    try:
+        subscription = push_hub.subscribe(address)
+    except TooManySubscribers as error:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(error)) from error
+    try:
+        initial = await _initial(session, address)
+    except BaseException:
+        push_hub.unsubscribe(subscription)
+        raise
+    return StreamingResponse(
+        _sse(subscription, initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _forward(websocket: WebSocket, subscription: Subscription) -> None:
+    while (message := await subscription.next()) is not None:
+        await websocket.send_text(message.websocket)
+    await websocket.close()
+
+
+@router.websocket("/{user_address}/ws")
+async def portfolio_socket(websocket: WebSocket, user_address: str) -> None:
+    """Same events as ``/events``, as ``{"event": ..., "data": ...}`` text frames."""
+    address = user_address.lower()
+    try:
+        subscription = push_hub.subscribe(address)
+    except TooManySubscribers:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    try:
+        await websocket.accept()
+        # A short session of its own; a dependency-scoped one would stay open for the socket's lifetime.
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            initial = await _initial(session, address)
+        await websocket.send_text(initial.websocket)
+        forward = asyncio.create_task(_forward(websocket, subscription))
+        try:
+            # Incoming text and binary frames are ignored; receiving is how a disconnect is noticed.
+            while not forward.done():
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+        finally:
+            forward.cancel()
+            with suppress(asyncio.CancelledError, WebSocketDisconnect, RuntimeError):
+                await forward
+    finally:
+        push_hub.unsubscribe(subscription)
@@ -1,33 +1,62 @@
 """Transaction endpoints."""
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import get_session
-from app.schemas.tx import TransactionCreate
+from app.core.db import get_async_session
+from app.schemas.tx import TransactionBatch, TransactionBatchResult, TransactionBatchStatus, TransactionCreate
 from app.services import tx_service
+from app.services.write_behind_service import WriteBehindFull
 
 router = APIRouter(prefix="/tx", tags=["transactions"])
 
 
-@router.post("/deposit")
-async def deposit(payload: TransactionCreate, session: Session = Depends(get_session)) -> dict[str, str]:
-    tx_service.record_deposit(
-        session,
-        address=payload.address.lower(),
-        amount=float(payload.amount),
-        vault=payload.vault,
-        tx_hash=payload.tx_hash,
+def _overloaded(error: WriteBehindFull) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(error), headers={"Retry-After": "1"}
     )
-    return {"status": "logged", "type": "deposit", "tx_hash": payload.tx_hash or ""}
+
+
+@router.post("/deposit")
+async def deposit(payload: TransactionCreate, session: AsyncSession = Depends(get_async_session)) -> dict[str, str]:
+    try:
+        result = await tx_service.record_deposit_async(
+            session,
+            address=payload.address.lower(),
+            amount=float(payload.amount),
+            vault=payload.vault,
+            tx_hash=payload.tx_hash,
+        )
+    except WriteBehindFull as error:
+        raise _overloaded(error) from error
+    return {"status": result, "type": "deposit", "tx_hash": payload.tx_hash or ""}
 
 
 @router.post("/withdraw")
-async def withdraw(payload: TransactionCreate, session: Session = Depends(get_session)) -> dict[str, str]:
-    tx_service.record_withdrawal(
-        session,
-        address=payload.address.lower(),
-        amount=float(payload.amount),
-        vault=payload.vault,
-        tx_hash=payload.tx_hash,
+async def withdraw(payload: TransactionCreate, session: AsyncSession = Depends(get_async_session)) -> dict[str, str]:
+    try:
+        result = await tx_service.record_withdrawal_async(
+            session,
+            address=payload.address.lower(),
+            amount=float(payload.amount),
+            vault=payload.vault,
+            tx_hash=payload.tx_hash,
+        )
+    except WriteBehindFull as error:
+        raise _overloaded(error) from error
+    return {"status": result, "type": "withdraw", "tx_hash": payload.tx_hash or ""}
+
+
+@router.post("/batch", response_model=TransactionBatchResult)
+async def batch(
+    payload: TransactionBatch, session: AsyncSession = Depends(get_async_session)
+) -> TransactionBatchResult:
+    """Log many deposits/withdrawals in one transaction; items repeated within the batch come back as duplicates."""
+    statuses = await tx_service.record_batch_async(session, payload.items)
+    return TransactionBatchResult(
+        logged=statuses.count("logged"),
+        duplicates=statuses.count("duplicate"),
+        items=[
+            TransactionBatchStatus(index=index, status=result, type=item.type, tx_hash=item.tx_hash or "")
+            for index, (item, result) in enumerate(zip(payload.items, statuses))
+        ],
     )
-    return {"status": "logged", "type": "withdraw", "tx_hash": payload.tx_hash or ""}
@@ -0,0 +1,15 @@
+"""Vault endpoints."""
+from fastapi import APIRouter, HTTPException, status
+
+from app.schemas.vault import VaultStatsSchema
+from app.services.vault_service import build_vault_stats
+
+router = APIRouter(prefix="/vault", tags=["vault"])
+
+
+@router.get("/stats", response_model=VaultStatsSchema)
+async def vault_stats() -> VaultStatsSchema:
+    stats = await build_vault_stats()
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Vault state unavailable")
+    return stats
@@ -0,0 +1,238 @@
+"""Admission control: per-client token buckets and a concurrency limit on RPC-bound routes.
+
+Requests over a client's rate get 429; requests that cannot get an RPC slot
+before their queue deadline get 503. Both carry ``Retry-After``. SSE and
+WebSocket streams hold an RPC slot only until their first message is sent,
+i.e. while the initial portfolio is built. WebSocket
+handshakes spend the same per-client and per-address tokens and are closed
+with 1013 (try again later) when over the rate.
+
+Clients are told apart by ``scope["client"]``, which behind a reverse proxy
+is the proxy itself unless uvicorn runs with ``--proxy-headers`` and
+``--forwarded-allow-ips`` naming the proxy. Alternatively
+``ADMISSION_CLIENT_HEADER`` names a header set by a trusted proxy; its last
+comma-separated value is used, since that is the one the proxy appended.
+Only set it when every request passes through that proxy: clients can send
+the header themselves. Limiter state
+is only touched from the event loop, so it needs no locks; bucket maps are
+sharded so keeping them bounded never scans more than one small dict.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import Settings
+
+# Routes whose handlers may wait on the RPC provider.
+RPC_ROUTES = re.compile(r"^/(?:portfolio/[^/]+/?|vault/stats/?)$")
+# Push channels build the initial portfolio over RPC, then stay open without it.
+STREAM_ROUTES = re.compile(r"^/portfolio/[^/]+/(?:events|ws)/?$")
+# The first message a stream sends once its initial portfolio is built.
+STREAM_STARTED = ("http.response.start", "websocket.send", "websocket.close")
+ADDRESS_ROUTES = re.compile(r"^/(?:portfolio|preferences)/([^/]+)")
+EXEMPT_PREFIXES = ("/health", "/docs", "/redoc", "/openapi.json")
+BUCKET_SHARDS = 16
+WS_TRY_AGAIN_LATER = 1013
+
+
+class TokenBuckets:
+    """Token bucket per key: ``rate`` tokens per second up to ``burst``, least recently used keys evicted."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int, shards: int = BUCKET_SHARDS) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._shards: List[Dict[str, Tuple[float, float]]] = [{} for _ in range(shards)]
+        self._per_shard = max(max_keys // shards, 1)
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Spend one token for ``key``; returns 0 when admitted, else seconds until a token is available."""
+        now = time.monotonic() if now is None else now
+        shard = self._shards[hash(key) % len(self._shards)]
+        # Popping and re-inserting keeps each shard in least recently used order.
+        state = shard.pop(key, None)
+        tokens = self.burst if state is None else min(self.burst, state[0] + (now - state[1]) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        shard[key] = (tokens, now)
+        if len(shard) > self._per_shard:
+            del shard[next(iter(shard))]
+        return wait
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` concurrent holders; others queue FIFO until a slot frees or ``queue_timeout`` passes."""
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._queue_full = 0
+        self._timed_out = 0
+
+    async def acquire(self) -> bool:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self._queue_full += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except BaseException as error:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the deadline hit; pass it on.
+                self.release()
+            else:
+                self._forget(waiter)
+            if isinstance(error, asyncio.TimeoutError):
+                self._timed_out += 1
+                return False
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes straight to the next waiter, so ``_active`` is unchanged.
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "queued": len(self._waiters),
+            "shed_queue_full": self._queue_full,
+            "shed_timeout": self._timed_out,
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the limits above to HTTP requests and WebSocket handshakes."""
+
+    def __init__(self, app, settings: Settings) -> None:
+        self.app = app
+        header = settings.admission_client_header
+        self._client_header = header.lower().encode("latin-1") if header else None
+        self.ip_buckets = TokenBuckets(
+            settings.admission_ip_rate, settings.admission_ip_burst, settings.admission_max_keys
+        )
+        self.address_buckets = TokenBuckets(
+            settings.admission_address_rate, settings.admission_address_burst, settings.admission_max_keys
+        )
+        self.rpc_limiter = ConcurrencyLimiter(
+            settings.admission_rpc_concurrency, settings.admission_rpc_queue, settings.admission_queue_timeout
+        )
+        self._admitted = 0
+        self._limited_ip = 0
+        self._limited_address = 0
+        metrics.register("admission", self.snapshot)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] not in ("http", "websocket") or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        wait = self.ip_buckets.take(self._client(scope))
+        if wait:
+            self._limited_ip += 1
+            await _reject(scope, receive, send, 429, "Too many requests from this client", wait)
+            return
+        match = ADDRESS_ROUTES.match(path)
+        if match is not None:
+            wait = self.address_buckets.take(match.group(1).lower())
+            if wait:
+                self._limited_address += 1
+                await _reject(scope, receive, send, 429, "Too many requests for this address", wait)
+                return
+        stream = STREAM_ROUTES.match(path) is not None
+        if not stream and (scope["type"] == "websocket" or not RPC_ROUTES.match(path)):
+            self._admitted += 1
+            await self.app(scope, receive, send)
+            return
+        if not await self.rpc_limiter.acquire():
+            await _reject(scope, receive, send, 503, "Server is busy", self.rpc_limiter.queue_timeout)
+            return
+        self._admitted += 1
+        held = True
+
+        def release() -> None:
+            nonlocal held
+            if held:
+                held = False
+                self.rpc_limiter.release()
+
+        async def send_started(message) -> None:
+            if message["type"] in STREAM_STARTED:
+                release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_started if stream else send)
+        finally:
+            release()
+
+    def _client(self, scope) -> str:
+        if self._client_header is not None:
+            for name, value in scope["headers"]:
+                if name == self._client_header:
+                    return value.decode("latin-1").rsplit(",", 1)[-1].strip()
+        client = scope.get("client")
+        return client[0] if client else ""
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "admitted": self._admitted,
+            "rate_limited_ip": self._limited_ip,
+            "rate_limited_address": self._limited_address,
+            "tracked_clients": len(self.ip_buckets),
+            "tracked_addresses": len(self.address_buckets),
+            "rpc": self.rpc_limiter.snapshot(),
+        }
+
+
+async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: float) -> None:
+    if scope["type"] == "websocket":
+        # The handshake has to be received before it can be refused.
+        await receive()
+        await send({"type": "websocket.close", "code": WS_TRY_AGAIN_LATER, "reason": detail})
+        return
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
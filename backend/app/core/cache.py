@@ -0,0 +1,199 @@
+"""In-process LRU+TTL cache with optional cross-worker invalidation over Redis pub/sub."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from contextlib import suppress
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+from app.core.logger import logger
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is an optional dependency
+    aioredis = None
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+RECONNECT_MIN_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30.0
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING: Any = _Missing()
+
+
+class LRUTTLCache(Generic[K, V]):
+    """Bounded mapping whose entries expire ``ttl`` seconds after being stored.
+
+    ``version()`` is bumped by every invalidation; a reader that loaded a value
+    after a miss passes the version it saw to :meth:`store`, which then drops
+    the value if a write invalidated the cache in the meantime.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: K) -> V:
+        """Return the cached value, or :data:`MISSING`."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def store(self, key: K, value: V, version: Optional[int] = None) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, keys: Iterable[K]) -> None:
+        with self._lock:
+            self._version += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+                "evictions": self._evictions,
+            }
+
+
+class RedisInvalidator:
+    """Broadcasts invalidated keys to every worker subscribed to ``channel``.
+
+    A dropped subscription is re-established with exponential backoff. Since
+    invalidations sent while disconnected are lost, the local cache is cleared
+    on every reconnect.
+    """
+
+    def __init__(self, url: str, channel: str, cache: LRUTTLCache) -> None:
+        self._url = url
+        self._channel = channel
+        self._cache = cache
+        self._client = None
+        self._task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    async def start(self) -> None:
+        self._client = aioredis.from_url(self._url, decode_responses=True)
+        pubsub = await self._subscribe()
+        self._task = asyncio.create_task(self._run(pubsub))
+
+    async def _subscribe(self):
+        pubsub = self._client.pubsub()
+        try:
+            await pubsub.subscribe(self._channel)
+        except BaseException:
+            with suppress(Exception):
+                await pubsub.close()
+            raise
+        return pubsub
+
+    async def _run(self, pubsub) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                await self._listen(pubsub)
+                logger.warning("Cache invalidation channel %s closed; reconnecting", self._channel)
+            except Exception:
+                logger.warning("Cache invalidation channel %s failed; reconnecting", self._channel, exc_info=True)
+            finally:
+                with suppress(Exception):
+                    await pubsub.close()
+            while True:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                try:
+                    pubsub = await self._subscribe()
+                    break
+                except Exception as error:
+                    logger.warning("Resubscribing to %s failed, retrying in %.1fs: %s", self._channel, delay, error)
+            self.reconnects += 1
+            self._cache.clear()
+            logger.info("Resubscribed to cache invalidation channel %s", self._channel)
+            delay = RECONNECT_MIN_SECONDS
+
+    async def _listen(self, pubsub) -> None:
+        async for message in pubsub.listen():
+            if message.get("type") == "message":
+                self._cache.invalidate([message["data"]])
+
+    async def publish(self, keys: Iterable[str]) -> None:
+        if self._client is None:
+            return
+        try:
+            for key in keys:
+                await self._client.publish(self._channel, key)
+        except Exception:
+            # Peers fall back to the TTL; the write itself already succeeded.
+            logger.warning("Failed to publish cache invalidation on %s", self._channel, exc_info=True)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+async def start_invalidator(url: Optional[str], channel: str, cache: LRUTTLCache) -> Optional[RedisInvalidator]:
+    """Subscribe ``cache`` to ``channel`` when a Redis URL is configured and redis is installed."""
+    if not url:
+        return None
+    if aioredis is None:
+        logger.warning("Cache invalidation URL set but the redis package is not installed")
+        return None
+    invalidator = RedisInvalidator(url, channel, cache)
+    try:
+        await invalidator.start()
+    except Exception:
+        logger.warning("Unable to subscribe to cache invalidation channel %s", channel, exc_info=True)
+        await invalidator.stop()
+        return None
+    return invalidator
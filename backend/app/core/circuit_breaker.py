@@ -0,0 +1,140 @@
+"""Circuit breaker used to fail fast while an upstream dependency is down."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Dict, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the dependency while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Classic closed/open/half-open breaker.
+
+    ``failure_threshold`` consecutive failures open the circuit; after
+    ``reset_timeout`` seconds up to ``half_open_max_calls`` probes are let
+    through and the first outcome decides whether it closes or re-opens.
+    Exceptions listed in ``ignored`` mean the dependency answered and count
+    as successes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 15.0,
+        half_open_max_calls: int = 1,
+        ignored: Tuple[Type[BaseException], ...] = (),
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.ignored = ignored
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+    def _acquire(self) -> bool:
+        """Admit a call, returning whether it is a half-open probe."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return False
+            if self._state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+        retry_in = max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+        raise CircuitOpenError(f"{self.name} circuit open; retry in {retry_in:.1f}s")
+
+    def record_success(self, probe: bool = False) -> None:
+        with self._lock:
+            self._failures = 0
+            if probe or self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probes = 0
+
+    def record_failure(self, probe: bool = False) -> None:
+        with self._lock:
+            self._failures += 1
+            if probe or self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            with self._lock:
+                self._probes = max(self._probes - 1, 0)
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        probe = self._acquire()
+        try:
+            result = func(*args, **kwargs)
+        except self.ignored:
+            self.record_success(probe)
+            raise
+        except Exception:
+            self.record_failure(probe)
+            raise
+        except BaseException:
+            self._release(probe)
+            raise
+        self.record_success(probe)
+        return result
+
+    async def call_async(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        probe = self._acquire()
+        try:
+            result = await func(*args, **kwargs)
+        except self.ignored:
+            self.record_success(probe)
+            raise
+        except Exception:
+            self.record_failure(probe)
+            raise
+        except BaseException:
+            self._release(probe)
+            raise
+        self.record_success(probe)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "rejected": self._rejected,
+            }
@@ -1,18 +1,70 @@
 """Application configuration using Pydantic settings."""
 
 from functools import lru_cache
-from typing import List, Union
+from typing import Any, List, Optional, Union
 
 from pydantic import BaseSettings, Field, validator
 
+# Default preference cache TTL without cross-worker invalidation, bounding how stale other workers can be.
+LOCAL_CACHE_TTL_SECONDS = 5.0
+
 
 class Settings(BaseSettings):
     environment: str = Field(default="development")
     database_url: str = Field(default="sqlite:///./nexora.db", env="DATABASE_URL")
+    auto_migrate: bool = Field(default=True, env="AUTO_MIGRATE")
     rpc_url: str = Field(default="https://sepolia.infura.io/v3/<project-id>", env="RPC_URL")
+    rpc_urls: List[str] = Field(default_factory=list, env="RPC_URLS")
+    rpc_hedge_percentile: float = Field(default=0.95, gt=0, le=1, env="RPC_HEDGE_PERCENTILE")
+    rpc_hedge_min_delay: float = Field(default=0.05, ge=0, env="RPC_HEDGE_MIN_DELAY")
     risk_decay_factor: float = Field(default=0.15)
     allowed_origins: List[str] = Field(default_factory=lambda: ["http://localhost:3000"], env="ALLOWED_ORIGINS")
     vault_address: str = Field(default="0x0000000000000000000000000000000000000000", env="VAULT_ADDRESS")
+    multicall_address: str = Field(default="0xcA11bde05977b3631167028862bE2a173976CA11", env="MULTICALL_ADDRESS")
+    rpc_pool_size: int = Field(default=32, ge=1, env="RPC_POOL_SIZE")
+    rpc_breaker_threshold: int = Field(default=5, ge=1, env="RPC_BREAKER_THRESHOLD")
+    rpc_breaker_reset_seconds: float = Field(default=15.0, gt=0, env="RPC_BREAKER_RESET_SECONDS")
+    rpc_negative_cache_seconds: float = Field(default=10.0, ge=0, env="RPC_NEGATIVE_CACHE_SECONDS")
+    vault_state_max_age: float = Field(default=12.0, ge=0, env="VAULT_STATE_MAX_AGE")
+    portfolio_history_limit: int = Field(default=20, ge=1, env="PORTFOLIO_HISTORY_LIMIT")
+    vault_deploy_block: int = Field(default=0, ge=0, env="VAULT_DEPLOY_BLOCK")
+    indexer_enabled: bool = Field(default=False, env="INDEXER_ENABLED")
+    indexer_poll_interval: float = Field(default=4.0, gt=0, env="INDEXER_POLL_INTERVAL")
+    indexer_confirmations: int = Field(default=2, ge=0, env="INDEXER_CONFIRMATIONS")
+    indexer_batch_size: int = Field(default=2000, ge=1, env="INDEXER_BATCH_SIZE")
+    indexer_reorg_depth: int = Field(default=64, ge=1, env="INDEXER_REORG_DEPTH")
+    indexer_max_lag: int = Field(default=32, ge=0, env="INDEXER_MAX_LAG")
+    write_behind_enabled: bool = Field(default=False, env="WRITE_BEHIND_ENABLED")
+    write_behind_max_queue: int = Field(default=10_000, ge=1, env="WRITE_BEHIND_MAX_QUEUE")
+    write_behind_batch_size: int = Field(default=500, ge=1, env="WRITE_BEHIND_BATCH_SIZE")
+    write_behind_flush_interval: float = Field(default=0.05, gt=0, env="WRITE_BEHIND_FLUSH_INTERVAL")
+    write_behind_enqueue_timeout: float = Field(default=1.0, ge=0, env="WRITE_BEHIND_ENQUEUE_TIMEOUT")
+    write_behind_spill_path: str = Field(default="write_behind_spill.jsonl", env="WRITE_BEHIND_SPILL_PATH")
+    preference_cache_size: int = Field(default=10_000, ge=0, env="PREFERENCE_CACHE_SIZE")
+    preference_cache_ttl: Optional[float] = Field(default=None, ge=0, env="PREFERENCE_CACHE_TTL")
+    cache_invalidation_url: Optional[str] = Field(default=None, env="CACHE_INVALIDATION_URL")
+    projection_workers: int = Field(default=2, ge=1, env="PROJECTION_WORKERS")
+    projection_inline_steps: int = Field(default=250_000, ge=0, env="PROJECTION_INLINE_STEPS")
+    projection_cache_size: int = Field(default=2048, ge=0, env="PROJECTION_CACHE_SIZE")
+    portfolio_snapshot_size: int = Field(default=10_000, ge=0, env="PORTFOLIO_SNAPSHOT_SIZE")
+    portfolio_snapshot_fresh: float = Field(default=2.0, ge=0, env="PORTFOLIO_SNAPSHOT_FRESH")
+    portfolio_snapshot_stale: float = Field(default=30.0, ge=0, env="PORTFOLIO_SNAPSHOT_STALE")
+    push_queue_size: int = Field(default=32, ge=1, env="PUSH_QUEUE_SIZE")
+    push_max_subscribers: int = Field(default=10_000, ge=0, env="PUSH_MAX_SUBSCRIBERS")
+    push_keepalive_seconds: float = Field(default=15.0, gt=0, env="PUSH_KEEPALIVE_SECONDS")
+    vault_watch_interval: float = Field(default=4.0, gt=0, env="VAULT_WATCH_INTERVAL")
+    admission_enabled: bool = Field(default=True, env="ADMISSION_ENABLED")
+    admission_ip_rate: float = Field(default=100.0, gt=0, env="ADMISSION_IP_RATE")
+    admission_ip_burst: float = Field(default=200.0, ge=1, env="ADMISSION_IP_BURST")
+    admission_address_rate: float = Field(default=20.0, gt=0, env="ADMISSION_ADDRESS_RATE")
+    admission_address_burst: float = Field(default=40.0, ge=1, env="ADMISSION_ADDRESS_BURST")
+    admission_client_header: Optional[str] = Field(default=None, env="ADMISSION_CLIENT_HEADER")
+    admission_max_keys: int = Field(default=100_000, ge=1, env="ADMISSION_MAX_KEYS")
+    admission_rpc_concurrency: int = Field(default=256, ge=1, env="ADMISSION_RPC_CONCURRENCY")
+    admission_rpc_queue: int = Field(default=1024, ge=0, env="ADMISSION_RPC_QUEUE")
+    admission_queue_timeout: float = Field(default=2.0, gt=0, env="ADMISSION_QUEUE_TIMEOUT")
+    fast_serialization: bool = Field(default=False, env="FAST_SERIALIZATION")
+    rebalance_drift_threshold: float = Field(default=0.1, ge=0, le=1, env="REBALANCE_DRIFT_THRESHOLD")
 
     @validator("allowed_origins", pre=True)
     def _parse_allowed_origins(cls, value: Union[str, List[str], None]) -> List[str]:
@@ -22,6 +74,28 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in value.split(",") if origin.strip()]
         return value
 
+    @validator("rpc_urls", pre=True)
+    def _parse_rpc_urls(cls, value: Union[str, List[str], None]) -> List[str]:
+        if not value:
+            return []
+        if isinstance(value, str):
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
+    @property
+    def rpc_endpoints(self) -> List[str]:
+        """RPC endpoints to pool, falling back to the single ``rpc_url``."""
+        if self.rpc_urls:
+            return self.rpc_urls
+        return [self.rpc_url] if self.rpc_url else []
+
+    @property
+    def preference_cache_seconds(self) -> float:
+        """``PREFERENCE_CACHE_TTL``, by default long only when writes are broadcast to every worker over Redis."""
+        if self.preference_cache_ttl is not None:
+            return self.preference_cache_ttl
+        return 300.0 if self.cache_invalidation_url else LOCAL_CACHE_TTL_SECONDS
+
     @validator("vault_address", pre=True)
     def _normalise_vault_address(cls, value: str | None) -> str:
         if not value:
@@ -32,6 +106,13 @@ class Settings(BaseSettings):
         env_file = ("../.env", ".env")
         env_file_encoding = "utf-8"
 
+        @classmethod
+        def parse_env_var(cls, field_name: str, raw_value: str) -> Any:
+            # Comma-separated lists are split by the field validators instead of JSON-decoded.
+            if field_name in {"allowed_origins", "rpc_urls"}:
+                return raw_value
+            return cls.json_loads(raw_value)
+
 
 @lru_cache()
 def get_settings() -> Settings:
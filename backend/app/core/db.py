@@ -1,31 +1,44 @@
 """Database session management using SQLModel."""
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
-from sqlalchemy import text
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import get_settings
-from app.models import preferences  # noqa: F401
-from app.models import tx  # noqa: F401
+from app.core.migrations import migrate
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto the matching asyncio driver (aiosqlite/asyncpg)."""
+    url = make_url(database_url)
+    backend, _, driver = url.drivername.partition("+")
+    if driver in {"aiosqlite", "asyncpg"} or backend not in ASYNC_DRIVERS:
+        return database_url
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
 
 settings = get_settings()
 engine = create_engine(settings.database_url, echo=False)
+async_engine = create_async_engine(async_database_url(settings.database_url), echo=False)
 
 
 def init_db() -> None:
-    """Create database tables."""
-    SQLModel.metadata.create_all(engine)
-    with engine.begin() as connection:
-        columns = {
-            row[1]
-            for row in connection.execute(text("PRAGMA table_info(transactionlog);"))
-        }
-        if "tx_hash" not in columns:
-            connection.execute(text("ALTER TABLE transactionlog ADD COLUMN tx_hash VARCHAR(80)"))
+    """Apply pending schema migrations; kept as an alias of :func:`app.core.migrations.migrate`."""
+    migrate(engine)
 
 
 def get_session() -> Generator[Session, None, None]:
     """Yield a SQLModel session."""
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async SQLModel session so queries do not block the event loop."""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,15 @@
+"""Process-local registry of runtime metrics exposed by the health router."""
+
+from collections.abc import Callable
+from typing import Any, Dict
+
+_collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+    """Register ``collector`` to report the metrics of subsystem ``name``."""
+    _collectors[name] = collector
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: collector() for name, collector in _collectors.items()}
@@ -0,0 +1,202 @@
+"""Versioned schema migrations tracked in a ``schema_version`` table.
+
+Migrations run once, through ``python -m app.tools.migrate`` or the API
+lifespan, while holding a database lock so concurrent workers apply them at
+most once. Starting a worker against an up-to-date schema costs one indexed
+``max(version)`` lookup.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.logger import logger
+
+# Arbitrary key shared by every process taking the PostgreSQL advisory lock.
+ADVISORY_LOCK_KEY = 0x4E58_4D49
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# The schema created by migration 1, frozen here so that it never changes with
+# the models; later schema changes belong in migrations of their own.
+baseline = MetaData()
+Table(
+    "transactionlog",
+    baseline,
+    Column("id", Integer, primary_key=True),
+    Column("address", String, nullable=False, index=True),
+    Column("tx_type", String(32), nullable=False, index=True),
+    Column("amount", Float, nullable=False),
+    Column("vault", String, nullable=False),
+    Column("tx_hash", String(80), index=True),
+    Column("timestamp", DateTime, nullable=False),
+)
+Table(
+    "riskpreference",
+    baseline,
+    Column("id", Integer, primary_key=True),
+    Column("address", String(64), nullable=False, index=True, unique=True),
+    Column("risk_level", String(16), nullable=False),
+    Column("risk_score", Integer, nullable=False),
+    Column("horizon_months", Integer, nullable=False),
+    Column("stablecoin_preference", String(16), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+Table(
+    "sharebalance",
+    baseline,
+    Column("address", String(64), primary_key=True),
+    Column("shares", String(80), nullable=False),
+    Column("updated_block", Integer, nullable=False),
+)
+Table(
+    "sharemovement",
+    baseline,
+    Column("id", Integer, primary_key=True),
+    Column("block_number", Integer, nullable=False, index=True),
+    Column("log_index", Integer, nullable=False),
+    Column("tx_hash", String(80), nullable=False),
+    Column("address", String(64), nullable=False, index=True),
+    Column("delta", String(80), nullable=False),
+)
+Table(
+    "indexedblock",
+    baseline,
+    Column("number", Integer, primary_key=True),
+    Column("hash", String(80), nullable=False),
+)
+Table(
+    "indexercheckpoint",
+    baseline,
+    Column("name", String(32), primary_key=True),
+    Column("block_number", Integer, nullable=False),
+    Column("block_hash", String(80), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+rebalance_recommendations = Table(
+    "rebalancerecommendation",
+    MetaData(),
+    Column("address", String(64), primary_key=True),
+    Column("plan", String(32), nullable=False),
+    Column("drift", Float, nullable=False, index=True),
+    Column("strategy", String(64), nullable=False),
+    Column("strategy_delta", Float, nullable=False),
+    Column("total_value", Float, nullable=False),
+    Column("block_number", Integer),
+    Column("created_at", DateTime, nullable=False, index=True),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at startup when the database needs migrations that were not allowed to run."""
+
+
+def _create_tables(connection: Connection) -> None:
+    baseline.create_all(connection)
+
+
+def _add_tx_hash(connection: Connection) -> None:
+    # Databases created before transaction hashes were logged lack the column.
+    columns = {column["name"] for column in inspect(connection).get_columns("transactionlog")}
+    if "tx_hash" not in columns:
+        connection.execute(text("ALTER TABLE transactionlog ADD COLUMN tx_hash VARCHAR(80)"))
+
+
+def _create_transaction_indexes(connection: Connection) -> None:
+    # Legacy databases may lack the column indexes as well as the pagination one.
+    for name, columns in (
+        ("ix_transactionlog_address", "address"),
+        ("ix_transactionlog_tx_type", "tx_type"),
+        ("ix_transactionlog_tx_hash", "tx_hash"),
+        ("ix_transactionlog_address_timestamp_id", "address, timestamp, id"),
+    ):
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON transactionlog ({columns})"))
+
+
+def _create_rebalance_recommendations(connection: Connection) -> None:
+    rebalance_recommendations.create(connection, checkfirst=True)
+
+
+MIGRATIONS = (
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "add transactionlog.tx_hash", _add_tx_hash),
+    Migration(3, "create transactionlog indexes", _create_transaction_indexes),
+    Migration(4, "create rebalancerecommendation", _create_rebalance_recommendations),
+)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def _lock(connection: Connection) -> None:
+    """Serialise migrators for the rest of the transaction."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    else:
+        # A write takes SQLite's reserved lock, which other writers wait on until commit.
+        connection.execute(schema_version.update().where(schema_version.c.version < 0).values(version=-1))
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> int:
+    """Apply pending migrations up to ``target`` (default: latest) and return the resulting version."""
+    target = LATEST_VERSION if target is None else target
+    try:
+        schema_version.create(engine, checkfirst=True)
+    except SQLAlchemyError:
+        # Another process created it between the existence check and CREATE TABLE.
+        if not inspect(engine).has_table(schema_version.name):
+            raise
+    with engine.begin() as connection:
+        _lock(connection)
+        version = current_version(connection)
+        for migration in MIGRATIONS:
+            if version < migration.version <= target:
+                logger.info("Applying migration %s: %s", migration.version, migration.description)
+                migration.apply(connection)
+                connection.execute(
+                    schema_version.insert().values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.now(UTC),
+                    )
+                )
+                version = migration.version
+    return version
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool) -> int:
+    """Check the schema version on startup, migrating only when allowed and needed."""
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version >= LATEST_VERSION:
+        return version
+    if not auto_migrate:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}; run python -m app.tools.migrate"
+        )
+    return migrate(engine)
@@ -0,0 +1,241 @@
+"""Multi-endpoint RPC providers with latency-aware routing and hedged reads."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from typing import Any, Deque, Dict, List, Optional
+
+from web3.providers import AsyncHTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+from web3.providers.rpc import HTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from app.core.logger import logger
+
+# Only idempotent reads may be duplicated by a hedge or retried on another node.
+READ_METHODS = frozenset(
+    {
+        "eth_blockNumber",
+        "eth_call",
+        "eth_chainId",
+        "eth_getBalance",
+        "eth_getBlockByHash",
+        "eth_getBlockByNumber",
+        "eth_getCode",
+        "eth_getLogs",
+        "net_version",
+        "web3_clientVersion",
+    }
+)
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 256
+MIN_HEDGE_SAMPLES = 20
+# An idle endpoint's latency estimate halves this often, so a demoted node is retried eventually.
+RECOVERY_HALF_LIFE_SECONDS = 30.0
+# Measurements older than this describe a past spell and are discarded on the next observation.
+STALE_AFTER_SECONDS = 60.0
+
+
+class EndpointStats:
+    """Latency and error accounting for a single RPC endpoint."""
+
+    __slots__ = ("url", "ewma_ms", "requests", "errors", "hedges", "hedge_wins", "last_used", "_samples", "_lock")
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.ewma_ms: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.last_used = time.monotonic()
+        self._samples: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def observe(self, latency_ms: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self.last_used > STALE_AFTER_SECONDS:
+                self._samples.clear()
+                self.ewma_ms = None
+            self.last_used = now
+            self.requests += 1
+            self._samples.append(latency_ms)
+            self.ewma_ms = latency_ms if self.ewma_ms is None else (
+                EWMA_ALPHA * latency_ms + (1 - EWMA_ALPHA) * self.ewma_ms
+            )
+
+    def fail(self, penalty_ms: float) -> None:
+        """Count an error and push the endpoint down the ranking as if it took ``penalty_ms``."""
+        self.observe(penalty_ms)
+        with self._lock:
+            self.errors += 1
+
+    def score(self, now: float) -> float:
+        """Latency estimate used for ranking, decayed towards zero while the endpoint sits unused."""
+        if self.ewma_ms is None:
+            return 0.0
+        return self.ewma_ms * 0.5 ** (max(now - self.last_used, 0.0) / RECOVERY_HALF_LIFE_SECONDS)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < MIN_HEDGE_SAMPLES or time.monotonic() - self.last_used > STALE_AFTER_SECONDS:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+
+_stats: Dict[str, EndpointStats] = {}
+
+
+def endpoint_stats(url: str) -> EndpointStats:
+    """Return the process-wide stats for ``url``, shared by sync and async pools."""
+    return _stats.setdefault(url, EndpointStats(url))
+
+
+def stats_snapshot() -> Dict[str, Any]:
+    return {"endpoints": [stats.snapshot() for stats in _stats.values()]}
+
+
+def _ranked(stats: Sequence[EndpointStats]) -> List[int]:
+    # Unmeasured endpoints sort first so every node gets sampled; penalties
+    # fade while an endpoint is unused, so a node demoted after one bad spell
+    # is eventually retried and can climb back up.
+    now = time.monotonic()
+    return sorted(range(len(stats)), key=lambda index: stats[index].score(now))
+
+
+class PooledHTTPProvider(JSONBaseProvider):
+    """Routes each request to the fastest endpoint and fails reads over to the next one."""
+
+    def __init__(self, providers: Sequence[HTTPProvider], penalty_ms: float) -> None:
+        super().__init__()
+        self._providers = list(providers)
+        self._stats = [endpoint_stats(str(provider.endpoint_uri)) for provider in self._providers]
+        self._penalty_ms = penalty_ms
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        order = _ranked(self._stats)
+        if method not in READ_METHODS:
+            order = order[:1]
+        for position, index in enumerate(order):
+            started = time.perf_counter()
+            try:
+                response = self._providers[index].make_request(method, params)
+            except Exception as error:
+                self._stats[index].fail(self._penalty_ms)
+                if position == len(order) - 1:
+                    raise
+                logger.warning("RPC %s failed on %s: %s", method, self._stats[index].url, error)
+                continue
+            self._stats[index].observe((time.perf_counter() - started) * 1000)
+            return response
+        raise RuntimeError("No RPC endpoints configured")
+
+
+class PooledAsyncProvider(AsyncJSONBaseProvider):
+    """Async pool that hedges slow reads with a duplicate on the next-best endpoint.
+
+    A read is hedged once it has run longer than the primary endpoint's
+    ``hedge_percentile`` latency (never earlier than ``min_hedge_delay``
+    seconds); the first successful answer wins and the loser is cancelled.
+    Failed reads move on down the ranking like the sync pool's.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[AsyncHTTPProvider],
+        penalty_ms: float,
+        hedge_percentile: float = 0.95,
+        min_hedge_delay: float = 0.05,
+        default_hedge_delay: float = 0.5,
+    ) -> None:
+        super().__init__()
+        self.providers = list(providers)
+        self._stats = [endpoint_stats(str(provider.endpoint_uri)) for provider in self.providers]
+        self._penalty_ms = penalty_ms
+        self._hedge_percentile = hedge_percentile
+        self._min_hedge_delay = min_hedge_delay
+        self._default_hedge_delay = default_hedge_delay
+
+    def hedge_delay(self, index: int) -> float:
+        threshold_ms = self._stats[index].percentile(self._hedge_percentile)
+        if threshold_ms is None:
+            return self._default_hedge_delay
+        return max(threshold_ms / 1000, self._min_hedge_delay)
+
+    async def _request(self, index: int, method: RPCEndpoint, params: Any) -> RPCResponse:
+        started = time.perf_counter()
+        try:
+            response = await self.providers[index].make_request(method, params)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._stats[index].fail(self._penalty_ms)
+            raise
+        self._stats[index].observe((time.perf_counter() - started) * 1000)
+        return response
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        order = _ranked(self._stats)
+        if len(order) == 1 or method not in READ_METHODS:
+            return await self._request(order[0], method, params)
+
+        # Endpoints are tried in rank order, at most two at a time: the next one
+        # starts when the only request in flight fails (fail over) or runs past
+        # its hedge delay (hedge).
+        remaining = deque(order)
+        pending: Dict[asyncio.Future, int] = {}
+        hedges: set[asyncio.Future] = set()
+        last_error: Optional[BaseException] = None
+
+        def start(hedge: bool) -> None:
+            index = remaining.popleft()
+            task = asyncio.ensure_future(self._request(index, method, params))
+            pending[task] = index
+            if hedge:
+                self._stats[index].hedges += 1
+                hedges.add(task)
+
+        start(hedge=False)
+        try:
+            while pending:
+                timeout = None
+                if len(pending) == 1 and remaining:
+                    timeout = self.hedge_delay(next(iter(pending.values())))
+                finished, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not finished:
+                    start(hedge=True)
+                    continue
+                for task in finished:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        if task in hedges:
+                            self._stats[index].hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning("RPC %s failed on %s: %s", method, self._stats[index].url, last_error)
+                if not pending and remaining:
+                    start(hedge=False)
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error or RuntimeError(f"RPC {method} failed on every endpoint")
@@ -0,0 +1,35 @@
+"""Opt-in orjson responses for endpoints that can skip ``response_model`` re-validation.
+
+With ``FAST_SERIALIZATION`` enabled, endpoints build plain data already shaped
+like their response model and return it through :func:`fast_response`. The
+route keeps its ``response_model``, so the OpenAPI schema is unchanged, but
+FastAPI no longer validates and encodes the result a second time.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import get_settings
+from app.core.logger import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+
+def fast_serialization_enabled() -> bool:
+    return get_settings().fast_serialization and orjson is not None
+
+
+def fast_response(payload: Any, headers: Optional[Mapping[str, str]] = None) -> ORJSONResponse:
+    return ORJSONResponse(payload, headers=headers)
+
+
+def check_fast_serialization() -> None:
+    """Warn at startup when the fast path is requested but orjson is not installed."""
+    if get_settings().fast_serialization and orjson is None:
+        logger.warning("FAST_SERIALIZATION is set but the orjson package is not installed; using the default encoder")
@@ -0,0 +1,54 @@
+"""Coalesce concurrent identical async computations into one in-flight call."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Dict, Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """Runs at most one computation per key; callers arriving meanwhile share its outcome.
+
+    The computation runs as its own task, so a caller that is cancelled (for
+    example by a client disconnect) does not cancel it for the others. It must
+    therefore not borrow resources scoped to any one caller, such as a request
+    database session. Results and exceptions alike are shared, and nothing is
+    kept once the computation finishes.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[K, asyncio.Future] = {}
+        self._executed = 0
+        self._coalesced = 0
+        self._peak_in_flight = 0
+
+    async def do(self, key: K, compute: Callable[[], Awaitable[V]]) -> V:
+        call = self._calls.get(key)
+        if call is not None and call.get_loop() is asyncio.get_running_loop():
+            self._coalesced += 1
+        else:
+            call = asyncio.ensure_future(compute())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+            self._executed += 1
+            self._peak_in_flight = max(self._peak_in_flight, len(self._calls))
+        return await asyncio.shield(call)
+
+    def _forget(self, key: K, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Every caller may have gone away; mark the exception as retrieved.
+            call.exception()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "peak_in_flight": self._peak_in_flight,
+            "executed": self._executed,
+            "coalesced": self._coalesced,
+        }
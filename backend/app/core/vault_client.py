@@ -2,20 +2,175 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from functools import lru_cache
+import threading
+import time
+import weakref
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
 
-from web3 import Web3
-from web3.contract import Contract
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from eth_utils import event_abi_to_log_topic
+from web3 import AsyncWeb3, Web3
+from web3._utils.abi import get_abi_output_types
+from web3.contract import AsyncContract, Contract
+from web3.contract.async_contract import AsyncContractFunction
+from web3.contract.contract import ContractFunction
+from web3.exceptions import ContractLogicError
+from web3.providers import AsyncHTTPProvider
 from web3.providers.rpc import HTTPProvider
+from web3.types import BlockIdentifier
 
+from app.core import metrics
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import get_settings
 from app.core.logger import logger
+from app.core.rpc_pool import PooledAsyncProvider, PooledHTTPProvider, stats_snapshot
+from app.core.singleflight import SingleFlight
 
 ABI_FILE = Path(__file__).resolve().parent.parent / "contracts" / "synth_vault_abi.json"
+MULTICALL_ABI_FILE = ABI_FILE.with_name("multicall3_abi.json")
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+RPC_TIMEOUT_SECONDS = 6
+VAULT_EVENTS = ("Deposit", "Withdraw", "Transfer")
+
+_rpc_sessions: List[ClientSession] = []
+_settings = get_settings()
+rpc_breaker = CircuitBreaker(
+    "rpc",
+    failure_threshold=_settings.rpc_breaker_threshold,
+    reset_timeout=_settings.rpc_breaker_reset_seconds,
+    ignored=(ContractLogicError,),
+)
+metrics.register("rpc_breaker", rpc_breaker.snapshot)
+metrics.register("rpc_pool", stats_snapshot)
+# Identical async chain reads issued concurrently share one round trip.
+chain_reads: SingleFlight[Any, Any] = SingleFlight()
+metrics.register("chain_reads", chain_reads.snapshot)
+
+T = TypeVar("T")
+
+
+def _cache_available(factory: Callable[[], Optional[T]]) -> Callable[[], Optional[T]]:
+    """Cache a successful result for the process and a ``None`` result only briefly.
+
+    A missing provider is retried after ``rpc_negative_cache_seconds``, so the
+    API recovers from an RPC outage without a restart.
+    """
+    lock = threading.Lock()
+    state: Dict[str, Any] = {"value": None, "retry_at": 0.0}
+
+    @wraps(factory)
+    def wrapper() -> Optional[T]:
+        if state["value"] is not None:
+            return state["value"]
+        with lock:
+            if state["value"] is not None or time.monotonic() < state["retry_at"]:
+                return state["value"]
+            value = factory()
+            if value is None:
+                state["retry_at"] = time.monotonic() + get_settings().rpc_negative_cache_seconds
+            state["value"] = value
+            return value
+
+    def cache_clear() -> None:
+        state.update(value=None, retry_at=0.0)
+
+    wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+    return wrapper
+
+
+@dataclass(slots=True)
+class MulticallResult:
+    """Decoded return values of a batched read and the block they were read at."""
+
+    block_number: Optional[int]
+    values: List[Any] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class VaultLog:
+    """Decoded SynthVault event log."""
+
+    event: str
+    block_number: int
+    block_hash: str
+    tx_hash: str
+    log_index: int
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class VaultState:
+    """Vault-wide figures that are identical for every wallet."""
+
+    block_number: Optional[int]
+    total_assets: int
+    total_supply: int
+    deposit_cap: int
+    paused: bool
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def share_price(self) -> Decimal:
+        if not self.total_supply:
+            return Decimal(1)
+        return Decimal(self.total_assets) / Decimal(self.total_supply)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class VaultStateCache:
+    """Latest ``VaultState`` keyed by block number and bounded by a max age."""
+
+    def __init__(self) -> None:
+        self._state: Optional[VaultState] = None
+        self.lock = threading.Lock()
+        self._async_locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def async_lock(self) -> asyncio.Lock:
+        """Refresh lock for the running event loop; a lock cannot be shared between loops."""
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = self._async_locks[loop] = asyncio.Lock()
+        return lock
+
+    def peek(self, min_block: Optional[int] = None) -> Optional[VaultState]:
+        state = self._state
+        if state is None or state.age > get_settings().vault_state_max_age:
+            return None
+        if min_block is not None and state.block_number is not None and state.block_number < min_block:
+            return None
+        return state
+
+    def store(self, state: VaultState) -> VaultState:
+        current = self._state
+        if (
+            current is not None
+            and current.block_number is not None
+            and state.block_number is not None
+            and state.block_number < current.block_number
+        ):
+            return state
+        self._state = state
+        return state
+
+    def clear(self) -> None:
+        self._state = None
+
+
+vault_state_cache = VaultStateCache()
 
 
 @lru_cache()
@@ -25,22 +180,36 @@ def _load_abi() -> list[dict[str, Any]]:
 
 
 @lru_cache()
+def _load_multicall_abi() -> list[dict[str, Any]]:
+    with MULTICALL_ABI_FILE.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+@_cache_available
 def _get_provider() -> Optional[Web3]:
     settings = get_settings()
-    if not settings.rpc_url:
+    if not settings.rpc_endpoints:
         logger.warning("RPC URL not configured; vault queries disabled")
         return None
     try:
-        provider = Web3(HTTPProvider(settings.rpc_url, request_kwargs={"timeout": 6}))
+        provider = Web3(
+            PooledHTTPProvider(
+                [
+                    HTTPProvider(url, request_kwargs={"timeout": RPC_TIMEOUT_SECONDS})
+                    for url in settings.rpc_endpoints
+                ],
+                penalty_ms=RPC_TIMEOUT_SECONDS * 1000,
+            )
+        )
         if provider.is_connected():
             return provider
-        logger.warning("Unable to connect to RPC at %s", settings.rpc_url)
+        logger.warning("Unable to connect to RPC at %s", ", ".join(settings.rpc_endpoints))
     except Exception as error:  # pragma: no cover - defensive logging
         logger.error("Failed to initialise Web3 provider: %s", error)
     return None
 
 
-@lru_cache()
+@_cache_available
 def get_vault_contract() -> Optional[Contract]:
     """Return the SynthVault contract or None if misconfigured."""
     settings = get_settings()
@@ -63,3 +232,290 @@ def get_vault_contract() -> Optional[Contract]:
     except Exception as error:  # pragma: no cover - defensive logging
         logger.error("Failed to create contract instance: %s", error)
         return None
+
+
+@_cache_available
+def _get_async_provider() -> Optional[AsyncWeb3]:
+    settings = get_settings()
+    if not settings.rpc_endpoints:
+        logger.warning("RPC URL not configured; vault queries disabled")
+        return None
+    timeout = ClientTimeout(total=RPC_TIMEOUT_SECONDS)
+    try:
+        return AsyncWeb3(
+            PooledAsyncProvider(
+                [AsyncHTTPProvider(url, request_kwargs={"timeout": timeout}) for url in settings.rpc_endpoints],
+                penalty_ms=RPC_TIMEOUT_SECONDS * 1000,
+                hedge_percentile=settings.rpc_hedge_percentile,
+                min_hedge_delay=settings.rpc_hedge_min_delay,
+            )
+        )
+    except Exception as error:  # pragma: no cover - defensive logging
+        logger.error("Failed to initialise AsyncWeb3 provider: %s", error)
+    return None
+
+
+@_cache_available
+def get_async_vault_contract() -> Optional[AsyncContract]:
+    """Return the SynthVault contract bound to the async provider or None if misconfigured."""
+    settings = get_settings()
+    if settings.vault_address == ZERO_ADDRESS:
+        return None
+
+    provider = _get_async_provider()
+    if provider is None:
+        return None
+
+    try:
+        checksum_address = Web3.to_checksum_address(settings.vault_address)
+    except ValueError:
+        logger.error("Invalid vault address configured: %s", settings.vault_address)
+        return None
+    return provider.eth.contract(address=checksum_address, abi=_load_abi())
+
+
+async def open_rpc_session() -> None:
+    """Attach a pooled keep-alive aiohttp session to every async RPC endpoint."""
+    provider = _get_async_provider()
+    if provider is None or _rpc_sessions:
+        return
+    for endpoint in provider.provider.providers:
+        session = ClientSession(connector=TCPConnector(limit=get_settings().rpc_pool_size), raise_for_status=True)
+        _rpc_sessions.append(session)
+        await endpoint.cache_async_session(session)
+
+
+async def close_rpc_session() -> None:
+    while _rpc_sessions:
+        await _rpc_sessions.pop().close()
+
+
+@lru_cache(maxsize=8)
+def get_multicall_contract(w3: Union[Web3, AsyncWeb3]) -> Optional[Union[Contract, AsyncContract]]:
+    """Return the Multicall3 contract bound to ``w3`` or None if disabled."""
+    settings = get_settings()
+    if not settings.multicall_address or settings.multicall_address.lower() == ZERO_ADDRESS:
+        return None
+    try:
+        checksum_address = Web3.to_checksum_address(settings.multicall_address)
+    except ValueError:
+        logger.error("Invalid multicall address configured: %s", settings.multicall_address)
+        return None
+    return w3.eth.contract(address=checksum_address, abi=_load_multicall_abi())
+
+
+def _decode_output(call: Union[ContractFunction, AsyncContractFunction], data: bytes) -> Any:
+    decoded = call.w3.codec.decode(get_abi_output_types(call.abi), data)
+    return decoded[0] if len(decoded) == 1 else decoded
+
+
+def _multicall_payload(multicall: Any, calls: Sequence[Any], allow_failure: bool) -> list[tuple[str, bool, str]]:
+    payload = [(call.address, allow_failure, call._encode_transaction_data()) for call in calls]
+    payload.append((multicall.address, False, multicall.functions.getBlockNumber()._encode_transaction_data()))
+    return payload
+
+
+def _multicall_result(multicall: Any, calls: Sequence[Any], results: Sequence[tuple[bool, bytes]]) -> MulticallResult:
+    *call_results, (_, block_data) = results
+    values = [
+        _decode_output(call, data) if success else None for call, (success, data) in zip(calls, call_results)
+    ]
+    block_number = _decode_output(multicall.functions.getBlockNumber(), block_data)
+    return MulticallResult(block_number=int(block_number), values=values)
+
+
+def _sequential(
+    calls: Sequence[ContractFunction], block_identifier: BlockIdentifier, allow_failure: bool
+) -> MulticallResult:
+    w3 = getattr(calls[0], "w3", None)
+    block_number: Optional[int] = None
+    if isinstance(block_identifier, int):
+        block_number = block_identifier
+    elif w3 is not None:
+        block_number = w3.eth.block_number
+
+    values: List[Any] = []
+    for call in calls:
+        try:
+            values.append(call.call() if block_number is None else call.call(block_identifier=block_number))
+        except Exception:
+            if not allow_failure:
+                raise
+            values.append(None)
+    return MulticallResult(block_number=block_number, values=values)
+
+
+async def _sequential_async(
+    calls: Sequence[AsyncContractFunction], block_identifier: BlockIdentifier, allow_failure: bool
+) -> MulticallResult:
+    w3 = getattr(calls[0], "w3", None)
+    block_number: Optional[int] = None
+    if isinstance(block_identifier, int):
+        block_number = block_identifier
+    elif w3 is not None:
+        block_number = await w3.eth.block_number
+
+    values: List[Any] = []
+    for call in calls:
+        try:
+            if block_number is None:
+                values.append(await call.call())
+            else:
+                values.append(await call.call(block_identifier=block_number))
+        except Exception:
+            if not allow_failure:
+                raise
+            values.append(None)
+    return MulticallResult(block_number=block_number, values=values)
+
+
+def _aggregate(
+    calls: Sequence[ContractFunction],
+    block_identifier: BlockIdentifier = "latest",
+    allow_failure: bool = False,
+) -> MulticallResult:
+    if not calls:
+        return MulticallResult(block_number=None)
+
+    w3 = getattr(calls[0], "w3", None)
+    multicall = get_multicall_contract(w3) if w3 is not None else None
+    if multicall is None:
+        return _sequential(calls, block_identifier, allow_failure)
+
+    payload = _multicall_payload(multicall, calls, allow_failure)
+    results = multicall.functions.aggregate3(payload).call(block_identifier=block_identifier)
+    return _multicall_result(multicall, calls, results)
+
+
+async def _aggregate_async(
+    calls: Sequence[AsyncContractFunction],
+    block_identifier: BlockIdentifier = "latest",
+    allow_failure: bool = False,
+) -> MulticallResult:
+    if not calls:
+        return MulticallResult(block_number=None)
+
+    w3 = getattr(calls[0], "w3", None)
+    multicall = get_multicall_contract(w3) if w3 is not None else None
+    if multicall is None:
+        return await _sequential_async(calls, block_identifier, allow_failure)
+
+    payload = _multicall_payload(multicall, calls, allow_failure)
+    results = await multicall.functions.aggregate3(payload).call(block_identifier=block_identifier)
+    return _multicall_result(multicall, calls, results)
+
+
+def aggregate(
+    calls: Sequence[ContractFunction],
+    block_identifier: BlockIdentifier = "latest",
+    allow_failure: bool = False,
+) -> MulticallResult:
+    """Execute ``calls`` in a single ``eth_call`` through Multicall3.
+
+    All reads observe the same block, whose number is returned alongside the
+    decoded values. When Multicall3 is disabled the calls run sequentially,
+    pinned to one block. Failed calls yield ``None`` if ``allow_failure`` is set.
+    Raises ``CircuitOpenError`` without touching the network during an outage.
+    """
+    return rpc_breaker.call(_aggregate, calls, block_identifier, allow_failure)
+
+
+async def aggregate_async(
+    calls: Sequence[AsyncContractFunction],
+    block_identifier: BlockIdentifier = "latest",
+    allow_failure: bool = False,
+) -> MulticallResult:
+    """Async counterpart of :func:`aggregate` for ``AsyncWeb3`` contract calls."""
+    return await rpc_breaker.call_async(_aggregate_async, calls, block_identifier, allow_failure)
+
+
+def _vault_state_calls(contract: Any) -> list[Any]:
+    return [
+        contract.functions.totalAssets(),
+        contract.functions.totalSupply(),
+        contract.functions.depositCap(),
+        contract.functions.paused(),
+    ]
+
+
+def _vault_state_from(result: MulticallResult) -> VaultState:
+    total_assets, total_supply, deposit_cap, paused = result.values
+    return VaultState(
+        block_number=result.block_number,
+        total_assets=int(total_assets),
+        total_supply=int(total_supply),
+        deposit_cap=int(deposit_cap),
+        paused=bool(paused),
+    )
+
+
+def get_vault_state(contract: Optional[Contract] = None, min_block: Optional[int] = None) -> Optional[VaultState]:
+    """Return shared vault state no older than ``min_block`` and the configured max age.
+
+    Concurrent callers wait for a single refresh instead of each issuing their own.
+    """
+    cached = vault_state_cache.peek(min_block)
+    if cached is not None:
+        return cached
+
+    contract = contract if contract is not None else get_vault_contract()
+    if contract is None:
+        return None
+
+    with vault_state_cache.lock:
+        cached = vault_state_cache.peek(min_block)
+        if cached is not None:
+            return cached
+        result = aggregate(_vault_state_calls(contract))
+        return vault_state_cache.store(_vault_state_from(result))
+
+
+async def get_vault_state_async(
+    contract: Optional[AsyncContract] = None, min_block: Optional[int] = None
+) -> Optional[VaultState]:
+    """Async counterpart of :func:`get_vault_state` sharing the same cache."""
+    cached = vault_state_cache.peek(min_block)
+    if cached is not None:
+        return cached
+
+    contract = contract if contract is not None else get_async_vault_contract()
+    if contract is None:
+        return None
+
+    async with vault_state_cache.async_lock:
+        cached = vault_state_cache.peek(min_block)
+        if cached is not None:
+            return cached
+        result = await aggregate_async(_vault_state_calls(contract))
+        return vault_state_cache.store(_vault_state_from(result))
+
+
+def fetch_vault_logs(
+    contract: Contract, from_block: int, to_block: int, events: Sequence[str] = VAULT_EVENTS
+) -> List[VaultLog]:
+    """Fetch and decode vault ``events`` in an inclusive block range with one ``eth_getLogs``."""
+    decoders = {event_abi_to_log_topic(contract.events[name]().abi): contract.events[name]() for name in events}
+    raw_logs = rpc_breaker.call(
+        contract.w3.eth.get_logs,
+        {
+            "address": contract.address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [["0x" + topic.hex() for topic in decoders]],
+        },
+    )
+    logs: List[VaultLog] = []
+    for raw_log in raw_logs:
+        decoded = decoders[bytes(raw_log["topics"][0])].process_log(raw_log)
+        logs.append(
+            VaultLog(
+                event=decoded["event"],
+                block_number=int(decoded["blockNumber"]),
+                block_hash=decoded["blockHash"].hex(),
+                tx_hash=decoded["transactionHash"].hex(),
+                log_index=int(decoded["logIndex"]),
+                args=dict(decoded["args"]),
+            )
+        )
+    logs.sort(key=lambda log: (log.block_number, log.log_index))
+    return logs
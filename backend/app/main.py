@@ -1,30 +1,63 @@
 """FastAPI application initialisation."""
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 
-from app.api.endpoints import health, plan, portfolio, preferences, tx
+from app.api.endpoints import health, plan, portfolio, preferences, stream, tx, vault
+from app.core.admission import AdmissionMiddleware
 from app.core.config import get_settings
-from app.core.db import init_db
+from app.core.db import async_engine, engine
 from app.core.logger import logger
+from app.core.migrations import ensure_schema
+from app.core.serialization import check_fast_serialization
+from app.core.vault_client import close_rpc_session, open_rpc_session
+from app.services.indexer_service import start_indexer, stop_indexer
+from app.services.plan_service import plan_table
+from app.services.portfolio_service import stop_snapshot_refreshes
+from app.services.preferences_service import start_cache_invalidation, stop_cache_invalidation
+from app.services.projection_service import shutdown_projection_pool
+from app.services.push_service import close_on_exit_signals, push_hub
+from app.services.vault_watcher_service import start_vault_watcher, stop_vault_watcher
+from app.services.write_behind_service import start_write_behind, stop_write_behind
 
 settings = get_settings()
 
-init_db()
-
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
+    await asyncio.to_thread(ensure_schema, engine, settings.auto_migrate)
+    await asyncio.to_thread(plan_table.rebuild)
+    check_fast_serialization()
+    await open_rpc_session()
+    indexer_task = start_indexer(engine)
+    write_behind = start_write_behind(async_engine)
+    invalidator = await start_cache_invalidation()
+    vault_watcher = start_vault_watcher(async_engine)
+    restore_signals = close_on_exit_signals()
     logger.info("NEXORA API started")
     try:
         yield
     finally:
+        push_hub.close()
+        restore_signals()
+        await stop_vault_watcher(vault_watcher)
+        await stop_cache_invalidation(invalidator)
+        await stop_write_behind(write_behind)
+        await stop_indexer(indexer_task)
+        await stop_snapshot_refreshes()
+        await close_rpc_session()
+        shutdown_projection_pool()
+        await async_engine.dispose()
         logger.info("NEXORA API shut down")
 
 
 app = FastAPI(title="NEXORA API", version="0.1.0", lifespan=lifespan)
+if settings.admission_enabled:
+    # Added before CORS so that rejections still carry CORS headers.
+    app.add_middleware(AdmissionMiddleware, settings=settings)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -36,7 +69,9 @@ app.include_router(health.router)
 app.include_router(plan.router)
 app.include_router(portfolio.router)
 app.include_router(preferences.router)
+app.include_router(stream.router)
 app.include_router(tx.router)
+app.include_router(vault.router)
 
 
 @app.get("/", include_in_schema=False)
@@ -0,0 +1,43 @@
+"""Indexed vault position models."""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class ShareBalance(SQLModel, table=True):
+    """SynthVault share balance per wallet, maintained by the event indexer.
+
+    Share amounts are uint256 values and are stored as decimal strings.
+    """
+
+    address: str = Field(primary_key=True, max_length=64)
+    shares: str = Field(default="0", max_length=80)
+    updated_block: int = Field(default=0)
+
+
+class ShareMovement(SQLModel, table=True):
+    """Journal of indexed share deltas, kept to roll back reorganised blocks."""
+
+    id: int | None = Field(default=None, primary_key=True)
+    block_number: int = Field(index=True)
+    log_index: int
+    tx_hash: str = Field(max_length=80)
+    address: str = Field(index=True, max_length=64)
+    delta: str = Field(max_length=80)
+
+
+class IndexedBlock(SQLModel, table=True):
+    """Recently indexed block hashes used to find the fork point after a reorg."""
+
+    number: int = Field(primary_key=True)
+    hash: str = Field(max_length=80)
+
+
+class IndexerCheckpoint(SQLModel, table=True):
+    """Last fully indexed block per indexer."""
+
+    name: str = Field(primary_key=True, max_length=32)
+    block_number: int
+    block_hash: str = Field(max_length=80)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
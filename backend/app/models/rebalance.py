@@ -0,0 +1,23 @@
+"""Rebalancing recommendation models."""
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class RebalanceRecommendation(SQLModel, table=True):
+    """Latest allocation drift flagged for a wallet by the rebalancing job.
+
+    ``drift`` is the share of the portfolio that would have to move to match
+    the target plan; ``strategy`` is the most mis-weighted strategy and
+    ``strategy_delta`` its actual minus target weight.
+    """
+
+    address: str = Field(primary_key=True, max_length=64)
+    plan: str = Field(max_length=32)
+    drift: float = Field(index=True)
+    strategy: str = Field(max_length=64)
+    strategy_delta: float
+    total_value: float
+    block_number: int | None = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -2,12 +2,16 @@
 
 from datetime import datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class TransactionLog(SQLModel, table=True):
     """Persisted transaction log for deposits/withdrawals."""
 
+    # Serves keyset pagination of an address's history, newest first.
+    __table_args__ = (Index("ix_transactionlog_address_timestamp_id", "address", "timestamp", "id"),)
+
     id: int | None = Field(default=None, primary_key=True)
     address: str = Field(index=True)
     tx_type: str = Field(index=True, max_length=32)
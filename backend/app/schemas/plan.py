@@ -1,6 +1,6 @@
 """Schemas for investment plan interactions."""
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field, conint, confloat
 
@@ -27,3 +27,59 @@ class PlanResponse(BaseModel):
     """Response model for plan generation."""
 
     plans: List[PlanOption]
+
+
+class PlanBatchRequest(BaseModel):
+    """Columnar batch of plan requests; the i-th entries of each array form one profile."""
+
+    risk_scores: List[conint(ge=1, le=10)] = Field(..., description="Risk scores (1-10).")
+    horizon_months: List[conint(ge=1, le=120)] = Field(..., description="Horizons in months (1-120).")
+    stablecoin_preferences: Optional[List[str]] = Field(
+        default=None, description="Preferred stablecoins; accepted for parity with /plan/, does not change plans."
+    )
+
+
+class PlanBatchTemplate(BaseModel):
+    """Request-independent part of a plan option."""
+
+    name: str
+    risk_level: str
+    allocations: Dict[str, float]
+    rationale: str
+
+
+class PlanBatchResponse(BaseModel):
+    """Columnar batch response: ``est_apy[t][i]`` is template ``t``'s APY for profile ``i``."""
+
+    templates: List[PlanBatchTemplate]
+    est_apy: List[List[float]]
+
+
+class PlanProjectionRequest(BaseModel):
+    """Payload for Monte Carlo outcome projections."""
+
+    risk_score: conint(ge=1, le=10) = Field(..., description="User risk tolerance score (1-10).")
+    horizon_months: conint(ge=1, le=120) = Field(..., description="Investment horizon in months.")
+    paths: conint(ge=100, le=200_000) = Field(default=10_000, description="Number of simulated paths.")
+    initial_amount: confloat(gt=0) = Field(default=1000.0, description="Amount invested at the start.")
+
+
+class PlanProjection(BaseModel):
+    """Distribution of terminal values for one plan template."""
+
+    name: str
+    risk_level: str
+    est_apy: float
+    volatility: float
+    mean: float
+    probability_of_loss: float
+    percentiles: Dict[str, float]
+
+
+class PlanProjectionResponse(BaseModel):
+    """Response model for plan projections."""
+
+    horizon_months: int
+    paths: int
+    initial_amount: float
+    projections: List[PlanProjection]
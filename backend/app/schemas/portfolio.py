@@ -21,8 +21,17 @@ class ActivityItem(BaseModel):
     timestamp: datetime
 
 
+class ActivityPage(BaseModel):
+    items: List[ActivityItem]
+    next_cursor: str | None = Field(default=None, description="Opaque cursor for the next, older page.")
+
+
 class PortfolioSchema(BaseModel):
     owner: str
     total_value: float
     positions: List[VaultPositionSchema]
-    history: List[ActivityItem]
+    history: List[ActivityItem] = Field(description="Latest activity; page further via /portfolio/{address}/history.")
+    history_next_cursor: str | None = None
+    as_of_block: int | None = Field(
+        default=None, description="Block the vault data was read at; the response Age header gives its age in seconds."
+    )
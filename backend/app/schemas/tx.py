@@ -1,9 +1,12 @@
 """Transaction schemas."""
 
 from datetime import datetime
+from typing import List, Literal
 
 from pydantic import BaseModel, Field, condecimal
 
+MAX_BATCH_ITEMS = 5000
+
 
 class TransactionCreate(BaseModel):
     address: str
@@ -15,3 +18,24 @@ class TransactionCreate(BaseModel):
 class TransactionRecord(TransactionCreate):
     tx_type: str
     timestamp: datetime
+
+
+class TransactionBatchItem(TransactionCreate):
+    type: Literal["deposit", "withdraw"]
+
+
+class TransactionBatch(BaseModel):
+    items: List[TransactionBatchItem] = Field(min_items=1, max_items=MAX_BATCH_ITEMS)
+
+
+class TransactionBatchStatus(BaseModel):
+    index: int
+    status: Literal["logged", "duplicate"]
+    type: str
+    tx_hash: str
+
+
+class TransactionBatchResult(BaseModel):
+    logged: int
+    duplicates: int
+    items: List[TransactionBatchStatus]
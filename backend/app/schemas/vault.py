@@ -0,0 +1,14 @@
+"""Vault schemas."""
+
+from pydantic import BaseModel, Field
+
+
+class VaultStatsSchema(BaseModel):
+    vault: str
+    block_number: int | None = None
+    total_assets: float = Field(ge=0)
+    total_supply: float = Field(ge=0)
+    share_price: float = Field(ge=0)
+    tvl: float = Field(ge=0)
+    deposit_cap: float = Field(ge=0)
+    paused: bool
@@ -1,3 +1,3 @@
 """Service package exports."""
 
-__all__ = ["plan_service", "portfolio_service", "tx_service"]
+__all__ = ["plan_service", "portfolio_service", "tx_service", "vault_service"]
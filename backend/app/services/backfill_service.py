@@ -0,0 +1,226 @@
+"""Historical backfill of SynthVault deposits and withdrawals into ``TransactionLog``."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Deque, Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.vault_client import VaultLog
+from app.models.positions import IndexerCheckpoint
+from app.models.tx import TransactionLog
+from app.utils.helpers import to_token_amount
+
+CHECKPOINT_NAME = "backfill"
+EVENT_TX_TYPES = {"Deposit": "deposit", "Withdraw": "withdraw"}
+MAX_SINGLE_BLOCK_ATTEMPTS = 3
+PROGRESS_INTERVAL_SECONDS = 5.0
+DEDUPE_CHUNK = 500
+
+
+class BackfillSource(Protocol):
+    """Chain access required by the backfill."""
+
+    def head(self) -> int:
+        ...
+
+    def logs(self, from_block: int, to_block: int) -> List[VaultLog]:
+        ...
+
+    def block_timestamp(self, number: int) -> int:
+        ...
+
+
+@dataclass(slots=True)
+class BackfillStats:
+    blocks: int = 0
+    rows: int = 0
+    splits: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    @property
+    def blocks_per_second(self) -> float:
+        return self.blocks / self.elapsed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed
+
+
+class Backfiller:
+    """Rebuilds vault history with adaptive ranges, a bounded worker pool and resumable checkpoints.
+
+    Workers only talk to the RPC node; rows are written from the coordinating
+    thread in one bulk insert per completed range, together with the
+    checkpoint of the contiguous prefix finished so far.
+    """
+
+    def __init__(
+        self,
+        source: BackfillSource,
+        engine: Engine,
+        workers: int = 4,
+        chunk_size: int = 2000,
+        min_chunk: int = 1,
+        max_chunk: int = 50_000,
+        name: str = CHECKPOINT_NAME,
+    ) -> None:
+        self._source = source
+        self._engine = engine
+        self._workers = max(workers, 1)
+        self._chunk = max(chunk_size, min_chunk)
+        self._min_chunk = max(min_chunk, 1)
+        self._max_chunk = max(max_chunk, self._chunk)
+        self._name = name
+
+    def checkpoint(self) -> Optional[int]:
+        with Session(self._engine) as session:
+            record = session.get(IndexerCheckpoint, self._name)
+            return record.block_number if record is not None else None
+
+    def run(self, from_block: Optional[int] = None, to_block: Optional[int] = None) -> BackfillStats:
+        settings = get_settings()
+        if from_block is None:
+            checkpoint = self.checkpoint()
+            from_block = checkpoint + 1 if checkpoint is not None else settings.vault_deploy_block
+        if to_block is None:
+            to_block = self._source.head() - settings.indexer_confirmations
+
+        stats = BackfillStats()
+        retries: Deque[Tuple[int, int]] = deque()
+        attempts: Dict[Tuple[int, int], int] = {}
+        completed: Dict[int, int] = {}
+        committed = from_block - 1
+        next_block = from_block
+        last_report = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="backfill") as pool:
+            in_flight: Dict[Future, Tuple[int, int]] = {}
+            while retries or next_block <= to_block or in_flight:
+                while len(in_flight) < self._workers * 2 and (retries or next_block <= to_block):
+                    if retries:
+                        block_range = retries.popleft()
+                    else:
+                        block_range = (next_block, min(to_block, next_block + self._chunk - 1))
+                        next_block = block_range[1] + 1
+                    in_flight[pool.submit(self._fetch, *block_range)] = block_range
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    low, high = in_flight.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception as error:
+                        self._handle_failure(low, high, error, retries, attempts, stats)
+                        continue
+
+                    if high - low + 1 >= self._chunk:
+                        self._chunk = min(self._max_chunk, self._chunk * 2)
+                    completed[low] = high
+                    while committed + 1 in completed:
+                        committed = completed.pop(committed + 1)
+                    stats.rows += self._store(rows, committed)
+                    stats.blocks += high - low + 1
+
+                if time.perf_counter() - last_report >= PROGRESS_INTERVAL_SECONDS:
+                    last_report = time.perf_counter()
+                    self._report(stats, committed, to_block)
+
+        self._report(stats, committed, to_block)
+        return stats
+
+    def _handle_failure(
+        self,
+        low: int,
+        high: int,
+        error: Exception,
+        retries: Deque[Tuple[int, int]],
+        attempts: Dict[Tuple[int, int], int],
+        stats: BackfillStats,
+    ) -> None:
+        if low == high:
+            attempts[(low, high)] = attempts.get((low, high), 0) + 1
+            if attempts[(low, high)] >= MAX_SINGLE_BLOCK_ATTEMPTS:
+                raise RuntimeError(f"Unable to fetch logs for block {low}") from error
+            retries.append((low, high))
+            return
+        # Provider limits and timeouts both shrink with the range, so split it.
+        middle = (low + high) // 2
+        retries.extendleft([(middle + 1, high), (low, middle)])
+        self._chunk = max(self._min_chunk, (high - low + 1) // 2)
+        stats.splits += 1
+        logger.debug("Split blocks %s-%s after error: %s", low, high, error)
+
+    def _fetch(self, low: int, high: int) -> List[Dict[str, Any]]:
+        logs = [log for log in self._source.logs(low, high) if log.event in EVENT_TX_TYPES]
+        timestamps = {number: self._source.block_timestamp(number) for number in {log.block_number for log in logs}}
+        return [
+            {
+                "address": str(log.args["owner"]).lower(),
+                "tx_type": EVENT_TX_TYPES[log.event],
+                "amount": to_token_amount(int(log.args["assets"])),
+                "vault": "SynthVault",
+                "tx_hash": log.tx_hash,
+                "timestamp": datetime.fromtimestamp(timestamps[log.block_number], UTC),
+            }
+            for log in logs
+        ]
+
+    def _store(self, rows: List[Dict[str, Any]], committed: int) -> int:
+        with Session(self._engine) as session:
+            fresh = self._without_existing(session, rows)
+            if fresh:
+                session.execute(insert(TransactionLog), fresh)
+            record = session.get(IndexerCheckpoint, self._name) or IndexerCheckpoint(
+                name=self._name, block_number=committed, block_hash=""
+            )
+            # Re-scanning an older range must not move the resume point backwards.
+            record.block_number = max(record.block_number, committed)
+            record.updated_at = datetime.now(UTC)
+            session.add(record)
+            session.commit()
+        return len(fresh)
+
+    def _without_existing(self, session: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop rows already logged, so resumed or overlapping ranges stay idempotent."""
+        hashes = sorted({row["tx_hash"] for row in rows})
+        existing = set()
+        for index in range(0, len(hashes), DEDUPE_CHUNK):
+            chunk = hashes[index : index + DEDUPE_CHUNK]
+            query = select(TransactionLog.tx_hash, TransactionLog.tx_type, TransactionLog.address).where(
+                TransactionLog.tx_hash.in_(chunk)
+            )
+            existing.update(tuple(row) for row in session.exec(query))
+        fresh = []
+        for row in rows:
+            key = (row["tx_hash"], row["tx_type"], row["address"])
+            if key not in existing:
+                existing.add(key)
+                fresh.append(row)
+        return fresh
+
+    def _report(self, stats: BackfillStats, committed: int, to_block: int) -> None:
+        logger.info(
+            "Backfill at block %s/%s: %s blocks, %s rows, %.1f blocks/s, %.1f rows/s, %s splits, chunk %s",
+            committed,
+            to_block,
+            stats.blocks,
+            stats.rows,
+            stats.blocks_per_second,
+            stats.rows_per_second,
+            stats.splits,
+            self._chunk,
+        )
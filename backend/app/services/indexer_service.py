@@ -0,0 +1,282 @@
+"""Event indexer maintaining local SynthVault share balances."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Sequence
+from contextlib import suppress
+from typing import Dict, Iterable, List, Optional, Protocol
+
+from sqlalchemy import delete
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.vault_client import (
+    ZERO_ADDRESS,
+    VaultLog,
+    fetch_vault_logs,
+    get_async_vault_contract,
+    get_vault_contract,
+)
+from app.models.positions import IndexedBlock, IndexerCheckpoint, ShareBalance, ShareMovement
+
+CHECKPOINT_NAME = "synth_vault"
+CONNECT_RETRY_MAX_SECONDS = 60.0
+
+
+class LogSource(Protocol):
+    """Chain access required by the indexer."""
+
+    def head(self) -> int:
+        ...
+
+    def block_hash(self, number: int) -> Optional[str]:
+        ...
+
+    def logs(self, from_block: int, to_block: int) -> List[VaultLog]:
+        ...
+
+
+class Web3LogSource:
+    """Reads vault logs through the configured web3 provider.
+
+    ERC-4626 deposits and withdrawals mint and burn shares through ``Transfer``,
+    so transfers alone determine balances and are the default event filter.
+    """
+
+    def __init__(self, contract, events: Sequence[str] = ("Transfer",)) -> None:
+        self._contract = contract
+        self._events = tuple(events)
+
+    def head(self) -> int:
+        return self._contract.w3.eth.block_number
+
+    def block_hash(self, number: int) -> Optional[str]:
+        block = self._contract.w3.eth.get_block(number)
+        return block["hash"].hex() if block else None
+
+    def logs(self, from_block: int, to_block: int) -> List[VaultLog]:
+        return fetch_vault_logs(self._contract, from_block, to_block, events=self._events)
+
+    def block_timestamp(self, number: int) -> int:
+        return int(self._contract.w3.eth.get_block(number)["timestamp"])
+
+
+class VaultIndexer:
+    """Follows vault transfers into ``ShareBalance`` rows with reorg rollback."""
+
+    def __init__(self, source: LogSource, engine: Engine, name: str = CHECKPOINT_NAME) -> None:
+        self._source = source
+        self._engine = engine
+        self._name = name
+
+    def poll_once(self) -> int:
+        """Index the next confirmed block range and return the number of blocks covered."""
+        settings = get_settings()
+        head = self._source.head() - settings.indexer_confirmations
+        with Session(self._engine) as session:
+            checkpoint = session.get(IndexerCheckpoint, self._name)
+            if checkpoint is not None and self._source.block_hash(checkpoint.block_number) != checkpoint.block_hash:
+                checkpoint = self._rollback(session, checkpoint)
+
+            start = checkpoint.block_number + 1 if checkpoint is not None else settings.vault_deploy_block
+            end = min(head, start + settings.indexer_batch_size - 1)
+            if start > end:
+                session.commit()
+                return 0
+
+            # Hash the range end before reading logs so a reorg in between is
+            # caught by the checkpoint comparison on the next poll.
+            end_hash = self._source.block_hash(end)
+            logs = self._source.logs(start, end)
+            self._apply(session, logs)
+
+            seen_blocks = {log.block_number: log.block_hash for log in logs}
+            seen_blocks[end] = end_hash
+            for number, block_hash in seen_blocks.items():
+                session.merge(IndexedBlock(number=number, hash=block_hash))
+
+            if checkpoint is None:
+                checkpoint = IndexerCheckpoint(name=self._name, block_number=end, block_hash=end_hash)
+            checkpoint.block_number = end
+            checkpoint.block_hash = end_hash
+            session.add(checkpoint)
+
+            horizon = end - settings.indexer_reorg_depth
+            session.execute(delete(IndexedBlock).where(IndexedBlock.number < horizon))
+            session.execute(delete(ShareMovement).where(ShareMovement.block_number < horizon))
+            session.commit()
+        return end - start + 1
+
+    def _apply(self, session: Session, logs: Iterable[VaultLog]) -> None:
+        deltas: Dict[str, int] = defaultdict(int)
+        last_block = 0
+        for log in logs:
+            if log.event != "Transfer" or not int(log.args["value"]):
+                continue
+            value = int(log.args["value"])
+            last_block = log.block_number
+            for address, delta in ((log.args["from"].lower(), -value), (log.args["to"].lower(), value)):
+                if address == ZERO_ADDRESS:
+                    continue
+                deltas[address] += delta
+                session.add(
+                    ShareMovement(
+                        block_number=log.block_number,
+                        log_index=log.log_index,
+                        tx_hash=log.tx_hash,
+                        address=address,
+                        delta=str(delta),
+                    )
+                )
+        self._adjust(session, deltas, last_block)
+
+    def _adjust(self, session: Session, deltas: Dict[str, int], block_number: int) -> None:
+        if not deltas:
+            return
+        rows = {
+            row.address: row
+            for row in session.exec(select(ShareBalance).where(ShareBalance.address.in_(list(deltas)))).all()
+        }
+        for address, delta in deltas.items():
+            row = rows.get(address) or ShareBalance(address=address)
+            row.shares = str(int(row.shares) + delta)
+            row.updated_block = block_number
+            session.add(row)
+
+    def _rollback(self, session: Session, checkpoint: IndexerCheckpoint) -> Optional[IndexerCheckpoint]:
+        ancestor: Optional[IndexedBlock] = None
+        known_blocks = session.exec(
+            select(IndexedBlock)
+            .where(IndexedBlock.number < checkpoint.block_number)
+            .order_by(IndexedBlock.number.desc())
+        ).all()
+        for block in known_blocks:
+            if self._source.block_hash(block.number) == block.hash:
+                ancestor = block
+                break
+
+        if ancestor is None:
+            logger.error("Reorg deeper than retained history at block %s; reindexing", checkpoint.block_number)
+            for model in (ShareBalance, ShareMovement, IndexedBlock, IndexerCheckpoint):
+                session.execute(delete(model))
+            return None
+
+        deltas: Dict[str, int] = defaultdict(int)
+        for movement in session.exec(select(ShareMovement).where(ShareMovement.block_number > ancestor.number)):
+            deltas[movement.address] -= int(movement.delta)
+        self._adjust(session, deltas, ancestor.number)
+        session.execute(delete(ShareMovement).where(ShareMovement.block_number > ancestor.number))
+        session.execute(delete(IndexedBlock).where(IndexedBlock.number > ancestor.number))
+
+        logger.warning("Reorg detected at block %s; rolled back to %s", checkpoint.block_number, ancestor.number)
+        checkpoint.block_number = ancestor.number
+        checkpoint.block_hash = ancestor.hash
+        session.add(checkpoint)
+        return checkpoint
+
+
+def _current(checkpoint: Optional[IndexerCheckpoint], min_block: Optional[int]) -> bool:
+    return checkpoint is not None and (min_block is None or checkpoint.block_number >= min_block)
+
+
+def index_current(session: Session, min_block: Optional[int], name: str = CHECKPOINT_NAME) -> bool:
+    """Whether the index checkpoint has reached ``min_block``."""
+    return _current(session.get(IndexerCheckpoint, name), min_block)
+
+
+def indexed_shares(
+    session: Session, address: str, name: str = CHECKPOINT_NAME, min_block: Optional[int] = None
+) -> Optional[int]:
+    """Return the indexed raw share balance, or None until the checkpoint has reached ``min_block``."""
+    if not _current(session.get(IndexerCheckpoint, name), min_block):
+        return None
+    row = session.get(ShareBalance, address)
+    return int(row.shares) if row is not None else 0
+
+
+async def indexed_shares_async(
+    session: AsyncSession, address: str, name: str = CHECKPOINT_NAME, min_block: Optional[int] = None
+) -> Optional[int]:
+    if not _current(await session.get(IndexerCheckpoint, name), min_block):
+        return None
+    row = await session.get(ShareBalance, address)
+    return int(row.shares) if row is not None else 0
+
+
+def _balances_query(addresses: Sequence[str]):
+    return select(ShareBalance).where(ShareBalance.address.in_(addresses))
+
+
+def indexed_share_balances(
+    session: Session, addresses: Sequence[str], name: str = CHECKPOINT_NAME, min_block: Optional[int] = None
+) -> Optional[Dict[str, int]]:
+    """Indexed raw share balances of ``addresses`` (0 when unknown), or None like :func:`indexed_shares`."""
+    if not _current(session.get(IndexerCheckpoint, name), min_block):
+        return None
+    balances = {row.address: int(row.shares) for row in session.exec(_balances_query(addresses))}
+    return {address: balances.get(address, 0) for address in addresses}
+
+
+async def indexed_share_balances_async(
+    session: AsyncSession, addresses: Sequence[str], name: str = CHECKPOINT_NAME, min_block: Optional[int] = None
+) -> Optional[Dict[str, int]]:
+    if not _current(await session.get(IndexerCheckpoint, name), min_block):
+        return None
+    balances = {row.address: int(row.shares) for row in await session.exec(_balances_query(addresses))}
+    return {address: balances.get(address, 0) for address in addresses}
+
+
+async def run_indexer(indexer: VaultIndexer, interval: float) -> None:
+    batch_size = get_settings().indexer_batch_size
+    while True:
+        try:
+            indexed = await asyncio.to_thread(indexer.poll_once)
+        except Exception as error:
+            logger.error("Vault indexer poll failed: %s", error)
+            indexed = 0
+        if indexed < batch_size:
+            await asyncio.sleep(interval)
+
+
+async def connect_indexer(engine: Engine, interval: float) -> VaultIndexer:
+    """Resolve the vault contract off the event loop, retrying with backoff while the RPC is unreachable."""
+    delay = interval
+    while True:
+        contract = await asyncio.to_thread(get_vault_contract)
+        if contract is not None:
+            return VaultIndexer(Web3LogSource(contract), engine)
+        logger.warning("Vault contract unavailable for the indexer; retrying in %.1fs", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, CONNECT_RETRY_MAX_SECONDS)
+
+
+async def _connect_and_run(engine: Engine, interval: float) -> None:
+    await run_indexer(await connect_indexer(engine, interval), interval)
+
+
+def start_indexer(engine: Engine) -> Optional[asyncio.Task]:
+    """Start the background indexer when enabled and the vault is configured.
+
+    Only the configuration is checked here; the RPC itself is reached from the
+    task, so an outage at boot delays indexing instead of disabling it.
+    """
+    settings = get_settings()
+    if not settings.indexer_enabled:
+        return None
+    if get_async_vault_contract() is None:
+        logger.warning("Vault indexer enabled but no vault or RPC is configured")
+        return None
+    return asyncio.create_task(_connect_and_run(engine, settings.indexer_poll_interval))
+
+
+async def stop_indexer(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
@@ -1,11 +1,23 @@
 """Plan service implementing rule-based strategy selection."""
 
+import threading
 from collections.abc import Sequence
-from typing import Dict, List
+from typing import Any, Dict, List, Mapping, Tuple
+
+import numpy as np
 
 from app.models.plan import PlanTemplate
 from app.schemas.plan import PlanOption, PlanRequest, PlanResponse
 
+RISK_SCORES = range(1, 11)
+HORIZON_MONTHS = range(1, 121)
+MAX_BATCH_PROFILES = 100_000
+HORIZON_BONUS_MONTHS = 120
+HORIZON_BONUS_CAP = 0.25
+NEUTRAL_RISK_SCORE = 5
+RISK_STEP = 0.015
+STABLECOIN_HAIRCUT = 0.95
+
 PLAN_LIBRARY: Sequence[PlanTemplate] = (
     PlanTemplate(
         name="Conservative",
@@ -30,11 +42,18 @@ PLAN_LIBRARY: Sequence[PlanTemplate] = (
 
 def _adjusted_apy(base_apy: float, risk_score: int, horizon_months: int) -> float:
     """Convert base APY with horizon/risk scaling."""
-    horizon_bonus = min(horizon_months / 120, 0.25)
-    risk_multiplier = 1 + (risk_score - 5) * 0.015
+    horizon_bonus = min(horizon_months / HORIZON_BONUS_MONTHS, HORIZON_BONUS_CAP)
+    risk_multiplier = 1 + (risk_score - NEUTRAL_RISK_SCORE) * RISK_STEP
     return round((base_apy * risk_multiplier) + horizon_bonus, 4)
 
 
+def _adjusted_allocations(template: PlanTemplate) -> Dict[str, float]:
+    allocations: Dict[str, float] = template.allocations.copy()
+    stablecoin_key = next(iter(allocations))
+    allocations[stablecoin_key] = round(allocations[stablecoin_key] * STABLECOIN_HAIRCUT, 2)
+    return allocations
+
+
 def _rationale(plan: PlanTemplate, risk_score: int) -> str:
     if plan.risk_level == "low":
         return "Prioritises capital preservation with stablecoin-heavy positions."
@@ -50,16 +69,125 @@ def generate_plan(request: PlanRequest) -> PlanResponse:
     plans: List[PlanOption] = []
     for template in PLAN_LIBRARY:
         est_apy = _adjusted_apy(template.base_apy, request.risk_score, request.horizon_months)
-        allocations: Dict[str, float] = template.allocations.copy()
-        stablecoin_key = next(iter(allocations))
-        allocations[stablecoin_key] = round(allocations[stablecoin_key] * 0.95, 2)
         plans.append(
             PlanOption(
                 name=template.name,
                 risk_level=template.risk_level,
                 est_apy=est_apy,
-                allocations=allocations,
+                allocations=_adjusted_allocations(template),
                 rationale=_rationale(template, request.risk_score),
             )
         )
-    return PlanResponse(plans=plans)
+    return PlanResponse(plans=plans)
+
+
+class _PlanTable:
+    """Serialized ``PlanResponse`` bytes for every (risk_score, horizon_months) pair.
+
+    ``stablecoin_preference`` does not influence the generated plans, so it is
+    not part of the key. The table is built on first use (or at startup) and
+    rebuilt only by :func:`set_plan_library`, so lookups are a single dict read.
+    """
+
+    def __init__(self) -> None:
+        self._responses: Dict[Tuple[int, int], bytes] | None = None
+        self._lock = threading.Lock()
+
+    def get(self, risk_score: int, horizon_months: int) -> bytes:
+        responses = self._responses
+        if responses is None:
+            with self._lock:
+                if self._responses is None:
+                    self.rebuild()
+            responses = self._responses
+        return responses[(risk_score, horizon_months)]
+
+    def rebuild(self) -> None:
+        # Readers keep using the previous table until the new one is swapped in.
+        self._responses = {
+            (risk_score, horizon_months): generate_plan(
+                PlanRequest(risk_score=risk_score, horizon_months=horizon_months)
+            )
+            .json()
+            .encode()
+            for risk_score in RISK_SCORES
+            for horizon_months in HORIZON_MONTHS
+        }
+
+
+plan_table = _PlanTable()
+
+
+def set_plan_library(templates: Sequence[PlanTemplate]) -> None:
+    """Replace ``PLAN_LIBRARY`` and rebuild the precomputed responses from it."""
+    global PLAN_LIBRARY
+    PLAN_LIBRARY = tuple(templates)
+    plan_table.rebuild()
+
+
+def plan_response_bytes(request: PlanRequest) -> bytes:
+    """Return the pre-serialized ``PlanResponse`` JSON for ``request``."""
+    return plan_table.get(request.risk_score, request.horizon_months)
+
+
+def _profile_column(payload: Mapping[str, Any], key: str, low: int, high: int) -> np.ndarray:
+    column = np.asarray(payload.get(key))
+    if column.ndim != 1 or column.dtype.kind not in "iu":
+        raise ValueError(f"{key} must be an array of integers")
+    if column.size and (column.min() < low or column.max() > high):
+        raise ValueError(f"{key} must be between {low} and {high}")
+    return column
+
+
+def parse_plan_batch(payload: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Validate a ``PlanBatchRequest`` body with array operations instead of per-item models."""
+    if not isinstance(payload, Mapping):
+        raise ValueError("Request body must be a JSON object")
+    risk_scores = _profile_column(payload, "risk_scores", RISK_SCORES.start, RISK_SCORES.stop - 1)
+    horizons = _profile_column(payload, "horizon_months", HORIZON_MONTHS.start, HORIZON_MONTHS.stop - 1)
+    stablecoins = payload.get("stablecoin_preferences")
+    sizes = {len(risk_scores), len(horizons)} | ({len(stablecoins)} if isinstance(stablecoins, list) else set())
+    if len(sizes) != 1:
+        raise ValueError("risk_scores, horizon_months and stablecoin_preferences must have the same length")
+    if not 1 <= len(risk_scores) <= MAX_BATCH_PROFILES:
+        raise ValueError(f"Batches must contain between 1 and {MAX_BATCH_PROFILES} profiles")
+    return risk_scores, horizons
+
+
+def batch_adjusted_apy(risk_scores: np.ndarray, horizon_months: np.ndarray) -> np.ndarray:
+    """:func:`_adjusted_apy` for every template and profile, shaped (templates, profiles)."""
+    base_apy = np.array([template.base_apy for template in PLAN_LIBRARY])[:, np.newaxis]
+    horizon_bonus = np.minimum(horizon_months / HORIZON_BONUS_MONTHS, HORIZON_BONUS_CAP)
+    risk_multiplier = 1 + (risk_scores - NEUTRAL_RISK_SCORE) * RISK_STEP
+    return _round(base_apy * risk_multiplier + horizon_bonus, 4)
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    """Round like the builtin ``round`` so batch and single plans agree to the last digit.
+
+    ``np.round`` scales before rounding and can flip values sitting on a
+    half-way point; those few distinct values are re-rounded exactly.
+    """
+    scaled = values * 10**digits
+    rounded = np.round(scaled) / 10**digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        unique, inverse = np.unique(values[near_tie], return_inverse=True)
+        rounded[near_tie] = np.array([round(float(value), digits) for value in unique])[inverse]
+    return rounded
+
+
+def generate_plan_batch(risk_scores: np.ndarray, horizon_months: np.ndarray) -> Dict[str, Any]:
+    """Columnar ``PlanBatchResponse`` content for many profiles at once."""
+    return {
+        "templates": [
+            {
+                "name": template.name,
+                "risk_level": template.risk_level,
+                "allocations": _adjusted_allocations(template),
+                "rationale": _rationale(template, NEUTRAL_RISK_SCORE),
+            }
+            for template in PLAN_LIBRARY
+        ],
+        "est_apy": batch_adjusted_apy(risk_scores, horizon_months).tolist(),
+    }
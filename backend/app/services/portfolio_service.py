@@ -2,89 +2,389 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import csv
+import io
+import json
+import zlib
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from decimal import Decimal
-from typing import List
+from typing import Any, Dict, List, Sequence, Set, Tuple
 
+from sqlalchemy import func, insert, tuple_
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
 from web3 import Web3
 
-from app.core.vault_client import ZERO_ADDRESS, get_vault_contract
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.db import async_engine
+from app.core.logger import logger
+from app.core.singleflight import SingleFlight
+from app.core.vault_client import (
+    ZERO_ADDRESS,
+    VaultState,
+    aggregate,
+    aggregate_async,
+    chain_reads,
+    get_async_vault_contract,
+    get_vault_contract,
+    get_vault_state,
+    get_vault_state_async,
+    vault_state_cache,
+)
 from app.models.portfolio import Portfolio, VaultPosition
+from app.models.positions import IndexerCheckpoint
 from app.models.tx import TransactionLog
-from app.schemas.portfolio import ActivityItem, PortfolioSchema, VaultPositionSchema
+from app.schemas.portfolio import ActivityItem, ActivityPage, PortfolioSchema, VaultPositionSchema
+from app.services.indexer_service import CHECKPOINT_NAME, indexed_shares, indexed_shares_async
+from app.services.push_service import publish_activity
+from app.services.snapshot_service import PortfolioSnapshot, invalidate_portfolios, portfolio_snapshots
+from app.services.write_behind_service import get_write_behind
+from app.utils.helpers import etag_matches, strong_etag, to_token_amount
 
-DECIMAL_FACTOR = Decimal(10) ** 18
+EXPORT_FIELDS = ("tx_type", "amount", "vault", "tx_hash", "timestamp")
+EXPORT_BATCH_SIZE = 500
 
+portfolio_builds: SingleFlight[Tuple[str, bool], PortfolioSnapshot] = SingleFlight()
+metrics.register("portfolio_builds", portfolio_builds.snapshot)
+# Strong references keep background refreshes alive until they finish.
+_refreshes: Set[asyncio.Task] = set()
 
-def _to_token_amount(raw_value: int) -> float:
-    if raw_value <= 0:
-        return 0.0
-    return float(Decimal(raw_value) / DECIMAL_FACTOR)
+
+def _checksum(address: str) -> str | None:
+    if not address or address == ZERO_ADDRESS or not Web3.is_address(address):
+        return None
+    try:
+        return Web3.to_checksum_address(address)
+    except ValueError:
+        return None
+
+
+def _position(raw_shares: int, raw_assets: int, state: VaultState | None) -> VaultPosition:
+    apy = 0.0
+    if state is not None and state.total_supply:
+        apy = float(max(state.share_price - Decimal(1), Decimal(0)))
+    return VaultPosition(
+        vault="SynthVault",
+        shares=to_token_amount(int(raw_shares)),
+        asset_value=to_token_amount(int(raw_assets)),
+        apy=apy,
+    )
+
+
+def position_rows(positions: List[VaultPosition]) -> List[Dict[str, Any]]:
+    return [
+        {"vault": pos.vault, "shares": pos.shares, "asset_value": pos.asset_value, "apy": pos.apy}
+        for pos in positions
+    ]
+
+
+def _indexed_position(raw_shares: int, state: VaultState | None) -> List[VaultPosition]:
+    if raw_shares == 0 or state is None:
+        return []
+    raw_assets = raw_shares * state.total_assets // state.total_supply if state.total_supply else raw_shares
+    return [_position(raw_shares, raw_assets, state)]
+
+
+def _index_floor(state: VaultState | None) -> int | None:
+    """Oldest checkpoint whose balances may be priced against ``state``, or None if none may."""
+    if state is None or state.block_number is None:
+        return None
+    return state.block_number - get_settings().indexer_max_lag
+
+
+def _positions_from_index(session: Session, address: str) -> List[VaultPosition] | None:
+    """Positions from the local share index, or None when the index cannot answer.
+
+    The index answers only once its checkpoint is within ``indexer_max_lag``
+    blocks of the vault state the balance is priced against, so a catching-up
+    indexer or an unreadable vault state sends the caller to the chain path.
+    """
+    if not get_settings().indexer_enabled:
+        return None
+    try:
+        state = get_vault_state()
+    except Exception as error:
+        logger.warning("Vault state unavailable for indexed positions: %s", error)
+        return None
+    floor = _index_floor(state)
+    if floor is None:
+        return None
+    raw_shares = indexed_shares(session, address, min_block=floor)
+    return None if raw_shares is None else _indexed_position(raw_shares, state)
+
+
+async def _positions_from_index_async(session: AsyncSession, address: str) -> List[VaultPosition] | None:
+    if not get_settings().indexer_enabled:
+        return None
+    try:
+        state = await get_vault_state_async()
+    except Exception as error:
+        logger.warning("Vault state unavailable for indexed positions: %s", error)
+        return None
+    floor = _index_floor(state)
+    if floor is None:
+        return None
+    raw_shares = await indexed_shares_async(session, address, min_block=floor)
+    return None if raw_shares is None else _indexed_position(raw_shares, state)
 
 
 def _positions_from_chain(address: str) -> List[VaultPosition]:
     contract = get_vault_contract()
-    if contract is None or not address or address == ZERO_ADDRESS:
+    checksum = _checksum(address)
+    if contract is None or checksum is None:
         return []
 
-    if not Web3.is_address(address):
+    try:
+        # maxWithdraw(owner) equals convertToAssets(balanceOf(owner)) for SynthVault,
+        # which lets both per-wallet reads share one batched call.
+        result = aggregate([contract.functions.balanceOf(checksum), contract.functions.maxWithdraw(checksum)])
+        raw_shares, raw_assets = result.values
+        if int(raw_shares) == 0:
+            return []
+        state = get_vault_state(contract, min_block=result.block_number)
+    except Exception:
         return []
+    return [_position(raw_shares, raw_assets, state)]
 
-    try:
-        checksum = Web3.to_checksum_address(address)
-    except ValueError:
+
+async def _positions_from_chain_async(address: str) -> List[VaultPosition]:
+    contract = get_async_vault_contract()
+    checksum = _checksum(address)
+    if contract is None or checksum is None:
         return []
+    return await chain_reads.do(("positions", checksum), lambda: _wallet_positions_async(contract, checksum))
 
+
+async def _wallet_positions_async(contract, checksum: str) -> List[VaultPosition]:
     try:
-        raw_shares = contract.functions.balanceOf(checksum).call()
+        result = await aggregate_async(
+            [contract.functions.balanceOf(checksum), contract.functions.maxWithdraw(checksum)]
+        )
+        raw_shares, raw_assets = result.values
         if int(raw_shares) == 0:
             return []
-        raw_assets = contract.functions.convertToAssets(int(raw_shares)).call()
-        raw_total_assets = contract.functions.totalAssets().call()
-        raw_total_supply = contract.functions.totalSupply().call()
+        state = await get_vault_state_async(contract, min_block=result.block_number)
     except Exception:
         return []
+    return [_position(raw_shares, raw_assets, state)]
 
-    shares = _to_token_amount(int(raw_shares))
-    asset_value = _to_token_amount(int(raw_assets))
-    apy = 0.0
-    if raw_total_supply:
-        try:
-            ratio = Decimal(raw_total_assets) / Decimal(raw_total_supply)
-            apy = float(max(ratio - Decimal(1), Decimal(0)))
-        except Exception:
-            apy = 0.0
 
-    return [
-        VaultPosition(
-            vault="SynthVault",
-            shares=shares,
-            asset_value=asset_value,
-            apy=apy,
-        )
-    ]
+def _encode_cursor(record: TransactionLog) -> str:
+    raw = f"{record.timestamp.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
 
-def _history(session: Session, address: str) -> List[ActivityItem]:
-    records = session.exec(
-        select(TransactionLog).where(TransactionLog.address == address).order_by(TransactionLog.timestamp.desc())
-    ).all()
-    return [
-        ActivityItem(
-            tx_type=record.tx_type,
-            amount=record.amount,
-            vault=record.vault,
-            tx_hash=record.tx_hash,
-            timestamp=record.timestamp,
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        timestamp, record_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(record_id)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ValueError("Invalid history cursor") from error
+
+
+def _history_query(
+    address: str,
+    cursor: str | None = None,
+    tx_type: str | None = None,
+    vault: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> SelectOfScalar[TransactionLog]:
+    query = select(TransactionLog).where(TransactionLog.address == address)
+    if tx_type is not None:
+        query = query.where(TransactionLog.tx_type == tx_type)
+    if vault is not None:
+        query = query.where(TransactionLog.vault == vault)
+    if since is not None:
+        query = query.where(TransactionLog.timestamp >= since)
+    if until is not None:
+        query = query.where(TransactionLog.timestamp < until)
+    if cursor is not None:
+        query = query.where(tuple_(TransactionLog.timestamp, TransactionLog.id) < _decode_cursor(cursor))
+    return query.order_by(TransactionLog.timestamp.desc(), TransactionLog.id.desc())
+
+
+def _activity_item(record: TransactionLog) -> ActivityItem:
+    return ActivityItem(
+        tx_type=record.tx_type,
+        amount=record.amount,
+        vault=record.vault,
+        tx_hash=record.tx_hash,
+        timestamp=record.timestamp,
+    )
+
+
+def history_page(
+    session: Session,
+    address: str,
+    limit: int,
+    cursor: str | None = None,
+    tx_type: str | None = None,
+    vault: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> ActivityPage:
+    """Return up to ``limit`` activity items, newest first, after ``cursor``.
+
+    Pages are keyed on ``(timestamp, id)`` so each one is an index range scan
+    regardless of depth. Raises ``ValueError`` for a malformed cursor.
+    """
+    query = _history_query(address, cursor, tx_type, vault, since, until).limit(limit + 1)
+    return _page(session.exec(query).all(), limit)
+
+
+async def history_page_async(
+    session: AsyncSession,
+    address: str,
+    limit: int,
+    cursor: str | None = None,
+    tx_type: str | None = None,
+    vault: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> ActivityPage:
+    """Async counterpart of :func:`history_page`."""
+    records = await _history_records_async(session, address, limit, cursor, tx_type, vault, since, until)
+    return _page(records, limit)
+
+
+async def history_payload_async(
+    session: AsyncSession,
+    address: str,
+    limit: int,
+    cursor: str | None = None,
+    tx_type: str | None = None,
+    vault: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Dict[str, Any]:
+    """:func:`history_page_async` as plain data shaped like ``ActivityPage``, for the fast serialization path."""
+    records = await _history_records_async(session, address, limit, cursor, tx_type, vault, since, until)
+    return {"items": [_activity_row(record) for record in records[:limit]], "next_cursor": _next_cursor(records, limit)}
+
+
+async def _history_records_async(
+    session: AsyncSession,
+    address: str,
+    limit: int,
+    cursor: str | None = None,
+    tx_type: str | None = None,
+    vault: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> List[TransactionLog]:
+    query = _history_query(address, cursor, tx_type, vault, since, until).limit(limit + 1)
+    return list((await session.exec(query)).all())
+
+
+def _next_cursor(records: List[TransactionLog], limit: int) -> str | None:
+    return _encode_cursor(records[limit - 1]) if len(records) > limit else None
+
+
+def _page(records: List[TransactionLog], limit: int) -> ActivityPage:
+    items = [_activity_item(record) for record in records[:limit]]
+    return ActivityPage(items=items, next_cursor=_next_cursor(records, limit))
+
+
+def _activity_row(record: TransactionLog) -> Dict[str, Any]:
+    return {
+        "tx_type": record.tx_type,
+        "amount": float(record.amount),
+        "vault": record.vault,
+        "tx_hash": record.tx_hash,
+        "timestamp": record.timestamp,
+    }
+
+
+def _history(session: Session, address: str) -> ActivityPage:
+    return history_page(session, address, limit=get_settings().portfolio_history_limit)
+
+
+async def _history_async(session: AsyncSession, address: str) -> List[TransactionLog]:
+    return await _history_records_async(session, address, limit=get_settings().portfolio_history_limit)
+
+
+def _export_rows(
+    engine: Engine,
+    address: str,
+    tx_type: str | None,
+    vault: str | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> Iterator[List[TransactionLog]]:
+    query = _history_query(address, tx_type=tx_type, vault=vault, since=since, until=until)
+    with Session(engine) as session:
+        result = session.exec(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield list(partition)
+            session.expunge_all()
+
+
+def _encode_batch(records: List[TransactionLog], fmt: str) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows(
+            [record.tx_type, record.amount, record.vault, record.tx_hash or "", record.timestamp.isoformat()]
+            for record in records
+        )
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(
+            {
+                "tx_type": record.tx_type,
+                "amount": record.amount,
+                "vault": record.vault,
+                "tx_hash": record.tx_hash,
+                "timestamp": record.timestamp.isoformat(),
+            }
         )
+        + "\n"
         for record in records
-    ]
+    )
 
 
-def build_portfolio(session: Session, address: str) -> PortfolioSchema:
-    positions = _positions_from_chain(address)
-    history = _history(session, address)
+def stream_history_export(
+    engine: Engine,
+    address: str,
+    fmt: str = "ndjson",
+    compress: bool = False,
+    tx_type: str | None = None,
+    vault: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[bytes]:
+    """Yield the full history as NDJSON or CSV chunks, optionally gzip-compressed.
+
+    Rows are read through a server-side cursor in fixed-size batches, so
+    memory stays flat however long the history is. The generator opens its own
+    session because it outlives the request's dependencies.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode()
+        return compressor.compress(data) if compressor is not None else data
+
+    if fmt == "csv":
+        yield emit(",".join(EXPORT_FIELDS) + "\r\n")
+    for records in _export_rows(engine, address, tx_type, vault, since, until):
+        chunk = emit(_encode_batch(records, fmt))
+        if chunk:
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def portfolio_schema(
+    address: str, positions: List[VaultPosition], history: ActivityPage, as_of_block: int | None = None
+) -> PortfolioSchema:
     total_value = sum(position.asset_value for position in positions)
     Portfolio(owner=address, total_value=total_value, positions=positions)
     return PortfolioSchema(
@@ -99,18 +399,229 @@ def build_portfolio(session: Session, address: str) -> PortfolioSchema:
             )
             for pos in positions
         ],
-        history=history,
+        history=history.items,
+        history_next_cursor=history.next_cursor,
+        as_of_block=as_of_block,
     )
 
 
+def build_portfolio(session: Session, address: str) -> PortfolioSchema:
+    positions = _positions_from_index(session, address)
+    if positions is None:
+        positions = _positions_from_chain(address)
+    return portfolio_schema(address, positions, _history(session, address))
+
+
+async def _portfolio_inputs_async(
+    session: AsyncSession, address: str
+) -> Tuple[List[VaultPosition], List[TransactionLog], int | None]:
+    positions = await _positions_from_index_async(session, address)
+    if positions is not None:
+        checkpoint = await session.get(IndexerCheckpoint, CHECKPOINT_NAME)
+        return positions, await _history_async(session, address), checkpoint.block_number
+    positions, records = await asyncio.gather(_positions_from_chain_async(address), _history_async(session, address))
+    # Funded wallets are valued against a state at least as new as their balance read.
+    state = vault_state_cache.peek()
+    return positions, records, state.block_number if state is not None else None
+
+
+async def build_portfolio_async(session: AsyncSession, address: str) -> PortfolioSchema:
+    """Build the portfolio without blocking the event loop on RPC or database round trips."""
+    positions, records, as_of_block = await _portfolio_inputs_async(session, address)
+    return portfolio_schema(address, positions, _page(records, get_settings().portfolio_history_limit), as_of_block)
+
+
+async def build_portfolio_payload_async(session: AsyncSession, address: str) -> Dict[str, Any]:
+    """:func:`build_portfolio_async` as plain data for the fast serialization path."""
+    positions, records, as_of_block = await _portfolio_inputs_async(session, address)
+    return portfolio_payload(address, positions, records, get_settings().portfolio_history_limit, as_of_block)
+
+
+async def portfolio_snapshot(
+    session: AsyncSession, address: str, fast: bool = False, if_none_match: str | None = None
+) -> PortfolioSnapshot | str:
+    """Current portfolio snapshot for ``address``, or just its ETag when ``if_none_match`` still matches.
+
+    Fresh snapshots are returned as is; stale ones are returned immediately
+    while a background task rebuilds them. Without a usable snapshot, an ETag
+    check against the cached vault state may still answer without building;
+    otherwise the caller waits for a (shared) build.
+    """
+    markers = await portfolio_markers_async(session, address)
+    snapshot, stale = portfolio_snapshots.lookup((address, fast), markers)
+    if snapshot is not None:
+        if stale:
+            _refresh_in_background(address, fast)
+        return snapshot.etag if etag_matches(if_none_match, snapshot.etag) else snapshot
+    chain = chain_marker()
+    if chain is not None and etag_matches(if_none_match, portfolio_etag(address, markers, chain)):
+        return portfolio_etag(address, markers, chain)
+    snapshot = await build_portfolio_shared(address, fast)
+    return snapshot.etag if etag_matches(if_none_match, snapshot.etag) else snapshot
+
+
+async def build_portfolio_shared(address: str, fast: bool = False) -> PortfolioSnapshot:
+    """Build ``address``'s portfolio once for all concurrent callers and store it as a snapshot.
+
+    The shared build opens its own session because it may outlive the request
+    that started it, and computes the ETag from the same reads it builds from,
+    so callers that joined late never get older content under a newer tag.
+    ``fast`` selects :func:`build_portfolio_payload_async` over the schema.
+    """
+    return await portfolio_builds.do((address, fast), lambda: _build_snapshot(address, fast))
+
+
+async def _build_snapshot(address: str, fast: bool) -> PortfolioSnapshot:
+    # Taken before reading, so a write landing mid-build keeps this result out of the store.
+    version = portfolio_snapshots.version()
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        markers = await portfolio_markers_async(session, address)
+        portfolio = await (build_portfolio_payload_async if fast else build_portfolio_async)(session, address)
+    # Building may have refreshed the vault state; tag the result with what it was built from.
+    snapshot = PortfolioSnapshot(portfolio_etag(address, markers, chain_marker()), markers, portfolio)
+    portfolio_snapshots.store((address, fast), snapshot, version)
+    return snapshot
+
+
+def _refresh_in_background(address: str, fast: bool) -> None:
+    portfolio_snapshots.refreshing()
+    task = asyncio.create_task(build_portfolio_shared(address, fast))
+    _refreshes.add(task)
+    task.add_done_callback(_refreshed)
+
+
+def _refreshed(task: asyncio.Task) -> None:
+    _refreshes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background portfolio refresh failed", exc_info=task.exception())
+
+
+async def stop_snapshot_refreshes() -> None:
+    """Cancel background refreshes still running at shutdown."""
+    for task in list(_refreshes):
+        task.cancel()
+    await asyncio.gather(*_refreshes, return_exceptions=True)
+
+
+def portfolio_payload(
+    address: str,
+    positions: List[VaultPosition],
+    records: List[TransactionLog],
+    limit: int,
+    as_of_block: int | None = None,
+) -> Dict[str, Any]:
+    """Plain data shaped like ``PortfolioSchema``, built without pydantic.
+
+    Values already have the schema's types, so the result can be encoded
+    directly. ``records`` may hold one row beyond ``limit`` to signal a next page.
+    """
+    return {
+        "owner": address,
+        "total_value": float(sum(position.asset_value for position in positions)),
+        "positions": position_rows(positions),
+        "history": [_activity_row(record) for record in records[:limit]],
+        "history_next_cursor": _next_cursor(records, limit),
+        "as_of_block": as_of_block,
+    }
+
+
+async def portfolio_markers_async(session: AsyncSession, address: str) -> Tuple[int | None, int | None]:
+    """Latest activity id for ``address`` and the last indexed block: two indexed lookups, no RPC."""
+    latest = select(func.max(TransactionLog.id)).where(TransactionLog.address == address)
+    activity_id = (await session.exec(latest)).one()
+    indexed_block = None
+    if get_settings().indexer_enabled:
+        checkpoint = await session.get(IndexerCheckpoint, CHECKPOINT_NAME)
+        indexed_block = checkpoint.block_number if checkpoint is not None else None
+    return activity_id, indexed_block
+
+
+def chain_marker() -> int | str | None:
+    """Block of the cached vault state, without an RPC round trip.
+
+    ``"offline"`` when no vault is configured, since positions are then always
+    empty; ``None`` when the cached state is missing or too old to rely on.
+    States read without a block number are told apart by their fetch time.
+    """
+    if get_async_vault_contract() is None:
+        return "offline"
+    state = vault_state_cache.peek()
+    if state is None:
+        return None
+    return state.block_number if state.block_number is not None else f"t{state.fetched_at}"
+
+
+def portfolio_etag(address: str, markers: Tuple[int | None, int | None], chain: int | str | None) -> str:
+    """Strong ETag over everything a portfolio response is derived from."""
+    return strong_etag("portfolio", address, *markers, chain, get_settings().portfolio_history_limit)
+
+
+def _transaction_row(address: str, amount: float, vault: str, tx_type: str, tx_hash: str | None) -> dict:
+    return {
+        "address": address,
+        "amount": float(amount),
+        "vault": vault,
+        "tx_type": tx_type,
+        "tx_hash": tx_hash,
+        "timestamp": datetime.now(UTC),
+    }
+
+
 def log_activity(session: Session, address: str, amount: float, vault: str, tx_type: str, tx_hash: str | None) -> None:
-    record = TransactionLog(
-        address=address,
-        amount=float(amount),
-        vault=vault,
-        tx_type=tx_type,
-        tx_hash=tx_hash,
-        timestamp=datetime.now(UTC),
-    )
-    session.add(record)
+    row = _transaction_row(address, amount, vault, tx_type, tx_hash)
+    session.add(TransactionLog(**row))
     session.commit()
+    invalidate_portfolios([address])
+    publish_activity([row])
+
+
+async def log_activity_async(
+    session: AsyncSession, address: str, amount: float, vault: str, tx_type: str, tx_hash: str | None
+) -> str:
+    """Log one transaction, handing it to the write-behind queue when that stage is running.
+
+    Returns ``"logged"`` once committed or ``"queued"`` when buffered, and raises
+    :class:`~app.services.write_behind_service.WriteBehindFull` when the queue
+    cannot accept the row in time.
+    """
+    row = _transaction_row(address, amount, vault, tx_type, tx_hash)
+    queue = get_write_behind()
+    if queue is not None:
+        await queue.submit(row)
+        # The flush invalidates again once the row is visible.
+        invalidate_portfolios([address])
+        return "queued"
+    session.add(TransactionLog(**row))
+    await session.commit()
+    invalidate_portfolios([address])
+    publish_activity([row])
+    return "logged"
+
+
+async def log_activity_batch_async(session: AsyncSession, rows: Sequence[Dict]) -> List[bool]:
+    """Insert ``rows`` with one executemany in a single transaction.
+
+    Rows repeating the ``(tx_hash, tx_type, address)`` of an earlier row in the
+    same batch are skipped; rows already in the log are not looked up, since one
+    transaction hash may legitimately carry several deposits. Returns, per row,
+    whether it was inserted.
+    """
+    seen: set[Tuple[str, str, str]] = set()
+    fresh: List[Dict] = []
+    inserted: List[bool] = []
+    for row in rows:
+        key = (row["tx_hash"], row["tx_type"], row["address"])
+        if row["tx_hash"] and key in seen:
+            inserted.append(False)
+            continue
+        seen.add(key)
+        fresh.append(_transaction_row(**row))
+        inserted.append(True)
+    if fresh:
+        connection = await session.connection()
+        await connection.execute(insert(TransactionLog), fresh)
+    await session.commit()
+    invalidate_portfolios(row["address"] for row in fresh)
+    publish_activity(fresh)
+    return inserted
+
@@ -1,31 +1,195 @@
 """Service helpers for risk preference persistence."""
 
+from collections.abc import Mapping
 from datetime import UTC, datetime
+from typing import Any, Dict, Iterable, List, Optional
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core import metrics
+from app.core.cache import MISSING, LRUTTLCache, RedisInvalidator, start_invalidator
+from app.core.config import LOCAL_CACHE_TTL_SECONDS, get_settings
+from app.core.logger import logger
 from app.models.preferences import RiskPreference
 from app.schemas.preferences import RiskPreferencePayload
 
+# Dialects with INSERT ... ON CONFLICT ... RETURNING; others fall back to select-then-write.
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+UPSERT_CHUNK = 500
+UPDATED_COLUMNS = ("risk_level", "risk_score", "horizon_months", "stablecoin_preference", "updated_at")
+INVALIDATION_CHANNEL = "nexora:preferences:invalidate"
+
+settings = get_settings()
+# Read-through cache of detached records keyed by address; ``None`` caches a known miss.
+preference_cache: LRUTTLCache[str, Optional[RiskPreference]] = LRUTTLCache(
+    settings.preference_cache_size, settings.preference_cache_seconds
+)
+metrics.register("preference_cache", preference_cache.snapshot)
+_invalidator: Optional[RedisInvalidator] = None
+
+
+def _detached(record: RiskPreference | None) -> RiskPreference | None:
+    return RiskPreference(**record.model_dump()) if record is not None else None
+
+
+def preference_payload(record: RiskPreference) -> Dict[str, Any]:
+    """``record`` as plain data shaped like ``RiskPreferenceResponse``, for the fast serialization path."""
+    return {
+        "risk_level": record.risk_level,
+        "risk_score": record.risk_score,
+        "horizon_months": record.horizon_months,
+        "stablecoin_preference": record.stablecoin_preference,
+        "address": record.address,
+        "updated_at": record.updated_at,
+    }
+
+
+def _select(address: str):
+    return select(RiskPreference).where(RiskPreference.address == address)
+
 
 def get_preference(session: Session, address: str) -> RiskPreference | None:
-    return session.exec(select(RiskPreference).where(RiskPreference.address == address)).first()
+    """Return the preference for ``address``; cached records are detached and must not be mutated."""
+    cached = preference_cache.get(address)
+    if cached is not MISSING:
+        return cached
+    version = preference_cache.version()
+    record = session.exec(_select(address)).first()
+    preference_cache.store(address, _detached(record), version)
+    return record
 
 
 def _timestamp() -> datetime:
     return datetime.now(UTC)
 
 
-def upsert_preference(session: Session, address: str, payload: RiskPreferencePayload) -> RiskPreference:
-    record = get_preference(session, address)
+def _rows(payloads: Mapping[str, RiskPreferencePayload]) -> List[Dict[str, Any]]:
+    updated_at = _timestamp()
+    return [{"address": address, "updated_at": updated_at, **payload.dict()} for address, payload in payloads.items()]
+
+
+def _upsert_statement(dialect: str, rows: List[Dict[str, Any]]):
+    """One ``INSERT ... ON CONFLICT (address) DO UPDATE ... RETURNING`` for ``rows``."""
+    statement = UPSERT_INSERTS[dialect](RiskPreference).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RiskPreference.address],
+        set_={column: statement.excluded[column] for column in UPDATED_COLUMNS},
+    )
+    return statement.returning(RiskPreference)
+
+
+def _apply(record: RiskPreference | None, row: Dict[str, Any]) -> RiskPreference:
     if record is None:
-        record = RiskPreference(address=address, updated_at=_timestamp(), **payload.dict())
-        session.add(record)
-    else:
-        for key, value in payload.dict().items():
-            setattr(record, key, value)
-        record.updated_at = _timestamp()
-        session.add(record)
+        return RiskPreference(**row)
+    for key, value in row.items():
+        setattr(record, key, value)
+    return record
+
+
+def _in_order(payloads: Mapping[str, RiskPreferencePayload], records: List[RiskPreference]) -> List[RiskPreference]:
+    # RETURNING does not promise the VALUES order.
+    by_address = {record.address: record for record in records}
+    return [by_address[address] for address in payloads]
+
+
+def upsert_preferences(session: Session, payloads: Mapping[str, RiskPreferencePayload]) -> List[RiskPreference]:
+    """Insert or update the preferences of many addresses in one transaction.
+
+    Invalidates the local cache only; writers outside the API process should
+    use the async variant so other workers hear about the change. Returns
+    detached records, which stay readable after the session commits or closes.
+    """
+    rows = _rows(payloads)
+    dialect = session.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        records = [_apply(session.exec(_select(row["address"])).first(), row) for row in rows]
+        session.add_all(records)
+        session.commit()
+        preference_cache.invalidate(payloads)
+        for record in records:
+            session.refresh(record)
+        return [_detached(record) for record in records]
+    records = []
+    for index in range(0, len(rows), UPSERT_CHUNK):
+        statement = _upsert_statement(dialect, rows[index : index + UPSERT_CHUNK])
+        records.extend(session.exec(statement, execution_options={"populate_existing": True}).scalars())
+    # Copied before the commit expires them, so reading them later needs no SELECT.
+    records = [_detached(record) for record in records]
     session.commit()
-    session.refresh(record)
+    preference_cache.invalidate(payloads)
+    return _in_order(payloads, records)
+
+
+def upsert_preference(session: Session, address: str, payload: RiskPreferencePayload) -> RiskPreference:
+    return upsert_preferences(session, {address: payload})[0]
+
+
+async def get_preference_async(session: AsyncSession, address: str) -> RiskPreference | None:
+    cached = preference_cache.get(address)
+    if cached is not MISSING:
+        return cached
+    version = preference_cache.version()
+    record = (await session.exec(_select(address))).first()
+    preference_cache.store(address, _detached(record), version)
     return record
+
+
+async def _invalidate_async(addresses: Iterable[str]) -> None:
+    addresses = list(addresses)
+    preference_cache.invalidate(addresses)
+    if _invalidator is not None:
+        await _invalidator.publish(addresses)
+
+
+async def upsert_preferences_async(
+    session: AsyncSession, payloads: Mapping[str, RiskPreferencePayload]
+) -> List[RiskPreference]:
+    """Async counterpart of :func:`upsert_preferences`."""
+    rows = _rows(payloads)
+    dialect = session.bind.dialect.name
+    if dialect not in UPSERT_INSERTS:
+        records = [_apply((await session.exec(_select(row["address"]))).first(), row) for row in rows]
+        session.add_all(records)
+        await session.commit()
+        await _invalidate_async(payloads)
+        for record in records:
+            await session.refresh(record)
+        return records
+    records = []
+    for index in range(0, len(rows), UPSERT_CHUNK):
+        statement = _upsert_statement(dialect, rows[index : index + UPSERT_CHUNK])
+        result = await session.exec(statement, execution_options={"populate_existing": True})
+        records.extend(result.scalars())
+    await session.commit()
+    await _invalidate_async(payloads)
+    return _in_order(payloads, records)
+
+
+async def upsert_preference_async(
+    session: AsyncSession, address: str, payload: RiskPreferencePayload
+) -> RiskPreference:
+    return (await upsert_preferences_async(session, {address: payload}))[0]
+
+
+async def start_cache_invalidation() -> Optional[RedisInvalidator]:
+    """Join the cross-worker invalidation channel when ``CACHE_INVALIDATION_URL`` is set."""
+    global _invalidator
+    _invalidator = await start_invalidator(settings.cache_invalidation_url, INVALIDATION_CHANNEL, preference_cache)
+    if _invalidator is None and preference_cache.maxsize > 0 and preference_cache.ttl > LOCAL_CACHE_TTL_SECONDS:
+        logger.warning(
+            "Preference cache invalidation is local to this process; other workers may serve stale "
+            "preferences for up to %.0fs after a write",
+            preference_cache.ttl,
+        )
+    return _invalidator
+
+
+async def stop_cache_invalidation(invalidator: Optional[RedisInvalidator]) -> None:
+    global _invalidator
+    if invalidator is None:
+        return
+    if _invalidator is invalidator:
+        _invalidator = None
+    await invalidator.stop()
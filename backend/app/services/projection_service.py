@@ -0,0 +1,157 @@
+"""Monte Carlo projections of plan outcomes."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core import metrics
+from app.core.cache import MISSING, LRUTTLCache
+from app.core.config import get_settings
+from app.models.plan import PlanTemplate
+from app.schemas.plan import PlanProjection, PlanProjectionRequest, PlanProjectionResponse
+from app.services import plan_service
+
+# Annualised volatility per strategy; strategies are simulated as independent lognormal returns.
+STRATEGY_VOLATILITY: Dict[str, float] = {
+    "Stable Yield Vault": 0.02,
+    "Liquidity Buffer": 0.005,
+    "ETH Staking Notes": 0.45,
+    "Momentum Strategies": 0.35,
+    "Creative Economy Index": 0.55,
+}
+DEFAULT_VOLATILITY = 0.3
+PERCENTILES = (5, 25, 50, 75, 95)
+
+settings = get_settings()
+_summaries: LRUTTLCache[Tuple, "SimulationSummary"] = LRUTTLCache(settings.projection_cache_size, math.inf)
+metrics.register("projection_cache", _summaries.snapshot)
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationSummary:
+    """Terminal value statistics per unit invested."""
+
+    mean: float
+    probability_of_loss: float
+    percentiles: Tuple[float, ...]
+
+
+def simulate(
+    weights: Tuple[float, ...],
+    volatilities: Tuple[float, ...],
+    annual_return: float,
+    horizon_months: int,
+    paths: int,
+    seed: int,
+) -> SimulationSummary:
+    """Simulate a monthly rebalanced allocation and summarise its terminal values.
+
+    Each strategy's expected annual growth is ``annual_return``; volatility
+    differs per strategy. Runs in worker processes, so it only takes and
+    returns picklable values.
+    """
+    rng = np.random.default_rng(seed)
+    weight = np.asarray(weights) / sum(weights)
+    sigma = np.asarray(volatilities) / math.sqrt(12)
+    drift = math.log1p(annual_return) / 12 - sigma**2 / 2
+    values = np.ones(paths)
+    for _ in range(horizon_months):
+        values *= np.exp(drift + sigma * rng.standard_normal((paths, len(weight)))) @ weight
+    return SimulationSummary(
+        mean=float(values.mean()),
+        probability_of_loss=float((values < 1).mean()),
+        percentiles=tuple(float(value) for value in np.percentile(values, PERCENTILES)),
+    )
+
+
+def _parameters(template: PlanTemplate) -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    weights = tuple(template.allocations.values())
+    volatilities = tuple(STRATEGY_VOLATILITY.get(name, DEFAULT_VOLATILITY) for name in template.allocations)
+    return weights, volatilities
+
+
+def _portfolio_volatility(template: PlanTemplate) -> float:
+    weights, volatilities = _parameters(template)
+    total = sum(weights)
+    return math.sqrt(sum((weight / total * sigma) ** 2 for weight, sigma in zip(weights, volatilities)))
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # The pool starts inside a running, multithreaded server; forking that
+        # could copy a held lock into a worker, so workers start fresh instead.
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.projection_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_projection_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _summary(template: PlanTemplate, request: PlanProjectionRequest, est_apy: float) -> SimulationSummary:
+    weights, volatilities = _parameters(template)
+    key = (
+        (template.name, template.base_apy, tuple(template.allocations.items())),
+        request.risk_score,
+        request.horizon_months,
+        request.paths,
+    )
+    cached = _summaries.get(key)
+    if cached is not MISSING:
+        return cached
+    # A stable seed keeps results identical across workers and restarts.
+    arguments = (weights, volatilities, est_apy, request.horizon_months, request.paths, zlib.crc32(repr(key).encode()))
+    if request.paths * request.horizon_months * len(weights) <= settings.projection_inline_steps:
+        summary = simulate(*arguments)
+    else:
+        summary = await asyncio.get_running_loop().run_in_executor(_pool(), simulate, *arguments)
+    _summaries.store(key, summary)
+    return summary
+
+
+async def project_plans(request: PlanProjectionRequest) -> PlanProjectionResponse:
+    """Project terminal value distributions for every plan template."""
+    templates = tuple(plan_service.PLAN_LIBRARY)
+    est_apys = [
+        plan_service._adjusted_apy(template.base_apy, request.risk_score, request.horizon_months)
+        for template in templates
+    ]
+    summaries = await asyncio.gather(
+        *(_summary(template, request, est_apy) for template, est_apy in zip(templates, est_apys))
+    )
+    amount = request.initial_amount
+    return PlanProjectionResponse(
+        horizon_months=request.horizon_months,
+        paths=request.paths,
+        initial_amount=amount,
+        projections=[
+            PlanProjection(
+                name=template.name,
+                risk_level=template.risk_level,
+                est_apy=est_apy,
+                volatility=round(_portfolio_volatility(template), 4),
+                mean=round(summary.mean * amount, 2),
+                probability_of_loss=round(summary.probability_of_loss, 4),
+                percentiles={
+                    f"p{percentile}": round(value * amount, 2)
+                    for percentile, value in zip(PERCENTILES, summary.percentiles)
+                },
+            )
+            for template, est_apy, summary in zip(templates, est_apys, summaries)
+        ],
+    )
@@ -0,0 +1,223 @@
+"""Fan-out of portfolio updates to SSE and WebSocket subscribers.
+
+Each connection holds one small bounded queue; an idle subscriber costs that
+queue and a set entry. Events are encoded once per publish and the same
+frame is shared by every subscriber of the address. A subscriber that falls
+behind loses its oldest frames rather than growing without bound.
+
+uvicorn waits for in-flight responses, open streams included, before it runs
+the lifespan shutdown, so the hub is also closed straight from the exit
+signal handlers installed by :func:`close_on_exit_signals`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import signal
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.core import metrics
+from app.core.config import get_settings
+
+ACTIVITY_FIELDS = ("tx_type", "amount", "vault", "tx_hash", "timestamp")
+EXIT_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+class TooManySubscribers(RuntimeError):
+    """Raised when the worker already serves ``PUSH_MAX_SUBSCRIBERS`` connections."""
+
+
+@dataclass(frozen=True, slots=True)
+class PushMessage:
+    event: str
+    data: str
+
+    @property
+    def sse(self) -> str:
+        return f"event: {self.event}\ndata: {self.data}\n\n"
+
+    @property
+    def websocket(self) -> str:
+        return f'{{"event":"{self.event}","data":{self.data}}}'
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def encode(event: str, payload: Any) -> PushMessage:
+    return PushMessage(event, json.dumps(payload, separators=(",", ":"), default=_default))
+
+
+class Subscription:
+    """One connection's view of the hub; iterate it to receive messages until the hub closes."""
+
+    __slots__ = ("address", "_queue", "_loop", "dropped")
+
+    def __init__(self, address: str, size: int) -> None:
+        self.address = address
+        self._queue: asyncio.Queue[Optional[PushMessage]] = asyncio.Queue(maxsize=size)
+        self._loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[PushMessage]:
+        """Next message, ``None`` once the hub is closing; raises ``TimeoutError`` when idle for ``timeout``."""
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    def deliver(self, message: Optional[PushMessage]) -> None:
+        """Queue ``message`` from any thread."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(message)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: Optional[PushMessage]) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+
+
+class PushHub:
+    def __init__(self, queue_size: int, max_subscribers: int) -> None:
+        self._queue_size = queue_size
+        self._max_subscribers = max_subscribers
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        # Subscribed addresses with new activity, waiting for the vault watcher to revalue them.
+        self._dirty: Set[str] = set()
+        self._closing = False
+        self._count = 0
+        self._published = 0
+        self._delivered = 0
+        self._dropped = 0
+
+    def subscribe(self, address: str) -> Subscription:
+        if self._count >= self._max_subscribers:
+            raise TooManySubscribers("Too many push subscribers on this worker")
+        subscription = Subscription(address, self._queue_size)
+        self._subscribers[address].add(subscription)
+        self._count += 1
+        if self._closing:
+            subscription.deliver(None)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.address)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.address]
+            self._dirty.discard(subscription.address)
+        self._count -= 1
+        self._dropped += subscription.dropped
+
+    def addresses(self) -> List[str]:
+        return list(self._subscribers)
+
+    def has_subscribers(self, address: str) -> bool:
+        return address in self._subscribers
+
+    def mark_dirty(self, address: str) -> None:
+        if address in self._subscribers:
+            self._dirty.add(address)
+
+    def take_dirty(self) -> List[str]:
+        """Subscribed addresses marked since the last call."""
+        dirty, self._dirty = self._dirty, set()
+        return [address for address in dirty if address in self._subscribers]
+
+    def publish(self, address: str, message: PushMessage) -> None:
+        subscribers = tuple(self._subscribers.get(address, ()))
+        if not subscribers:
+            return
+        self._published += 1
+        for subscription in subscribers:
+            subscription.deliver(message)
+        self._delivered += len(subscribers)
+
+    def close(self) -> None:
+        """Ask every open stream, and any opened from now on, to finish, e.g. at shutdown."""
+        self._closing = True
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.deliver(None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "addresses": len(self._subscribers),
+            "subscribers": self._count,
+            "published": self._published,
+            "delivered": self._delivered,
+            "dropped": self._dropped
+            + sum(subscription.dropped for subscribers in self._subscribers.values() for subscription in subscribers),
+        }
+
+
+settings = get_settings()
+push_hub = PushHub(settings.push_queue_size, settings.push_max_subscribers)
+metrics.register("push_hub", push_hub.snapshot)
+
+
+def _by_address(rows: Iterable[Dict[str, Any]]) -> Iterator[tuple[str, List[Dict[str, Any]]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        if push_hub.has_subscribers(row["address"]):
+            grouped[row["address"]].append({field: row.get(field) for field in ACTIVITY_FIELDS})
+    for address, items in grouped.items():
+        # Newest first, like the history endpoints.
+        yield address, items[::-1]
+
+
+def publish_activity(rows: Iterable[Dict[str, Any]]) -> None:
+    """Push newly visible ``TransactionLog`` rows to subscribers of their addresses as ``activity`` events.
+
+    The addresses are also marked for the vault watcher, which follows up with
+    their revalued ``positions`` on its next poll.
+    """
+    for address, items in _by_address(rows):
+        push_hub.publish(address, encode("activity", {"address": address, "items": items}))
+        push_hub.mark_dirty(address)
+
+
+def close_on_exit_signals() -> Callable[[], None]:
+    """Close :data:`push_hub` as soon as SIGINT or SIGTERM arrives; returns a function undoing this.
+
+    The previous handlers still run afterwards. Handlers can only be installed
+    from the main thread, so elsewhere (e.g. under ``TestClient``) this does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+    loop = asyncio.get_running_loop()
+    previous: Dict[int, Any] = {}
+
+    def handle(signum: int, frame: Any) -> None:
+        loop.call_soon_threadsafe(push_hub.close)
+        handler = previous[signum]
+        if callable(handler):
+            handler(signum, frame)
+        elif handler == signal.SIG_DFL:
+            signal.signal(signum, handler)
+            signal.raise_signal(signum)
+
+    for signum in EXIT_SIGNALS:
+        previous[signum] = signal.signal(signum, handle)
+
+    def restore() -> None:
+        for signum, handler in previous.items():
+            if signal.getsignal(signum) is handle:
+                signal.signal(signum, handler)
+
+    return restore
@@ -0,0 +1,275 @@
+"""Fleet-wide allocation drift against the plan matching each stored risk preference.
+
+A wallet's exposure is its vault value spread over each vault's strategy mix
+in :data:`VAULT_STRATEGIES`. A wallet whose whole exposure sits in a single
+strategy drifts from its plan by an amount fixed by the plan alone, the same
+for every such wallet, so it is counted but never scored. SynthVault maps to one
+strategy today, so the job flags nothing until vaults report a real mix.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Protocol, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.logger import logger
+from app.core.vault_client import VaultState, aggregate
+from app.models.preferences import RiskPreference
+from app.models.rebalance import RebalanceRecommendation
+from app.services import plan_service
+from app.services.indexer_service import index_current, indexed_share_balances
+from app.services.portfolio_service import _index_floor
+from app.utils.helpers import DECIMAL_FACTOR
+
+# Mix of PLAN_LIBRARY strategies that each on-chain vault position counts towards.
+VAULT_STRATEGIES: Dict[str, Dict[str, float]] = {"SynthVault": {"Stable Yield Vault": 1.0}}
+MULTICALL_CHUNK = 500
+
+
+class PositionSource(Protocol):
+    """Bulk share balances for a chunk of wallets."""
+
+    def shares(self, addresses: Sequence[str]) -> Dict[str, int]:
+        ...
+
+
+class IndexLagging(RuntimeError):
+    """Raised when the event index is too far behind the vault state balances are priced against."""
+
+
+class IndexPositionSource:
+    """Reads balances maintained by the event indexer, only while it is within ``indexer_max_lag`` of ``state``."""
+
+    def __init__(self, engine: Engine, state: Optional[VaultState]) -> None:
+        self._engine = engine
+        self._min_block = _index_floor(state)
+
+    def current(self) -> bool:
+        if self._min_block is None:
+            return False
+        with Session(self._engine) as session:
+            return index_current(session, self._min_block)
+
+    def shares(self, addresses: Sequence[str]) -> Dict[str, int]:
+        balances = None
+        if self._min_block is not None:
+            with Session(self._engine) as session:
+                balances = indexed_share_balances(session, addresses, min_block=self._min_block)
+        if balances is None:
+            raise IndexLagging("Share index is behind the vault state")
+        return {address: shares for address, shares in balances.items() if shares}
+
+
+class ChainPositionSource:
+    """Reads ``balanceOf`` through Multicall3, every chunk pinned to the same block."""
+
+    def __init__(self, contract, block_number: Optional[int]) -> None:
+        self._contract = contract
+        self._block = block_number if block_number is not None else "latest"
+
+    def shares(self, addresses: Sequence[str]) -> Dict[str, int]:
+        balances: Dict[str, int] = {}
+        for index in range(0, len(addresses), MULTICALL_CHUNK):
+            chunk = addresses[index : index + MULTICALL_CHUNK]
+            calls = [
+                self._contract.functions.balanceOf(self._contract.w3.to_checksum_address(address))
+                for address in chunk
+            ]
+            result = aggregate(calls, block_identifier=self._block, allow_failure=True)
+            balances.update((address, int(value)) for address, value in zip(chunk, result.values) if value)
+        return balances
+
+
+@dataclass(slots=True)
+class RebalanceStats:
+    addresses: int = 0
+    funded: int = 0
+    single_strategy: int = 0
+    flagged: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    @property
+    def addresses_per_second(self) -> float:
+        return self.addresses / self.elapsed
+
+
+@dataclass(frozen=True, slots=True)
+class PlanTargets:
+    """The allocations ``/plan`` serves for ``PLAN_LIBRARY`` as a (templates, strategies) weight matrix."""
+
+    names: Tuple[str, ...]
+    strategies: Tuple[str, ...]
+    weights: np.ndarray
+    by_risk_level: Dict[str, int]
+    vault_mix: np.ndarray
+
+    @classmethod
+    def from_library(cls) -> "PlanTargets":
+        library = tuple(plan_service.PLAN_LIBRARY)
+        allocations = [plan_service._adjusted_allocations(template) for template in library]
+        names = [name for allocation in allocations for name in allocation]
+        vault_names = [name for mix in VAULT_STRATEGIES.values() for name in mix]
+        # Vault strategies missing from every plan still get a column, with a zero target.
+        strategies = tuple(dict.fromkeys([*names, *vault_names]))
+        weights = np.zeros((len(library), len(strategies)))
+        for row, allocation in enumerate(allocations):
+            for name, weight in allocation.items():
+                weights[row, strategies.index(name)] = weight
+        weights /= weights.sum(axis=1, keepdims=True)
+        by_risk_level: Dict[str, int] = {}
+        for row, template in enumerate(library):
+            by_risk_level.setdefault(template.risk_level, row)
+        vault_mix = np.zeros(len(strategies))
+        for name, weight in VAULT_STRATEGIES["SynthVault"].items():
+            vault_mix[strategies.index(name)] = weight
+        vault_mix /= vault_mix.sum()
+        return cls(tuple(template.name for template in library), strategies, weights, by_risk_level, vault_mix)
+
+
+def allocation_drift(
+    holdings: np.ndarray, targets: np.ndarray, plans: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Drift of each holdings row from its target plan's weights.
+
+    Returns the total variation distance (half the L1 gap), the index of the
+    most mis-weighted strategy and that strategy's actual minus target weight.
+    """
+    totals = holdings.sum(axis=1, keepdims=True)
+    weights = np.divide(holdings, totals, out=np.zeros_like(holdings), where=totals > 0)
+    gap = weights - targets[plans]
+    drift = 0.5 * np.abs(gap).sum(axis=1)
+    worst = np.abs(gap).argmax(axis=1)
+    return drift, worst, gap[np.arange(len(gap)), worst]
+
+
+class Rebalancer:
+    """Streams preferences in keyset-ordered chunks and flags wallets whose drift exceeds ``threshold``.
+
+    Worker threads load positions and compute drift; the coordinating thread
+    writes each chunk's recommendations, keeping at most ``workers * 2`` chunks
+    in memory at once.
+    """
+
+    def __init__(
+        self,
+        source: PositionSource,
+        engine: Engine,
+        state: Optional[VaultState],
+        threshold: float,
+        workers: int = 4,
+        chunk_size: int = 5000,
+    ) -> None:
+        self._source = source
+        self._engine = engine
+        self._state = state
+        self._threshold = threshold
+        self._workers = max(workers, 1)
+        self._chunk_size = max(chunk_size, 1)
+
+    def run(self) -> RebalanceStats:
+        stats = RebalanceStats()
+        run_at = datetime.now(UTC)
+        targets = PlanTargets.from_library()
+        if all(len(mix) == 1 for mix in VAULT_STRATEGIES.values()):
+            logger.warning("Every vault maps to a single strategy, so no wallet has a drift to score")
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="rebalance") as pool:
+            in_flight: Set[Future] = set()
+            for chunk in self._preference_chunks():
+                if len(in_flight) >= self._workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._store_all(done, stats)
+                in_flight.add(pool.submit(self._evaluate, chunk, targets, run_at))
+            self._store_all(in_flight, stats)
+
+        with Session(self._engine) as session:
+            # Rows not rewritten by this run belong to wallets whose preference is gone.
+            session.execute(delete(RebalanceRecommendation).where(RebalanceRecommendation.created_at < run_at))
+            session.commit()
+        logger.info(
+            "Rebalance checked %s addresses (%s funded, %s in a single strategy, %s flagged) in %.1fs, "
+            "%.0f addresses/s",
+            stats.addresses,
+            stats.funded,
+            stats.single_strategy,
+            stats.flagged,
+            stats.elapsed,
+            stats.addresses_per_second,
+        )
+        return stats
+
+    def _preference_chunks(self) -> Iterator[List[Tuple[str, str]]]:
+        last_id = 0
+        while True:
+            query = (
+                select(RiskPreference.id, RiskPreference.address, RiskPreference.risk_level)
+                .where(RiskPreference.id > last_id)
+                .order_by(RiskPreference.id)
+                .limit(self._chunk_size)
+            )
+            # A short session per chunk so no read transaction stays open while results are written.
+            with Session(self._engine) as session:
+                rows = session.exec(query).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [(address, risk_level) for _, address, risk_level in rows]
+
+    def _evaluate(
+        self, chunk: List[Tuple[str, str]], targets: PlanTargets, run_at: datetime
+    ) -> Tuple[List[str], int, int, List[Dict[str, Any]]]:
+        addresses = [address for address, _ in chunk]
+        shares = self._source.shares(addresses)
+        price = float(self._state.share_price) if self._state is not None else 1.0
+        raw_shares = np.array([shares.get(address, 0) for address in addresses], dtype=float)
+        values = raw_shares * price / float(DECIMAL_FACTOR)
+
+        # SynthVault is the only on-chain position, so its mix spreads the whole known value.
+        holdings = values[:, np.newaxis] * targets.vault_mix
+        plans = np.array([targets.by_risk_level.get(level, -1) for _, level in chunk])
+        funded = (values > 0) & (plans >= 0)
+        scored = funded & (np.count_nonzero(holdings, axis=1) > 1)
+
+        drift, worst, delta = allocation_drift(holdings[scored], targets.weights, plans[scored])
+        rows = [
+            {
+                "address": address,
+                "plan": targets.names[plan],
+                "drift": round(float(amount), 4),
+                "strategy": targets.strategies[strategy],
+                "strategy_delta": round(float(gap), 4),
+                "total_value": float(total),
+                "block_number": self._state.block_number if self._state is not None else None,
+                "created_at": run_at,
+            }
+            for address, plan, amount, strategy, gap, total in zip(
+                np.asarray(addresses)[scored], plans[scored], drift, worst, delta, values[scored]
+            )
+            if amount >= self._threshold
+        ]
+        return addresses, int(funded.sum()), int((funded & ~scored).sum()), rows
+
+    def _store_all(self, futures: Set[Future], stats: RebalanceStats) -> None:
+        for future in futures:
+            addresses, funded, single_strategy, rows = future.result()
+            with Session(self._engine) as session:
+                session.execute(delete(RebalanceRecommendation).where(RebalanceRecommendation.address.in_(addresses)))
+                if rows:
+                    session.execute(insert(RebalanceRecommendation), rows)
+                session.commit()
+            stats.addresses += len(addresses)
+            stats.funded += funded
+            stats.single_strategy += single_strategy
+            stats.flagged += len(rows)
@@ -0,0 +1,112 @@
+"""Per-address portfolio snapshots served stale-while-revalidate.
+
+A snapshot is fresh for ``PORTFOLIO_SNAPSHOT_FRESH`` seconds and may then be
+served stale, while a background rebuild runs, for ``PORTFOLIO_SNAPSHOT_STALE``
+seconds more. Either way it is only served while the address's activity and
+index markers still match the ones it was built from, so writes made through
+another worker are noticed on the next request. Local writes also drop the
+snapshot outright through :func:`invalidate_portfolios`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from app.core import metrics
+from app.core.cache import MISSING, LRUTTLCache
+from app.core.config import get_settings
+
+
+@dataclass(frozen=True, slots=True)
+class PortfolioSnapshot:
+    etag: str
+    markers: Tuple[Hashable, ...]
+    body: Any
+    built_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.built_at
+
+
+class SnapshotStore:
+    """Snapshots keyed by ``(address, fast)``, on top of an LRU whose TTL spans both windows.
+
+    Builds are versioned per address: :meth:`store` drops a snapshot only if
+    its own address was invalidated after :meth:`version` was read, so writes
+    to one address do not discard builds in flight for the others. The most
+    recently invalidated addresses are remembered; once one is forgotten, builds
+    started before its invalidation are dropped for every address.
+    """
+
+    def __init__(self, maxsize: int, fresh: float, stale: float) -> None:
+        self.fresh = fresh
+        self._cache: LRUTTLCache[Tuple[str, bool], PortfolioSnapshot] = LRUTTLCache(maxsize, fresh + stale)
+        self._generation = 0
+        # address -> generation of its latest invalidation
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._max_invalidated = max(maxsize, 1)
+        self._floor = 0
+        self._lock = threading.Lock()
+        self._stale_hits = 0
+        self._refreshes = 0
+
+    def version(self) -> int:
+        return self._generation
+
+    def lookup(self, key: Tuple[str, bool], markers: Tuple[Hashable, ...]) -> Tuple[Optional[PortfolioSnapshot], bool]:
+        """Return the usable snapshot for ``key``, if any, and whether it is stale."""
+        snapshot = self._cache.get(key)
+        if snapshot is MISSING or snapshot.markers != markers:
+            return None, False
+        stale = snapshot.age > self.fresh
+        if stale:
+            self._stale_hits += 1
+        return snapshot, stale
+
+    def store(self, key: Tuple[str, bool], snapshot: PortfolioSnapshot, version: int) -> None:
+        with self._lock:
+            if version < self._floor or self._invalidated.get(key[0], -1) > version:
+                return
+            self._cache.store(key, snapshot)
+
+    def refreshing(self) -> None:
+        self._refreshes += 1
+
+    def invalidate(self, addresses: Iterable[str]) -> None:
+        addresses = set(addresses)
+        with self._lock:
+            self._generation += 1
+            for address in addresses:
+                self._invalidated[address] = self._generation
+                self._invalidated.move_to_end(address)
+            while len(self._invalidated) > self._max_invalidated:
+                _, self._floor = self._invalidated.popitem(last=False)
+            self._cache.invalidate([(address, fast) for address in addresses for fast in (False, True)])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            self._cache.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self._cache.snapshot(), "stale_hits": self._stale_hits, "refreshes": self._refreshes}
+
+
+settings = get_settings()
+portfolio_snapshots = SnapshotStore(
+    settings.portfolio_snapshot_size, settings.portfolio_snapshot_fresh, settings.portfolio_snapshot_stale
+)
+metrics.register("portfolio_snapshots", portfolio_snapshots.snapshot)
+
+
+def invalidate_portfolios(addresses: Iterable[str]) -> None:
+    """Drop snapshots of ``addresses`` after their activity changed."""
+    portfolio_snapshots.invalidate(addresses)
@@ -1,8 +1,12 @@
 """Transaction service for deposit/withdraw logging."""
 
+from typing import List
+
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.services.portfolio_service import log_activity
+from app.schemas.tx import TransactionBatchItem
+from app.services.portfolio_service import log_activity, log_activity_async, log_activity_batch_async
 
 
 def record_deposit(session: Session, address: str, amount: float, vault: str, tx_hash: str | None) -> None:
@@ -11,3 +15,35 @@ def record_deposit(session: Session, address: str, amount: float, vault: str, tx
 
 def record_withdrawal(session: Session, address: str, amount: float, vault: str, tx_hash: str | None) -> None:
     log_activity(session, address=address, amount=amount, vault=vault, tx_type="withdraw", tx_hash=tx_hash)
+
+
+async def record_deposit_async(
+    session: AsyncSession, address: str, amount: float, vault: str, tx_hash: str | None
+) -> str:
+    return await log_activity_async(
+        session, address=address, amount=amount, vault=vault, tx_type="deposit", tx_hash=tx_hash
+    )
+
+
+async def record_withdrawal_async(
+    session: AsyncSession, address: str, amount: float, vault: str, tx_hash: str | None
+) -> str:
+    return await log_activity_async(
+        session, address=address, amount=amount, vault=vault, tx_type="withdraw", tx_hash=tx_hash
+    )
+
+
+async def record_batch_async(session: AsyncSession, items: List[TransactionBatchItem]) -> List[str]:
+    """Log a batch of deposits/withdrawals in one transaction, returning a status per item."""
+    rows = [
+        {
+            "address": item.address.lower(),
+            "amount": float(item.amount),
+            "vault": item.vault,
+            "tx_type": item.type,
+            "tx_hash": item.tx_hash,
+        }
+        for item in items
+    ]
+    inserted = await log_activity_batch_async(session, rows)
+    return ["logged" if ok else "duplicate" for ok in inserted]
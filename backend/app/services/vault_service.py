@@ -0,0 +1,29 @@
+"""Vault service exposing shared on-chain vault figures."""
+
+from __future__ import annotations
+
+from app.core.config import get_settings
+from app.core.vault_client import get_vault_state_async
+from app.schemas.vault import VaultStatsSchema
+from app.utils.helpers import to_token_amount
+
+
+async def build_vault_stats() -> VaultStatsSchema | None:
+    try:
+        state = await get_vault_state_async()
+    except Exception:
+        return None
+    if state is None:
+        return None
+
+    total_assets = to_token_amount(state.total_assets)
+    return VaultStatsSchema(
+        vault=get_settings().vault_address,
+        block_number=state.block_number,
+        total_assets=total_assets,
+        total_supply=to_token_amount(state.total_supply),
+        share_price=float(state.share_price),
+        tvl=total_assets,
+        deposit_cap=to_token_amount(state.deposit_cap),
+        paused=state.paused,
+    )
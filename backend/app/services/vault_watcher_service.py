@@ -0,0 +1,105 @@
+"""Watches the vault share price and pushes revalued positions to subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.core.vault_client import VaultState, aggregate_async, get_async_vault_contract, get_vault_state_async
+from app.services.indexer_service import indexed_share_balances_async
+from app.services.portfolio_service import _checksum, _index_floor, _indexed_position, position_rows
+from app.services.push_service import encode, push_hub
+
+SHARES_CHUNK = 500
+
+
+class VaultWatcher:
+    """Polls the shared vault state and, when the share price moves, revalues every subscribed wallet.
+
+    Wallets with new logged activity are revalued on the next poll even if the
+    price held. Nothing is read while no one is subscribed. Share balances come from the
+    event index when it runs, otherwise from one multicall per chunk of wallets.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        self._share_price: Optional[Decimal] = None
+
+    async def poll_once(self) -> int:
+        """Check the share price once; returns how many wallets were sent new positions."""
+        if not push_hub.addresses():
+            return 0
+        state = await get_vault_state_async()
+        if state is None:
+            return 0
+        dirty = push_hub.take_dirty()
+        previous, self._share_price = self._share_price, state.share_price
+        if previous is not None and previous != state.share_price:
+            return await self.publish_positions(state)
+        return await self.publish_positions(state, dirty) if dirty else 0
+
+    async def publish_positions(self, state: VaultState, addresses: Optional[List[str]] = None) -> int:
+        """Send ``positions`` to ``addresses``, by default every subscribed one."""
+        addresses = push_hub.addresses() if addresses is None else addresses
+        published = 0
+        for index in range(0, len(addresses), SHARES_CHUNK):
+            chunk = addresses[index : index + SHARES_CHUNK]
+            for address, raw_shares in (await self._shares(chunk, state)).items():
+                positions = _indexed_position(raw_shares, state)
+                payload = {
+                    "address": address,
+                    "block": state.block_number,
+                    "total_value": float(sum(position.asset_value for position in positions)),
+                    "positions": position_rows(positions),
+                }
+                push_hub.publish(address, encode("positions", payload))
+                published += 1
+        return published
+
+    async def _shares(self, addresses: List[str], state: VaultState) -> Dict[str, int]:
+        floor = _index_floor(state)
+        if get_settings().indexer_enabled and floor is not None:
+            async with AsyncSession(self._engine) as session:
+                balances = await indexed_share_balances_async(session, addresses, min_block=floor)
+            if balances is not None:
+                return balances
+        contract = get_async_vault_contract()
+        wallets = [(address, _checksum(address)) for address in addresses]
+        wallets = [(address, checksum) for address, checksum in wallets if checksum is not None]
+        if contract is None or not wallets:
+            return {}
+        result = await aggregate_async(
+            [contract.functions.balanceOf(checksum) for _, checksum in wallets], allow_failure=True
+        )
+        return {address: int(value or 0) for (address, _), value in zip(wallets, result.values)}
+
+
+async def run_vault_watcher(watcher: VaultWatcher, interval: float) -> None:
+    while True:
+        try:
+            await watcher.poll_once()
+        except Exception as error:
+            logger.error("Vault watcher poll failed: %s", error)
+        await asyncio.sleep(interval)
+
+
+def start_vault_watcher(engine: AsyncEngine) -> Optional[asyncio.Task]:
+    """Start pushing share price changes when a vault is configured."""
+    if get_async_vault_contract() is None:
+        return None
+    return asyncio.create_task(run_vault_watcher(VaultWatcher(engine), get_settings().vault_watch_interval))
+
+
+async def stop_vault_watcher(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
@@ -0,0 +1,241 @@
+"""Write-behind queue that group-commits ``TransactionLog`` rows."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import metrics
+from app.core.config import get_settings
+from app.core.logger import logger
+from app.models.tx import TransactionLog
+from app.services.push_service import publish_activity
+from app.services.snapshot_service import invalidate_portfolios
+
+# Flushes retry indefinitely while running; only a shutdown gives up after this many attempts.
+MAX_FLUSH_ATTEMPTS = 3
+FLUSH_RETRY_SECONDS = 0.5
+MAX_FLUSH_BACKOFF_SECONDS = 10.0
+
+
+class WriteBehindFull(RuntimeError):
+    """Raised when the queue stays full for longer than the enqueue timeout."""
+
+
+class WriteBehindQueue:
+    """Buffers transaction rows and writes them in one transaction per batch.
+
+    A batch is flushed once ``batch_size`` rows are waiting or ``flush_interval``
+    seconds after its first row arrived, whichever comes first. Producers block
+    for up to ``enqueue_timeout`` seconds while the queue holds ``max_size``
+    rows, which is the backpressure callers see as :class:`WriteBehindFull`.
+
+    Accepted rows are never discarded. A failing batch is retried with backoff
+    and stays ahead of everything queued after it, so the queue fills up and
+    producers are pushed back while the database is unavailable. Rows that
+    still cannot be written at shutdown are appended to ``spill_path`` as JSON
+    lines and written first on the next start.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        enqueue_timeout: float = 1.0,
+        spill_path: Union[str, Path, None] = None,
+    ) -> None:
+        self._engine = engine
+        self._spill_path = Path(spill_path if spill_path is not None else get_settings().write_behind_spill_path)
+        self._stopping = False
+        self._queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=max_size)
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval
+        self._enqueue_timeout = enqueue_timeout
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._buffer: List[Dict[str, Any]] = []
+        self._rejected = 0
+        self._flushes = 0
+        self._rows = 0
+        self._failures = 0
+        self._spilled = 0
+        self._recovered = 0
+        self._last_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._recover()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting work and flush everything still buffered, spilling what cannot be written."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._inflight is not None:
+            await self._inflight
+        rows, self._buffer = self._buffer, []
+        await self._flush(rows)
+        while not self._queue.empty():
+            await self._flush(self._take(self._batch_size))
+
+    async def submit(self, row: Dict[str, Any]) -> None:
+        try:
+            await asyncio.wait_for(self._queue.put(row), timeout=self._enqueue_timeout)
+        except asyncio.TimeoutError as error:
+            self._rejected += 1
+            raise WriteBehindFull("Transaction log queue is full") from error
+
+    def _take(self, limit: int) -> List[Dict[str, Any]]:
+        rows = []
+        while len(rows) < limit and not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _collect(self) -> None:
+        # Rows live on the instance until flushed so stop() can pick up a partial batch.
+        if not self._buffer:
+            self._buffer.append(await self._queue.get())
+        deadline = time.monotonic() + self._flush_interval
+        while len(self._buffer) < self._batch_size:
+            self._buffer.extend(self._take(self._batch_size - len(self._buffer)))
+            remaining = deadline - time.monotonic()
+            if len(self._buffer) >= self._batch_size or remaining <= 0:
+                break
+            try:
+                self._buffer.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self) -> None:
+        while True:
+            await self._collect()
+            rows, self._buffer = self._buffer, []
+            # Shield the write so a shutdown cancellation never interrupts a batch mid-insert.
+            self._inflight = asyncio.ensure_future(self._flush(rows))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                async with self._engine.begin() as connection:
+                    await connection.execute(insert(TransactionLog), rows)
+            except Exception:
+                self._failures += 1
+                # Once shutdown has spilled one batch, the rest follow without waiting out their retries.
+                if self._stopping and (attempt >= MAX_FLUSH_ATTEMPTS or self._spilled):
+                    self._spill(rows)
+                    return
+                logger.warning("Transaction log flush failed (attempt %s), retrying", attempt, exc_info=True)
+                await asyncio.sleep(min(FLUSH_RETRY_SECONDS * 2 ** (attempt - 1), MAX_FLUSH_BACKOFF_SECONDS))
+                continue
+            invalidate_portfolios(row["address"] for row in rows)
+            publish_activity(rows)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._flushes += 1
+            self._rows += len(rows)
+            self._last_flush_ms = elapsed_ms
+            self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            return
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        with self._spill_path.open("a", encoding="utf-8") as handle:
+            for row in rows:
+                handle.write(json.dumps(row, default=_encode_value) + "\n")
+        self._spilled += len(rows)
+        logger.error("Spilled %s unwritten transaction logs to %s", len(rows), self._spill_path)
+
+    def _recover(self) -> None:
+        """Load rows spilled by an earlier shutdown ahead of anything queued now."""
+        if not self._spill_path.exists():
+            return
+        with self._spill_path.open("r", encoding="utf-8") as handle:
+            rows = [_decode_row(json.loads(line)) for line in handle if line.strip()]
+        self._spill_path.unlink()
+        self._buffer = rows + self._buffer
+        self._recovered += len(rows)
+        logger.info("Recovered %s spilled transaction logs from %s", len(rows), self._spill_path)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "flushes": self._flushes,
+            "rows": self._rows,
+            "rejected": self._rejected,
+            "failures": self._failures,
+            "spilled": self._spilled,
+            "recovered": self._recovered,
+            "last_flush_ms": round(self._last_flush_ms, 2),
+            "max_flush_ms": round(self._max_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self._flushes, 2) if self._flushes else None,
+        }
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _decode_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(row.get("timestamp"), str):
+        row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+_queue: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Return the running queue, or ``None`` when rows are committed inline."""
+    return _queue
+
+
+def start_write_behind(engine: AsyncEngine) -> Optional[WriteBehindQueue]:
+    """Start the write-behind stage when enabled in settings."""
+    global _queue
+    settings = get_settings()
+    if not settings.write_behind_enabled:
+        return None
+    _queue = WriteBehindQueue(
+        engine,
+        max_size=settings.write_behind_max_queue,
+        batch_size=settings.write_behind_batch_size,
+        flush_interval=settings.write_behind_flush_interval,
+        enqueue_timeout=settings.write_behind_enqueue_timeout,
+    )
+    _queue.start()
+    metrics.register("write_behind", _queue.snapshot)
+    return _queue
+
+
+async def stop_write_behind(queue: Optional[WriteBehindQueue]) -> None:
+    global _queue
+    if queue is None:
+        return
+    if _queue is queue:
+        _queue = None
+    await queue.stop()
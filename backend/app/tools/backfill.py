@@ -0,0 +1,58 @@
+"""Backfill SynthVault deposits and withdrawals into the transaction log.
+
+Usage: ``python -m app.tools.backfill [--from-block N] [--to-block N] [--workers N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional, Sequence
+
+from app.core.db import engine
+from app.core.logger import logger
+from app.core.migrations import migrate
+from app.core.vault_client import get_vault_contract
+from app.services.backfill_service import Backfiller
+from app.services.indexer_service import Web3LogSource
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from-block", type=int, default=None, help="First block; defaults to the saved checkpoint.")
+    parser.add_argument("--to-block", type=int, default=None, help="Last block; defaults to the confirmed head.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent eth_getLogs requests.")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Initial blocks per eth_getLogs request.")
+    parser.add_argument("--max-chunk", type=int, default=50_000, help="Upper bound for the adaptive range size.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    contract = get_vault_contract()
+    if contract is None:
+        logger.error("Vault contract unavailable; check RPC_URL and VAULT_ADDRESS")
+        return 1
+
+    migrate(engine)
+    backfiller = Backfiller(
+        Web3LogSource(contract, events=("Deposit", "Withdraw")),
+        engine,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_chunk=args.max_chunk,
+    )
+    stats = backfiller.run(from_block=args.from_block, to_block=args.to_block)
+    logger.info(
+        "Backfill finished in %.1fs: %s blocks (%.1f/s), %s rows (%.1f/s)",
+        stats.elapsed,
+        stats.blocks,
+        stats.blocks_per_second,
+        stats.rows,
+        stats.rows_per_second,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
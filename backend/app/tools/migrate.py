@@ -0,0 +1,38 @@
+"""Apply database schema migrations.
+
+Usage: ``python -m app.tools.migrate [--target N] [--status]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional, Sequence
+
+from app.core.db import engine
+from app.core.logger import logger
+from app.core.migrations import LATEST_VERSION, current_version, migrate
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", type=int, default=None, help="Version to migrate to; defaults to the latest.")
+    parser.add_argument("--status", action="store_true", help="Report the current version without migrating.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.status:
+        with engine.connect() as connection:
+            version = current_version(connection)
+        logger.info("Schema version %s (latest %s)", version, LATEST_VERSION)
+        return 0 if version >= LATEST_VERSION else 1
+
+    version = migrate(engine, target=args.target)
+    logger.info("Schema at version %s", version)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Flag wallets whose vault positions drifted from the plan matching their risk preference.
+
+Usage: ``python -m app.tools.rebalance [--source auto|index|chain] [--workers N] [--chunk-size N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import Optional, Sequence
+
+from app.core.config import get_settings
+from app.core.db import engine
+from app.core.logger import logger
+from app.core.migrations import migrate
+from app.core.vault_client import get_vault_contract, get_vault_state
+from app.services.rebalance_service import ChainPositionSource, IndexPositionSource, Rebalancer
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source",
+        choices=("auto", "index", "chain"),
+        default="auto",
+        help="Where positions come from; auto uses the local index when the indexer is enabled and caught up.",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Chunks evaluated concurrently.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Preferences per chunk.")
+    parser.add_argument("--threshold", type=float, default=None, help="Minimum drift to flag (0-1).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    settings = get_settings()
+    source_name = args.source
+    if source_name == "auto":
+        source_name = "index" if settings.indexer_enabled else "chain"
+
+    contract = get_vault_contract()
+    if source_name == "chain" and contract is None:
+        logger.error("Vault contract unavailable; check RPC_URL and VAULT_ADDRESS")
+        return 1
+    state = get_vault_state(contract) if contract is not None else None
+
+    migrate(engine)
+    source = IndexPositionSource(engine, state) if source_name == "index" else None
+    if source is not None and not source.current():
+        if args.source == "index" or contract is None:
+            logger.error("Share index is more than INDEXER_MAX_LAG blocks behind the vault state")
+            return 1
+        logger.warning("Share index is behind the vault state; reading positions from the chain")
+        source = None
+    if source is None:
+        source = ChainPositionSource(contract, state.block_number if state is not None else None)
+    Rebalancer(
+        source,
+        engine,
+        state,
+        threshold=args.threshold if args.threshold is not None else settings.rebalance_drift_threshold,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    ).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
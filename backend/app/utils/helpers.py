@@ -1,7 +1,32 @@
 """General helper utilities."""
 
+import hashlib
 from decimal import Decimal
 
 
 def format_currency(amount: float | Decimal) -> str:
-    return f"${Decimal(amount):,.2f}"
+    return f"${Decimal(amount):,.2f}"
+
+
+DECIMAL_FACTOR = Decimal(10) ** 18
+
+
+def to_token_amount(raw_value: int) -> float:
+    """Convert an 18-decimal on-chain integer into a float token amount."""
+    if raw_value <= 0:
+        return 0.0
+    return float(Decimal(raw_value) / DECIMAL_FACTOR)
+
+
+def strong_etag(*parts: object) -> str:
+    """Quoted strong entity tag derived from version markers."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header value matches ``etag`` (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,87 @@
+"""Compare response serialization paths for a portfolio with a long history.
+
+Run from ``backend/``::
+
+    python -m benchmarks.serialization --items 10000 --repeat 20
+
+The default path builds ``PortfolioSchema`` and lets FastAPI validate and
+encode it against ``response_model``; the fast path builds plain data and
+encodes it with orjson, as ``FAST_SERIALIZATION`` does. Database and RPC time
+is excluded, so the numbers isolate serialization.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.portfolio import VaultPosition
+from app.models.tx import TransactionLog
+from app.schemas.portfolio import PortfolioSchema
+from app.services import portfolio_service
+
+ADDRESS = "0x" + "ab" * 20
+
+
+def _records(count: int) -> List[TransactionLog]:
+    start = datetime(2024, 1, 1)
+    return [
+        TransactionLog(
+            id=index,
+            address=ADDRESS,
+            tx_type="deposit" if index % 3 else "withdraw",
+            amount=index * 1.25,
+            vault="SynthVault",
+            tx_hash=f"0x{index:064x}",
+            timestamp=start + timedelta(seconds=index),
+        )
+        for index in range(count, 0, -1)
+    ]
+
+
+def _timed(run: Callable[[], bytes], repeat: int) -> tuple[float, int]:
+    run()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = run()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000, help="history items in the response")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    records = _records(args.items)
+    positions = [VaultPosition(vault="SynthVault", shares=2.0, asset_value=3.0, apy=0.05)]
+    field = create_response_field("Response_get_portfolio", PortfolioSchema)
+
+    def default_path() -> bytes:
+        portfolio = portfolio_service.portfolio_schema(ADDRESS, positions, portfolio_service._page(records, args.items))
+        content = asyncio.run(serialize_response(field=field, response_content=portfolio))
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return ORJSONResponse(portfolio_service.portfolio_payload(ADDRESS, positions, records, args.items)).body
+
+    default_time, default_size = _timed(default_path, args.repeat)
+    fast_time, fast_size = _timed(fast_path, args.repeat)
+    print(f"{args.items} history items, median of {args.repeat} runs")
+    print(f"  response_model + json : {default_time * 1000:8.1f} ms  ({default_size} bytes)")
+    print(f"  plain data + orjson   : {fast_time * 1000:8.1f} ms  ({fast_size} bytes)")
+    print(f"  speedup               : {default_time / fast_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,17 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
   sys.path.insert(0, str(BACKEND_ROOT))
 
+
+@pytest.fixture(scope="session", autouse=True)
+def _migrated_database() -> None:
+  """Bring the test database schema up to date; the app lifespan does not run under TestClient."""
+  from app.core.db import engine
+  from app.core.migrations import migrate
+
+  migrate(engine)
@@ -0,0 +1,146 @@
+"""Admission control tests."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.admission import AdmissionMiddleware, ConcurrencyLimiter, TokenBuckets
+from app.core.config import Settings
+
+
+def _app(**limits) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/portfolio/{address}")
+    async def portfolio(address: str) -> dict:
+        await asyncio.sleep(0.1)
+        return {"owner": address}
+
+    @app.get("/portfolio/{address}/history")
+    async def history(address: str) -> dict:
+        return {"items": []}
+
+    @app.get("/portfolio/{address}/events")
+    async def events(address: str) -> StreamingResponse:
+        await asyncio.sleep(0.1)
+
+        async def stream():
+            yield "event: portfolio\n\n"
+            # Still streaming, but no longer holding an RPC slot.
+            await asyncio.sleep(0.2)
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    app.add_middleware(AdmissionMiddleware, settings=Settings(**limits))
+    return app
+
+
+async def _get(app: FastAPI, *paths: str) -> list:
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(path) for path in paths))
+
+
+def test_token_bucket_spends_burst_then_refills() -> None:
+    buckets = TokenBuckets(rate=2, burst=3, max_keys=100)
+    assert [buckets.take("a", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("a", now=0.0) == 0.5
+    assert buckets.take("b", now=0.0) == 0.0
+    assert buckets.take("a", now=1.0) == 0.0
+
+
+def test_token_buckets_stay_bounded() -> None:
+    buckets = TokenBuckets(rate=1, burst=1, max_keys=32, shards=4)
+    for index in range(1000):
+        buckets.take(f"client-{index}", now=0.0)
+    assert len(buckets) <= 32
+
+
+def test_address_rate_limit_returns_429_with_retry_after() -> None:
+    app = _app(admission_address_rate=0.5, admission_address_burst=2)
+    paths = ["/portfolio/0xAA/history", "/portfolio/0xaa/history", "/portfolio/0xaa/history", "/portfolio/0xbb/history"]
+    responses = asyncio.run(_get(app, *paths))
+    assert [response.status_code for response in responses] == [200, 200, 429, 200]
+    assert responses[2].headers["Retry-After"] == "2"
+    assert responses[2].json() == {"detail": "Too many requests for this address"}
+
+
+def test_ip_rate_limit_exempts_health() -> None:
+    app = _app(admission_ip_rate=1, admission_ip_burst=1)
+    responses = asyncio.run(_get(app, "/portfolio/0x1/history", "/portfolio/0x2/history", "/health"))
+    assert [response.status_code for response in responses] == [200, 429, 200]
+
+
+def test_rpc_routes_shed_with_503_after_queue_deadline() -> None:
+    app = _app(admission_rpc_concurrency=1, admission_rpc_queue=1, admission_queue_timeout=0.02)
+    responses = asyncio.run(_get(app, "/portfolio/0x1", "/portfolio/0x2", "/portfolio/0x3", "/portfolio/0x4/history"))
+    assert [response.status_code for response in responses] == [200, 503, 503, 200]
+    assert responses[1].headers["Retry-After"] == "1"
+
+
+def test_streams_hold_an_rpc_slot_until_their_first_message() -> None:
+    app = _app(admission_rpc_concurrency=1, admission_rpc_queue=1, admission_queue_timeout=0.15)
+
+    async def scenario() -> list:
+        return [
+            response.status_code
+            for response in await _get(app, "/portfolio/0x1/events", "/portfolio/0x2/events", "/portfolio/0x3/events")
+        ]
+
+    # The second stream gets the slot once the first has started; the third finds the queue full.
+    assert asyncio.run(scenario()) == [200, 200, 503]
+
+
+def test_limiter_hands_slots_to_waiters_in_order() -> None:
+    async def scenario() -> list:
+        limiter = ConcurrencyLimiter(limit=1, max_queue=10, queue_timeout=1.0)
+        order = []
+
+        async def hold(name: str) -> None:
+            assert await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        await asyncio.gather(*(hold(name) for name in "abc"))
+        return order + [limiter.snapshot()["active"]]
+
+    assert asyncio.run(scenario()) == ["a", "b", "c", 0]
+
+
+def test_client_header_keys_clients_behind_a_proxy() -> None:
+    app = _app(admission_ip_rate=1, admission_ip_burst=1, admission_client_header="X-Forwarded-For")
+
+    async def scenario() -> list:
+        transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [
+                await client.get("/portfolio/0x1/history", headers={"X-Forwarded-For": forwarded})
+                for forwarded in ("1.1.1.1", "9.9.9.9, 2.2.2.2", "9.9.9.9, 1.1.1.1")
+            ]
+
+    assert [response.status_code for response in asyncio.run(scenario())] == [200, 200, 429]
+
+
+def test_websocket_handshakes_are_rate_limited() -> None:
+    app = _app(admission_address_rate=0.5, admission_address_burst=1)
+
+    @app.websocket("/portfolio/{address}/ws")
+    async def socket(websocket: WebSocket, address: str) -> None:
+        await websocket.accept()
+        await websocket.close()
+
+    client = TestClient(app)
+    with client.websocket_connect("/portfolio/0xaa/ws"):
+        pass
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect("/portfolio/0xaa/ws"):
+            pass
+    assert rejected.value.code == 1013
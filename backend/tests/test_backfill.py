@@ -0,0 +1,84 @@
+"""Historical backfill tests."""
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from app.core.vault_client import VaultLog
+from app.models.tx import TransactionLog
+from app.services.backfill_service import Backfiller
+
+OWNER = "0x" + "c3" * 20
+
+
+class _LimitedSource:
+    """Serves one deposit every ten blocks and rejects ranges wider than ``limit``."""
+
+    def __init__(self, head: int, limit: int) -> None:
+        self._head = head
+        self._limit = limit
+        self.requests = 0
+
+    def head(self) -> int:
+        return self._head
+
+    def logs(self, from_block: int, to_block: int) -> list[VaultLog]:
+        self.requests += 1
+        if to_block - from_block + 1 > self._limit:
+            raise ValueError("query returned more than 10000 results")
+        return [
+            VaultLog(
+                event="Deposit",
+                block_number=number,
+                block_hash=f"0x{number:064x}",
+                tx_hash=f"0x{number:064x}",
+                log_index=0,
+                args={"sender": OWNER, "owner": OWNER, "assets": 10**18, "shares": 10**18},
+            )
+            for number in range(from_block, to_block + 1)
+            if number % 10 == 0
+        ]
+
+    def block_timestamp(self, number: int) -> int:
+        return 1_700_000_000 + number * 12
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _row_count(engine) -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(TransactionLog)).one()
+
+
+def test_backfill_splits_oversized_ranges(engine) -> None:
+    source = _LimitedSource(head=999, limit=64)
+    backfiller = Backfiller(source, engine, workers=3, chunk_size=500)
+
+    stats = backfiller.run(from_block=0, to_block=999)
+
+    assert stats.blocks == 1000
+    assert stats.rows == 100
+    assert stats.splits > 0
+    assert _row_count(engine) == 100
+    assert backfiller.checkpoint() == 999
+
+
+def test_backfill_resumes_without_duplicates(engine) -> None:
+    source = _LimitedSource(head=199, limit=1000)
+    backfiller = Backfiller(source, engine, workers=2, chunk_size=50)
+    backfiller.run(from_block=0, to_block=99)
+    assert backfiller.checkpoint() == 99
+
+    stats = backfiller.run(to_block=199)
+    assert stats.blocks == 100
+    assert _row_count(engine) == 20
+
+    assert backfiller.run(from_block=0, to_block=199).rows == 0
+    assert _row_count(engine) == 20
+
+    backfiller.run(from_block=0, to_block=49)
+    assert backfiller.checkpoint() == 199
@@ -0,0 +1,84 @@
+"""LRU+TTL cache tests."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.core import cache as cache_module
+from app.core.cache import MISSING, LRUTTLCache, RedisInvalidator
+from app.core.config import LOCAL_CACHE_TTL_SECONDS, Settings
+
+
+def test_cache_evicts_least_recently_used_and_counts_lookups() -> None:
+    cache = LRUTTLCache(maxsize=2, ttl=60)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    assert cache.get("a") == 1
+    cache.store("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+    snapshot = cache.snapshot()
+    assert (snapshot["hits"], snapshot["misses"], snapshot["evictions"]) == (2, 1, 1)
+
+
+def test_cache_expires_entries_and_rejects_stale_loads() -> None:
+    cache = LRUTTLCache(maxsize=8, ttl=0.01)
+    cache.store("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+
+    version = cache.version()
+    cache.invalidate(["a"])
+    cache.store("a", "stale", version)
+    assert cache.get("a") is MISSING
+
+
+class _FlakyPubSub:
+    """Delivers its messages, then drops the connection."""
+
+    def __init__(self, messages: list[str]) -> None:
+        self._messages = messages
+
+    async def subscribe(self, channel: str) -> None:
+        pass
+
+    async def listen(self):
+        for data in self._messages:
+            yield {"type": "message", "data": data}
+        raise ConnectionError("connection reset")
+
+    async def close(self) -> None:
+        pass
+
+
+def test_invalidator_resubscribes_and_clears_cache_after_disconnect(monkeypatch) -> None:
+    monkeypatch.setattr(cache_module, "RECONNECT_MIN_SECONDS", 0.01)
+    feeds = [["a"], []]
+
+    async def close() -> None:
+        pass
+
+    client = SimpleNamespace(pubsub=lambda: _FlakyPubSub(feeds.pop(0) if feeds else []), close=close)
+    monkeypatch.setattr(cache_module, "aioredis", SimpleNamespace(from_url=lambda url, **kwargs: client))
+    cache = LRUTTLCache(maxsize=10, ttl=60)
+
+    async def scenario() -> RedisInvalidator:
+        invalidator = RedisInvalidator("redis://test", "channel", cache)
+        cache.store("a", 1)
+        cache.store("b", 2)
+        await invalidator.start()
+        await asyncio.sleep(0.05)
+        await invalidator.stop()
+        return invalidator
+
+    invalidator = asyncio.run(scenario())
+    assert invalidator.reconnects >= 1
+    # "a" was invalidated by message; "b" went with the clear on reconnect.
+    assert cache.get("a") is MISSING
+    assert cache.get("b") is MISSING
+
+
+def test_preference_cache_ttl_is_short_without_cross_worker_invalidation() -> None:
+    assert Settings(cache_invalidation_url=None).preference_cache_seconds == LOCAL_CACHE_TTL_SECONDS
+    assert Settings(cache_invalidation_url="redis://cache").preference_cache_seconds == 300.0
+    assert Settings(preference_cache_ttl=60).preference_cache_seconds == 60
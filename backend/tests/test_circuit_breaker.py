@@ -0,0 +1,78 @@
+"""Circuit breaker and provider negative-cache tests."""
+import asyncio
+
+import pytest
+
+from app.core import vault_client
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _fail() -> None:
+    raise ConnectionError("rpc down")
+
+
+def test_breaker_opens_after_threshold_and_fails_fast() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+    assert breaker.state == "open"
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_breaker_half_open_probe_closes_on_success() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail)
+    assert breaker.state == "half_open"
+
+    async def ok() -> str:
+        return "ok"
+
+    assert asyncio.run(breaker.call_async(ok)) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_probe_reopens() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.0)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+    breaker.reset_timeout = 60
+    breaker._opened_at -= 120
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail)
+    assert breaker.state == "open"
+
+
+def _flaky_factory(attempts: list):
+    @vault_client._cache_available
+    def factory():
+        attempts.append(1)
+        return None if len(attempts) == 1 else "provider"
+
+    return factory
+
+
+def test_missing_provider_is_negatively_cached(monkeypatch) -> None:
+    monkeypatch.setattr(vault_client.get_settings(), "rpc_negative_cache_seconds", 60)
+    attempts: list = []
+    factory = _flaky_factory(attempts)
+    assert factory() is None
+    assert factory() is None
+    assert len(attempts) == 1
+
+
+def test_missing_provider_recovers_after_negative_cache(monkeypatch) -> None:
+    monkeypatch.setattr(vault_client.get_settings(), "rpc_negative_cache_seconds", 0)
+    attempts: list = []
+    factory = _flaky_factory(attempts)
+    assert factory() is None
+    assert factory() == "provider"
+    assert factory() == "provider"
+    assert len(attempts) == 2
@@ -0,0 +1,134 @@
+"""Vault event indexer tests."""
+import asyncio
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.config import get_settings
+from app.core.vault_client import ZERO_ADDRESS, VaultLog, VaultState
+from app.services.indexer_service import VaultIndexer, connect_indexer, indexed_shares
+from app.services.portfolio_service import _positions_from_index
+
+ALICE = "0x" + "a1" * 20
+BOB = "0x" + "b2" * 20
+
+
+class _FakeChain:
+    """In-memory chain exposing the indexer's log source interface."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[int, str] = {}
+        self.transfers: list[VaultLog] = []
+        self.fork = "main"
+
+    def mine(self, number: int, *transfers: tuple[str, str, int]) -> None:
+        block_hash = f"0x{self.fork}-{number}"
+        self.hashes[number] = block_hash
+        for index, (sender, receiver, value) in enumerate(transfers):
+            self.transfers.append(
+                VaultLog(
+                    event="Transfer",
+                    block_number=number,
+                    block_hash=block_hash,
+                    tx_hash=f"{block_hash}-{index}",
+                    log_index=index,
+                    args={"from": sender, "to": receiver, "value": value},
+                )
+            )
+
+    def reorg(self, from_block: int) -> None:
+        self.fork = "fork"
+        self.transfers = [log for log in self.transfers if log.block_number < from_block]
+        self.hashes = {number: value for number, value in self.hashes.items() if number < from_block}
+
+    def head(self) -> int:
+        return max(self.hashes)
+
+    def block_hash(self, number: int) -> str | None:
+        return self.hashes.get(number)
+
+    def logs(self, from_block: int, to_block: int) -> list[VaultLog]:
+        return [log for log in self.transfers if from_block <= log.block_number <= to_block]
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def _no_confirmations(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "indexer_confirmations", 0)
+
+
+def _shares(engine, address: str) -> int | None:
+    with Session(engine) as session:
+        return indexed_shares(session, address)
+
+
+def test_indexer_tracks_mints_transfers_and_burns(engine) -> None:
+    chain = _FakeChain()
+    chain.mine(0, (ZERO_ADDRESS, ALICE, 100))
+    chain.mine(1, (ALICE, BOB, 30))
+    chain.mine(2, (BOB, ZERO_ADDRESS, 10))
+    indexer = VaultIndexer(chain, engine)
+
+    assert _shares(engine, ALICE) is None
+    assert indexer.poll_once() == 3
+    assert _shares(engine, ALICE) == 70
+    assert _shares(engine, BOB) == 20
+    assert indexer.poll_once() == 0
+
+
+def test_indexer_rolls_back_reorganised_blocks(engine) -> None:
+    chain = _FakeChain()
+    chain.mine(0, (ZERO_ADDRESS, ALICE, 100))
+    chain.mine(1)
+    chain.mine(2, (ALICE, BOB, 40))
+    indexer = VaultIndexer(chain, engine)
+    indexer.poll_once()
+    assert _shares(engine, BOB) == 40
+
+    chain.reorg(2)
+    chain.mine(2, (ALICE, BOB, 5))
+    chain.mine(3)
+    indexer.poll_once()
+
+    assert _shares(engine, ALICE) == 95
+    assert _shares(engine, BOB) == 5
+
+
+def test_portfolio_uses_index_only_when_caught_up(engine, monkeypatch) -> None:
+    chain = _FakeChain()
+    chain.mine(0, (ZERO_ADDRESS, ALICE, 10**18))
+    VaultIndexer(chain, engine).poll_once()
+    monkeypatch.setattr(get_settings(), "indexer_enabled", True)
+    monkeypatch.setattr(get_settings(), "indexer_max_lag", 5)
+    state = VaultState(block_number=5, total_assets=2, total_supply=1, deposit_cap=0, paused=False)
+    monkeypatch.setattr("app.services.portfolio_service.get_vault_state", lambda: state)
+
+    with Session(engine) as session:
+        (position,) = _positions_from_index(session, ALICE)
+        assert position.asset_value == 2.0
+        # Too far behind the state's block to price against it.
+        state.block_number = 6
+        assert _positions_from_index(session, ALICE) is None
+
+        def unavailable():
+            raise ConnectionError("rpc down")
+
+        # A failed state read falls back to the chain instead of reporting no positions.
+        monkeypatch.setattr("app.services.portfolio_service.get_vault_state", unavailable)
+        assert _positions_from_index(session, ALICE) is None
+
+
+def test_indexer_keeps_retrying_an_unreachable_rpc(engine, monkeypatch) -> None:
+    contract = object()
+    attempts = iter([None, None, contract])
+    monkeypatch.setattr("app.services.indexer_service.get_vault_contract", lambda: next(attempts))
+
+    indexer = asyncio.run(connect_indexer(engine, 0.001))
+    assert indexer._source._contract is contract
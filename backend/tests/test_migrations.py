@@ -0,0 +1,41 @@
+"""Schema migration tests."""
+import pytest
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, create_engine
+
+from app.core.migrations import LATEST_VERSION, SchemaOutOfDate, ensure_schema, migrate
+from app.models import positions, preferences, rebalance, tx  # noqa: F401
+
+
+def test_migrate_adopts_legacy_database_once(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE transactionlog (id INTEGER PRIMARY KEY, address VARCHAR, tx_type VARCHAR(32), "
+                "amount FLOAT, vault VARCHAR, timestamp DATETIME)"
+            )
+        )
+
+    with pytest.raises(SchemaOutOfDate):
+        ensure_schema(engine, auto_migrate=False)
+
+    assert migrate(engine) == LATEST_VERSION
+    columns = {column["name"] for column in inspect(engine).get_columns("transactionlog")}
+    assert "tx_hash" in columns
+    assert migrate(engine) == LATEST_VERSION
+    assert ensure_schema(engine, auto_migrate=False) == LATEST_VERSION
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM schema_version")).scalar() == LATEST_VERSION
+
+
+def test_each_migration_creates_its_own_schema(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    migrate(engine, target=1)
+    assert "rebalancerecommendation" not in inspect(engine).get_table_names()
+
+    migrate(engine)
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        assert {column["name"] for column in inspector.get_columns(table.name)} == set(table.columns.keys())
+        assert {index["name"] for index in inspector.get_indexes(table.name)} == {index.name for index in table.indexes}
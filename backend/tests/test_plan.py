@@ -1,10 +1,15 @@
 ﻿"""Plan endpoint tests."""
+import json
+from dataclasses import replace
 from math import isclose
 
 from fastapi.testclient import TestClient
 
 from app.core.db import init_db
 from app.main import app
+from app.schemas.plan import PlanRequest
+from app.services import plan_service, projection_service
+from app.services.plan_service import generate_plan
 
 client = TestClient(app)
 
@@ -38,3 +43,72 @@ def test_plan_validation_error() -> None:
 def test_plan_requires_fields() -> None:
     response = client.post("/plan/", json={"risk_score": 5})
     assert response.status_code == 422
+
+
+def test_plan_table_matches_generated_plan_and_tracks_library() -> None:
+    payload = {"risk_score": 3, "horizon_months": 60, "stablecoin_preference": "DAI"}
+    response = client.post("/plan/", json=payload)
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == json.loads(generate_plan(PlanRequest(**payload)).json())
+
+    library = plan_service.PLAN_LIBRARY
+    template = replace(library[0], base_apy=0.5)
+    plan_service.set_plan_library((template, *library[1:]))
+    try:
+        conservative = client.post("/plan/", json=payload).json()["plans"][0]
+    finally:
+        plan_service.set_plan_library(library)
+    assert conservative["est_apy"] == plan_service._adjusted_apy(0.5, 3, 60)
+
+
+def test_plan_batch_matches_single_plans() -> None:
+    profiles = [(1, 1), (6, 12), (10, 120), (3, 60)]
+    payload = {
+        "risk_scores": [risk for risk, _ in profiles],
+        "horizon_months": [horizon for _, horizon in profiles],
+    }
+    response = client.post("/plan/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert [template["name"] for template in data["templates"]] == ["Conservative", "Balanced", "Growth"]
+    for index, (risk, horizon) in enumerate(profiles):
+        single = client.post("/plan/", json={"risk_score": risk, "horizon_months": horizon}).json()["plans"]
+        for column, plan in zip(data["est_apy"], single):
+            assert isclose(column[index], plan["est_apy"], abs_tol=1e-9)
+        assert [template["allocations"] for template in data["templates"]] == [plan["allocations"] for plan in single]
+
+
+def test_plan_batch_rejects_invalid_columns() -> None:
+    assert client.post("/plan/batch", json={"risk_scores": [11], "horizon_months": [12]}).status_code == 422
+    assert client.post("/plan/batch", json={"risk_scores": [5, 6], "horizon_months": [12]}).status_code == 422
+    assert client.post("/plan/batch", json={"risk_scores": [5.5], "horizon_months": [12]}).status_code == 422
+
+
+def test_projection_returns_ordered_percentiles_and_memoizes() -> None:
+    payload = {"risk_score": 7, "horizon_months": 24, "paths": 2000, "initial_amount": 500}
+    first = client.post("/plan/projection", json=payload)
+    assert first.status_code == 200
+    data = first.json()
+    assert [projection["name"] for projection in data["projections"]] == ["Conservative", "Balanced", "Growth"]
+    for projection in data["projections"]:
+        bands = [projection["percentiles"][key] for key in ("p5", "p25", "p50", "p75", "p95")]
+        assert bands == sorted(bands)
+    conservative, _, growth = data["projections"]
+    assert growth["percentiles"]["p95"] - growth["percentiles"]["p5"] > (
+        conservative["percentiles"]["p95"] - conservative["percentiles"]["p5"]
+    )
+
+    hits = projection_service._summaries.snapshot()["hits"]
+    doubled = client.post("/plan/projection", json={**payload, "initial_amount": 1000}).json()["projections"][0]
+    assert isclose(doubled["mean"], conservative["mean"] * 2, abs_tol=0.02)
+    assert projection_service._summaries.snapshot()["hits"] == hits + 3
+
+
+def test_projection_runs_large_simulations_on_process_pool(monkeypatch) -> None:
+    monkeypatch.setattr(projection_service.settings, "projection_inline_steps", 0)
+    try:
+        response = client.post("/plan/projection", json={"risk_score": 2, "horizon_months": 6, "paths": 500})
+    finally:
+        projection_service.shutdown_projection_pool()
+    assert response.status_code == 200
+    assert len(response.json()["projections"]) == 3
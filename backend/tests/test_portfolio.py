@@ -1,16 +1,37 @@
 """Portfolio endpoint tests."""
+import asyncio
+import json
+import time
+from secrets import token_hex
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.config import get_settings
+from app.core.db import async_engine
+from app.core.vault_client import vault_state_cache
 from app.main import app
+from app.services.portfolio_service import build_portfolio_async, build_portfolio_shared, portfolio_snapshot
+from app.services.snapshot_service import PortfolioSnapshot, SnapshotStore, portfolio_snapshots
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def _reset_vault_state() -> None:
+    vault_state_cache.clear()
+    portfolio_snapshots.clear()
+
+
 class _DummyResult:
-    def __init__(self, value: int):
+    def __init__(self, value: int, delay: float = 0.0):
         self._value = value
+        self._delay = delay
 
-    def call(self) -> int:
+    async def call(self) -> int:
+        if self._delay:
+            await asyncio.sleep(self._delay)
         return self._value
 
 
@@ -20,20 +41,32 @@ class _DummyContract:
         self._assets = assets
         self._total_assets = total_assets
         self._total_supply = total_supply
+        self.total_assets_calls = 0
+        self.delay = 0.0
         self.functions = self
 
     def balanceOf(self, *_):
-        return _DummyResult(self._shares)
+        return _DummyResult(self._shares, self.delay)
 
     def convertToAssets(self, *_):
         return _DummyResult(self._assets)
 
+    def maxWithdraw(self, *_):
+        return _DummyResult(self._assets)
+
     def totalAssets(self):
+        self.total_assets_calls += 1
         return _DummyResult(self._total_assets)
 
     def totalSupply(self):
         return _DummyResult(self._total_supply)
 
+    def depositCap(self):
+        return _DummyResult(10**24)
+
+    def paused(self):
+        return _DummyResult(False)
+
 
 def test_portfolio_endpoint(monkeypatch) -> None:
     dummy_contract = _DummyContract(
@@ -42,7 +75,7 @@ def test_portfolio_endpoint(monkeypatch) -> None:
         total_assets=5 * 10**18,
         total_supply=2 * 10**18,
     )
-    monkeypatch.setattr("app.services.portfolio_service.get_vault_contract", lambda: dummy_contract)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
 
     address = "0x1111111111111111111111111111111111111111"
     response = client.get(f"/portfolio/{address}")
@@ -52,10 +85,39 @@ def test_portfolio_endpoint(monkeypatch) -> None:
     assert data["positions"], "positions should not be empty when contract returns balances"
     position = data["positions"][0]
     assert position["shares"] == 2.0
-    assert position["asset_value"] == 3.0
+    assert position["asset_value"] == 3.0
+    assert position["apy"] == 1.5
+
+
+def test_portfolio_reuses_cached_vault_state(monkeypatch) -> None:
+    dummy_contract = _DummyContract(10**18, 10**18, 10**18, 10**18)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+
+    for address in ("0x5555555555555555555555555555555555555555", "0x6666666666666666666666666666666666666666"):
+        assert client.get(f"/portfolio/{address}").json()["positions"]
+    assert dummy_contract.total_assets_calls == 1
+
+
+def test_concurrent_portfolio_builds_overlap_rpc_waits(monkeypatch) -> None:
+    dummy_contract = _DummyContract(10**18, 10**18, 10**18, 10**18)
+    dummy_contract.delay = 0.2
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+
+    async def build_one(address: str):
+        async with AsyncSession(async_engine) as session:
+            return await build_portfolio_async(session, address)
+
+    async def build_many() -> list:
+        return await asyncio.gather(*(build_one(f"0x{index:040x}") for index in range(1, 6)))
+
+    started = time.perf_counter()
+    portfolios = asyncio.run(build_many())
+    assert all(portfolio.positions for portfolio in portfolios)
+    assert time.perf_counter() - started < 0.2 * 3
+
 
 def test_portfolio_returns_empty_when_contract_missing(monkeypatch) -> None:
-    monkeypatch.setattr("app.services.portfolio_service.get_vault_contract", lambda: None)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: None)
     address = "0x3333333333333333333333333333333333333333"
     response = client.get(f"/portfolio/{address}")
     assert response.status_code == 200
@@ -66,7 +128,7 @@ def test_portfolio_returns_empty_when_contract_missing(monkeypatch) -> None:
 
 def test_portfolio_history_tracks_transactions(monkeypatch) -> None:
     dummy_contract = _DummyContract(0, 0, 0, 1)
-    monkeypatch.setattr("app.services.portfolio_service.get_vault_contract", lambda: dummy_contract)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
     address = "0x4444444444444444444444444444444444444444"
     payload = {"address": address, "amount": 25, "vault": "SynthVault", "tx_hash": "0xabc"}
     client.post("/tx/deposit", json=payload)
@@ -77,4 +139,168 @@ def test_portfolio_history_tracks_transactions(monkeypatch) -> None:
     latest = history[0]
     assert latest["tx_type"] == "deposit"
     assert latest["amount"] == 25
-    assert latest["vault"] == "SynthVault"
+    assert latest["vault"] == "SynthVault"
+
+
+def test_history_pages_with_cursor_and_filters() -> None:
+    address = f"0x{token_hex(20)}"
+    for index in range(5):
+        endpoint = "/tx/deposit" if index % 2 == 0 else "/tx/withdraw"
+        client.post(endpoint, json={"address": address, "amount": index + 1, "tx_hash": f"0x{index}"})
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        page = client.get(f"/portfolio/{address}/history", params=params).json()
+        seen.extend(item["amount"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [5, 4, 3, 2, 1]
+
+    deposits = client.get(f"/portfolio/{address}/history", params={"tx_type": "deposit"}).json()
+    assert [item["amount"] for item in deposits["items"]] == [5, 3, 1]
+
+    bad = client.get(f"/portfolio/{address}/history", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
+def test_history_export_streams_ndjson_csv_and_gzip() -> None:
+    address = f"0x{token_hex(20)}"
+    for index in range(3):
+        client.post("/tx/deposit", json={"address": address, "amount": index + 1, "tx_hash": f"0x{index}"})
+
+    ndjson = client.get(f"/portfolio/{address}/history/export")
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [row["amount"] for row in rows] == [3, 2, 1]
+
+    exported = client.get(f"/portfolio/{address}/history/export", params={"format": "csv", "gzip": True})
+    assert exported.headers["content-encoding"] == "gzip"
+    lines = exported.text.splitlines()
+    assert lines[0] == "tx_type,amount,vault,tx_hash,timestamp"
+    assert len(lines) == 4
+    assert lines[1].startswith("deposit,3.0,SynthVault,0x2,")
+
+
+def test_portfolio_revalidates_with_etag(monkeypatch) -> None:
+    dummy_contract = _DummyContract(10**18, 10**18, 10**18, 10**18)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+    address = f"0x{token_hex(20)}"
+
+    first = client.get(f"/portfolio/{address}")
+    etag = first.headers["ETag"]
+    calls = dummy_contract.total_assets_calls
+
+    def fail(*_):
+        raise AssertionError("a 304 must not read the chain")
+
+    monkeypatch.setattr(dummy_contract, "balanceOf", fail)
+    cached = client.get(f"/portfolio/{address}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert not cached.content
+    assert dummy_contract.total_assets_calls == calls
+
+    monkeypatch.undo()
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+    client.post("/tx/deposit", json={"address": address, "amount": 5, "vault": "SynthVault", "tx_hash": "0xe7a9"})
+    changed = client.get(f"/portfolio/{address}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["history"][0]["amount"] == 5
+
+
+def test_fast_serialization_matches_response_model(monkeypatch) -> None:
+    dummy_contract = _DummyContract(2 * 10**18, 3 * 10**18, 5 * 10**18, 2 * 10**18)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+    monkeypatch.setattr(get_settings(), "portfolio_history_limit", 2)
+    address = f"0x{token_hex(20)}"
+    for index in range(3):
+        client.post("/tx/deposit", json={"address": address, "amount": index + 1, "vault": "SynthVault"})
+    paths = (f"/portfolio/{address}", f"/portfolio/{address}/history?limit=2")
+
+    expected = [client.get(path).json() for path in paths]
+    monkeypatch.setattr(get_settings(), "fast_serialization", True)
+    fast = [client.get(path) for path in paths]
+
+    assert [response.json() for response in fast] == expected
+    assert fast[0].headers["ETag"]
+    assert expected[0]["history_next_cursor"] and expected[1]["next_cursor"]
+
+
+def test_concurrent_builds_for_one_address_are_coalesced(monkeypatch) -> None:
+    dummy_contract = _DummyContract(10**18, 10**18, 10**18, 10**18)
+    dummy_contract.delay = 0.05
+    balance_reads = []
+    balance_of = dummy_contract.balanceOf
+    monkeypatch.setattr(dummy_contract, "balanceOf", lambda *args: balance_reads.append(args) or balance_of(*args))
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+    address = f"0x{token_hex(20)}"
+    before = client.get("/health/metrics").json()["portfolio_builds"]["coalesced"]
+
+    async def build_many() -> list:
+        return await asyncio.gather(*(build_portfolio_shared(address) for _ in range(5)))
+
+    results = asyncio.run(build_many())
+    assert len(balance_reads) == 1
+    assert all(snapshot is results[0] for snapshot in results)
+    assert client.get("/health/metrics").json()["portfolio_builds"]["coalesced"] == before + 4
+
+
+def test_stale_snapshot_is_served_while_refreshing(monkeypatch) -> None:
+    dummy_contract = _DummyContract(10**18, 10**18, 10**18, 10**18)
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: dummy_contract)
+    monkeypatch.setattr(portfolio_snapshots, "fresh", 0.0)
+    address = f"0x{token_hex(20)}"
+
+    async def serve_stale_then_refresh():
+        async with AsyncSession(async_engine) as session:
+            first = await portfolio_snapshot(session, address)
+            dummy_contract.delay = 0.2
+            started = time.perf_counter()
+            stale = await portfolio_snapshot(session, address)
+            waited = time.perf_counter() - started
+            await asyncio.sleep(0.3)
+            # Fresh again, so this lookup starts no refresh that would outlive the loop.
+            portfolio_snapshots.fresh = 60.0
+            refreshed = await portfolio_snapshot(session, address)
+        return first, stale, waited, refreshed
+
+    first, stale, waited, refreshed = asyncio.run(serve_stale_then_refresh())
+    assert stale is first
+    assert waited < 0.1
+    assert refreshed is not first
+    assert portfolio_snapshots.snapshot()["refreshes"] >= 1
+
+
+def test_snapshot_store_rejects_only_builds_of_invalidated_addresses() -> None:
+    store = SnapshotStore(maxsize=2, fresh=60, stale=60)
+    snapshot = PortfolioSnapshot('"built"', (), {})
+
+    version = store.version()
+    store.invalidate(["0xb"])
+    store.store(("0xa", False), snapshot, version)
+    store.store(("0xb", False), snapshot, version)
+    assert store.lookup(("0xa", False), ()) == (snapshot, False)
+    assert store.lookup(("0xb", False), ()) == (None, False)
+
+    # Once an invalidation is forgotten, older builds are dropped for every address.
+    version = store.version()
+    store.invalidate(["0xc", "0xd", "0xe"])
+    store.store(("0xf", False), snapshot, version)
+    assert store.lookup(("0xf", False), ()) == (None, False)
+
+
+def test_logged_activity_invalidates_snapshot(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: None)
+    address = f"0x{token_hex(20)}"
+
+    response = client.get(f"/portfolio/{address}")
+    assert response.json()["history"] == []
+    assert response.headers["Age"] == "0"
+    assert client.get(f"/portfolio/{address}").headers["ETag"] == response.headers["ETag"]
+
+    client.post("/tx/deposit", json={"address": address, "amount": 7, "vault": "SynthVault"})
+    assert client.get(f"/portfolio/{address}").json()["history"][0]["amount"] == 7
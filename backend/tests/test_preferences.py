@@ -2,8 +2,14 @@
 from secrets import token_hex
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
 
+from app.core.config import get_settings
+from app.core.db import engine
 from app.main import app
+from app.schemas.preferences import RiskPreferencePayload
+from app.services.preferences_service import preference_cache, upsert_preference, upsert_preferences
 
 client = TestClient(app)
 
@@ -36,4 +42,75 @@ def test_preferences_lifecycle() -> None:
     fetched_data = fetched.json()
     assert fetched_data["risk_level"] == "high"
     assert fetched_data["risk_score"] == 9
-    assert fetched_data["horizon_months"] == 18
+    assert fetched_data["horizon_months"] == 18
+
+
+def test_bulk_upsert_inserts_and_updates_in_one_statement() -> None:
+    existing, fresh = new_address(), new_address()
+    low = RiskPreferencePayload(risk_level="low", risk_score=2, horizon_months=6)
+    high = RiskPreferencePayload(risk_level="high", risk_score=9, horizon_months=24)
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    with Session(engine) as session:
+        upsert_preference(session, existing, low)
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            records = upsert_preferences(session, {fresh: low, existing: high})
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+    # The upsert's RETURNING is all it reads, and the records outlive the session.
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+    assert [record.address for record in records] == [fresh, existing]
+    assert records[1].risk_level == "high"
+
+    data = client.get(f"/preferences/{existing}").json()
+    assert data["risk_score"] == 9
+    assert data["horizon_months"] == 24
+    assert client.get(f"/preferences/{fresh}").json()["risk_level"] == "low"
+
+
+def test_preference_reads_are_cached_until_upsert() -> None:
+    address = new_address()
+    payload = {"risk_level": "medium", "risk_score": 5, "horizon_months": 12}
+    client.put(f"/preferences/{address}", json=payload)
+
+    before = preference_cache.snapshot()
+    assert client.get(f"/preferences/{address}").json()["risk_score"] == 5
+    assert client.get(f"/preferences/{address}").json()["risk_score"] == 5
+    after = preference_cache.snapshot()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    client.put(f"/preferences/{address}", json={**payload, "risk_score": 7})
+    assert client.get(f"/preferences/{address}").json()["risk_score"] == 7
+
+
+def test_preference_etag_changes_on_update() -> None:
+    address = new_address()
+    payload = {"risk_level": "low", "risk_score": 2, "horizon_months": 12, "stablecoin_preference": "USDC"}
+    etag = client.put(f"/preferences/{address}", json=payload).headers["ETag"]
+
+    assert client.get(f"/preferences/{address}").headers["ETag"] == etag
+    cached = client.get(f"/preferences/{address}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert not cached.content
+
+    client.put(f"/preferences/{address}", json={**payload, "risk_score": 3})
+    updated = client.get(f"/preferences/{address}", headers={"If-None-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+    assert updated.json()["risk_score"] == 3
+
+
+def test_fast_serialization_matches_response_model(monkeypatch) -> None:
+    address = new_address()
+    payload = {"risk_level": "medium", "risk_score": 5, "horizon_months": 24, "stablecoin_preference": "DAI"}
+    expected = client.put(f"/preferences/{address}", json=payload).json()
+
+    monkeypatch.setattr(get_settings(), "fast_serialization", True)
+    assert client.get(f"/preferences/{address}").json() == expected
+    assert client.put(f"/preferences/{address}", json=payload).json().keys() == expected.keys()
@@ -0,0 +1,184 @@
+"""Portfolio push hub, WebSocket channel and vault watcher tests."""
+import asyncio
+import http.client
+import json
+import signal
+import threading
+import time
+from secrets import token_hex
+
+import uvicorn
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import get_settings
+from app.core.db import async_engine
+from app.core.vault_client import VaultState, vault_state_cache
+from app.main import app
+from app.models.positions import IndexerCheckpoint, ShareBalance
+from app.services.indexer_service import CHECKPOINT_NAME
+from app.services.push_service import PushHub, encode, publish_activity, push_hub
+from app.services.vault_watcher_service import VaultWatcher
+
+client = TestClient(app)
+
+
+def test_hub_fans_out_and_bounds_slow_subscribers() -> None:
+    async def scenario():
+        hub = PushHub(queue_size=2, max_subscribers=10)
+        first, second = hub.subscribe("0xa"), hub.subscribe("0xa")
+        other = hub.subscribe("0xb")
+        for index in range(3):
+            hub.publish("0xa", encode("activity", {"index": index}))
+        received = [await first.next(0.1), await first.next(0.1)]
+        hub.close()
+        closed = await other.next(0.1)
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        return received, closed, hub.snapshot()
+
+    received, closed, snapshot = asyncio.run(scenario())
+    assert [json.loads(message.data)["index"] for message in received] == [1, 2]
+    assert received[0].sse == 'event: activity\ndata: {"index":1}\n\n'
+    assert json.loads(received[0].websocket) == {"event": "activity", "data": {"index": 1}}
+    assert closed is None
+    assert snapshot == {"addresses": 1, "subscribers": 1, "published": 3, "delivered": 6, "dropped": 3}
+
+
+def test_websocket_receives_portfolio_then_activity(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: None)
+    address = f"0x{token_hex(20)}"
+
+    with client.websocket_connect(f"/portfolio/{address}/ws") as websocket:
+        initial = websocket.receive_json()
+        assert initial["event"] == "portfolio"
+        assert initial["data"]["owner"] == address
+
+        # Binary frames are ignored like text ones.
+        websocket.send_bytes(b"ping")
+        client.post("/tx/deposit", json={"address": address, "amount": 9, "vault": "SynthVault", "tx_hash": "0x99"})
+        update = websocket.receive_json()
+        assert update["event"] == "activity"
+        assert update["data"]["items"][0]["amount"] == 9
+        assert update["data"]["items"][0]["tx_hash"] == "0x99"
+    assert not push_hub.has_subscribers(address)
+
+
+def test_watcher_pushes_positions_when_share_price_moves(monkeypatch) -> None:
+    address = f"0x{token_hex(20)}"
+    prices = iter([(10**18, 10**18, 1), (2 * 10**18, 10**18, 2)])
+
+    async def vault_state(*_):
+        total_assets, total_supply, block = next(prices)
+        return VaultState(block, total_assets, total_supply, 0, False)
+
+    async def shares(_self, addresses, _state):
+        return {address: 3 * 10**18 for address in addresses}
+
+    monkeypatch.setattr("app.services.vault_watcher_service.get_vault_state_async", vault_state)
+    monkeypatch.setattr(VaultWatcher, "_shares", shares)
+
+    async def scenario():
+        subscription = push_hub.subscribe(address)
+        try:
+            watcher = VaultWatcher(async_engine)
+            counts = [await watcher.poll_once(), await watcher.poll_once()]
+            return counts, await subscription.next(0.1)
+        finally:
+            push_hub.unsubscribe(subscription)
+
+    counts, message = asyncio.run(scenario())
+    vault_state_cache.clear()
+    assert counts == [0, 1]
+    assert message.event == "positions"
+    payload = json.loads(message.data)
+    assert payload["block"] == 2
+    assert payload["total_value"] == 6.0
+    assert payload["positions"][0]["shares"] == 3.0
+
+
+def test_watcher_revalues_addresses_with_new_activity(monkeypatch) -> None:
+    address = f"0x{token_hex(20)}"
+
+    async def vault_state(*_):
+        return VaultState(5, 10**18, 10**18, 0, False)
+
+    async def shares(_self, addresses, _state):
+        return {address: 2 * 10**18 for address in addresses}
+
+    monkeypatch.setattr("app.services.vault_watcher_service.get_vault_state_async", vault_state)
+    monkeypatch.setattr(VaultWatcher, "_shares", shares)
+
+    async def scenario():
+        subscription = push_hub.subscribe(address)
+        try:
+            watcher = VaultWatcher(async_engine)
+            idle = await watcher.poll_once()
+            publish_activity([{"address": address, "tx_type": "deposit", "amount": 2.0}])
+            counts = [idle, await watcher.poll_once(), await watcher.poll_once()]
+            return counts, [await subscription.next(0.1), await subscription.next(0.1)]
+        finally:
+            push_hub.unsubscribe(subscription)
+
+    counts, messages = asyncio.run(scenario())
+    vault_state_cache.clear()
+    assert counts == [0, 1, 0]
+    assert [message.event for message in messages] == ["activity", "positions"]
+    assert json.loads(messages[1].data)["total_value"] == 2.0
+
+
+def test_exit_signal_ends_open_event_streams(monkeypatch) -> None:
+    monkeypatch.setattr("app.services.portfolio_service.get_async_vault_contract", lambda: None)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    received: list[str] = []
+    signals: list[int] = []
+
+    def stream() -> None:
+        while not server.started:
+            time.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        connection.request("GET", f"/portfolio/0x{token_hex(20)}/events")
+        response = connection.getresponse()
+        received.append(response.readline().decode())
+        signal.raise_signal(signal.SIGTERM)
+        received.append(response.read().decode())
+
+    # uvicorn re-raises the signal once it has exited; keep it from ending the test run.
+    previous = signal.signal(signal.SIGTERM, lambda signum, _frame: signals.append(signum))
+    try:
+        client_thread = threading.Thread(target=stream)
+        client_thread.start()
+        asyncio.run(asyncio.wait_for(server.serve(), 10))
+        client_thread.join(5)
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+    assert received[0] == "event: portfolio\n"
+    assert not client_thread.is_alive()
+    assert signals == [signal.SIGTERM]
+
+
+def test_watcher_reads_the_index_only_when_caught_up(monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "indexer_enabled", True)
+    monkeypatch.setattr(get_settings(), "indexer_max_lag", 2)
+    monkeypatch.setattr("app.services.vault_watcher_service.get_async_vault_contract", lambda: None)
+    address = f"0x{token_hex(20)}"
+
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with engine.begin() as connection:
+            await connection.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(ShareBalance(address=address, shares=str(10**18), updated_block=10))
+            session.add(IndexerCheckpoint(name=CHECKPOINT_NAME, block_number=10, block_hash=""))
+            await session.commit()
+        watcher = VaultWatcher(engine)
+        return [
+            await watcher._shares([address], VaultState(block, 10**18, 10**18, 0, False)) for block in (12, 13)
+        ]
+
+    # At block 13 the index is too far behind; without a contract the chain read finds nothing.
+    assert asyncio.run(scenario()) == [{address: 10**18}, {}]
@@ -0,0 +1,114 @@
+"""Rebalancing job tests."""
+from datetime import UTC, datetime
+
+import numpy as np
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.config import get_settings
+from app.core.vault_client import VaultState
+from app.models.positions import IndexerCheckpoint, ShareBalance
+from app.models.preferences import RiskPreference
+from app.models.rebalance import RebalanceRecommendation
+from app.services import rebalance_service
+from app.services.indexer_service import CHECKPOINT_NAME
+from app.services.rebalance_service import (
+    IndexLagging,
+    IndexPositionSource,
+    PlanTargets,
+    Rebalancer,
+    allocation_drift,
+)
+
+CONSERVATIVE = "0x" + "01" * 20
+GROWTH = "0x" + "02" * 20
+UNFUNDED = "0x" + "03" * 20
+REMOVED = "0x" + "04" * 20
+
+
+class _StaticSource:
+    def __init__(self, shares: dict[str, int]) -> None:
+        self._shares = shares
+
+    def shares(self, addresses):
+        return {address: self._shares[address] for address in addresses if address in self._shares}
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for address, level in ((CONSERVATIVE, "low"), (GROWTH, "high"), (UNFUNDED, "medium")):
+            session.add(RiskPreference(address=address, risk_level=level, risk_score=5, horizon_months=12))
+        session.add(
+            RebalanceRecommendation(
+                address=REMOVED,
+                plan="Balanced",
+                drift=0.9,
+                strategy="Stable Yield Vault",
+                strategy_delta=0.5,
+                total_value=1.0,
+                created_at=datetime(2020, 1, 1, tzinfo=UTC),
+            )
+        )
+        session.commit()
+    return engine
+
+
+def test_allocation_drift_is_half_the_l1_gap() -> None:
+    targets = np.array([[0.5, 0.5, 0.0], [0.0, 0.2, 0.8]])
+    holdings = np.array([[10.0, 0.0, 0.0], [0.0, 1.0, 4.0]])
+    drift, worst, delta = allocation_drift(holdings, targets, np.array([0, 1]))
+    assert drift.tolist() == pytest.approx([0.5, 0.0])
+    assert worst[0] in (0, 1)
+    assert abs(delta[0]) == pytest.approx(0.5)
+
+
+def test_rebalancer_flags_drifted_wallets_and_clears_stale_rows(engine, monkeypatch) -> None:
+    mix = {"Stable Yield Vault": 0.5, "Liquidity Buffer": 0.5}
+    monkeypatch.setitem(rebalance_service.VAULT_STRATEGIES, "SynthVault", mix)
+    source = _StaticSource({CONSERVATIVE: 10**18, GROWTH: 5 * 10**18})
+    stats = Rebalancer(source, engine, state=None, threshold=0.5, workers=2, chunk_size=1).run()
+
+    assert (stats.addresses, stats.funded, stats.flagged) == (3, 2, 1)
+    with Session(engine) as session:
+        rows = session.exec(select(RebalanceRecommendation)).all()
+    assert [row.address for row in rows] == [GROWTH]
+    growth = rows[0]
+    assert growth.plan == "Growth"
+    assert growth.drift == pytest.approx(1.0)
+    assert growth.strategy == "Stable Yield Vault"
+    assert growth.strategy_delta == pytest.approx(0.5)
+    assert growth.total_value == pytest.approx(5.0)
+
+    # Targets are the allocations /plan serves, stablecoin haircut included.
+    targets = PlanTargets.from_library()
+    conservative = targets.weights[targets.by_risk_level["low"]]
+    assert conservative[targets.strategies.index("Stable Yield Vault")] == pytest.approx(0.66 / 0.96)
+
+
+def test_rebalancer_does_not_score_single_strategy_exposure(engine) -> None:
+    source = _StaticSource({CONSERVATIVE: 10**18, GROWTH: 5 * 10**18})
+    stats = Rebalancer(source, engine, state=None, threshold=0.5).run()
+
+    assert (stats.funded, stats.single_strategy, stats.flagged) == (2, 2, 0)
+    with Session(engine) as session:
+        assert session.exec(select(RebalanceRecommendation)).all() == []
+
+
+def test_index_source_refuses_a_lagging_index(engine, monkeypatch) -> None:
+    monkeypatch.setattr(get_settings(), "indexer_max_lag", 2)
+    with Session(engine) as session:
+        session.add(ShareBalance(address=GROWTH, shares=str(10**18), updated_block=10))
+        session.add(IndexerCheckpoint(name=CHECKPOINT_NAME, block_number=10, block_hash=""))
+        session.commit()
+
+    caught_up = IndexPositionSource(engine, VaultState(12, 1, 1, 0, False))
+    assert caught_up.current()
+    assert caught_up.shares([GROWTH, CONSERVATIVE]) == {GROWTH: 10**18}
+    lagging = IndexPositionSource(engine, VaultState(13, 1, 1, 0, False))
+    assert not lagging.current()
+    with pytest.raises(IndexLagging):
+        lagging.shares([GROWTH])
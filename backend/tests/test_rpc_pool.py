@@ -0,0 +1,109 @@
+"""RPC pool routing and hedging tests."""
+import asyncio
+import time
+from secrets import token_hex
+
+import pytest
+
+from app.core.rpc_pool import PooledAsyncProvider, PooledHTTPProvider, endpoint_stats
+
+
+class _AsyncEndpoint:
+    def __init__(self, delay: float, fail: bool = False):
+        self.endpoint_uri = f"https://{token_hex(4)}.rpc"
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def make_request(self, method, params):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("endpoint down")
+        return {"jsonrpc": "2.0", "id": 1, "result": self.endpoint_uri}
+
+
+class _SyncEndpoint(_AsyncEndpoint):
+    def make_request(self, method, params):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("endpoint down")
+        return {"jsonrpc": "2.0", "id": 1, "result": self.endpoint_uri}
+
+
+def test_slow_read_is_hedged_to_second_endpoint() -> None:
+    slow, fast = _AsyncEndpoint(delay=1.0), _AsyncEndpoint(delay=0.01)
+    pool = PooledAsyncProvider([slow, fast], penalty_ms=6000, default_hedge_delay=0.05)
+
+    started = time.perf_counter()
+    response = asyncio.run(pool.make_request("eth_call", []))
+
+    assert response["result"] == fast.endpoint_uri
+    assert time.perf_counter() - started < 0.5
+    assert endpoint_stats(fast.endpoint_uri).hedge_wins == 1
+
+
+def test_reads_route_to_lowest_latency_endpoint() -> None:
+    slow, fast = _AsyncEndpoint(delay=0.03), _AsyncEndpoint(delay=0.001)
+    pool = PooledAsyncProvider([slow, fast], penalty_ms=6000, default_hedge_delay=1.0)
+
+    async def warm_up() -> None:
+        for _ in range(3):
+            await pool.make_request("eth_blockNumber", [])
+
+    asyncio.run(warm_up())
+    slow_calls = slow.calls
+    asyncio.run(pool.make_request("eth_call", []))
+    assert slow.calls == slow_calls
+
+
+def test_writes_are_never_hedged() -> None:
+    slow, fast = _AsyncEndpoint(delay=0.2), _AsyncEndpoint(delay=0.0)
+    pool = PooledAsyncProvider([slow, fast], penalty_ms=6000, default_hedge_delay=0.01)
+    asyncio.run(pool.make_request("eth_sendRawTransaction", ["0x"]))
+    assert slow.calls + fast.calls == 1
+
+
+def test_sync_pool_fails_over_and_records_errors() -> None:
+    broken, healthy = _SyncEndpoint(0, fail=True), _SyncEndpoint(0)
+    pool = PooledHTTPProvider([broken, healthy], penalty_ms=6000)
+
+    assert pool.make_request("eth_call", [])["result"] == healthy.endpoint_uri
+    assert endpoint_stats(broken.endpoint_uri).errors == 1
+    assert pool.make_request("eth_call", [])["result"] == healthy.endpoint_uri
+    assert broken.calls == 1
+
+    with pytest.raises(ConnectionError):
+        PooledHTTPProvider([_SyncEndpoint(0, fail=True)], penalty_ms=1).make_request("eth_call", [])
+
+
+def test_demoted_endpoint_is_retried_after_idling(monkeypatch) -> None:
+    broken, healthy = _SyncEndpoint(0), _SyncEndpoint(0)
+    pool = PooledHTTPProvider([broken, healthy], penalty_ms=6000)
+    clock = [time.monotonic()]
+    monkeypatch.setattr("app.core.rpc_pool.time.monotonic", lambda: clock[0])
+    endpoint_stats(broken.endpoint_uri).fail(6000)
+    endpoint_stats(healthy.endpoint_uri).observe(50)
+
+    pool.make_request("eth_call", [])
+    assert broken.calls == 0
+
+    # The healthy node keeps serving while the broken one's penalty fades.
+    clock[0] += 300
+    endpoint_stats(healthy.endpoint_uri).observe(50)
+    pool.make_request("eth_call", [])
+    assert broken.calls == 1
+    # Its first fresh measurement replaces the stale penalty.
+    assert endpoint_stats(broken.endpoint_uri).ewma_ms < 6000
+
+
+def test_async_reads_fail_over_past_the_second_endpoint() -> None:
+    first, second = _AsyncEndpoint(delay=0.001, fail=True), _AsyncEndpoint(delay=0.001, fail=True)
+    third = _AsyncEndpoint(delay=0.001)
+    pool = PooledAsyncProvider([first, second, third], penalty_ms=6000, default_hedge_delay=1.0)
+
+    response = asyncio.run(pool.make_request("eth_call", []))
+
+    assert response["result"] == third.endpoint_uri
+    assert (first.calls, second.calls, third.calls) == (1, 1, 1)
+    assert endpoint_stats(second.endpoint_uri).errors == 1
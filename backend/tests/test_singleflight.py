@@ -0,0 +1,61 @@
+"""Single-flight coalescing tests."""
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation() -> None:
+    flight = SingleFlight()
+    calls = []
+
+    async def compute() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run() -> list:
+        return await asyncio.gather(*(flight.do("key", compute) for _ in range(5)), flight.do("other", compute))
+
+    assert asyncio.run(run()) == [42] * 6
+    assert len(calls) == 2
+    assert flight.snapshot() == {"in_flight": 0, "peak_in_flight": 2, "executed": 2, "coalesced": 4}
+
+
+def test_errors_are_shared_and_not_kept() -> None:
+    flight = SingleFlight()
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("rpc down")
+
+    async def succeed() -> int:
+        return 1
+
+    async def run() -> list:
+        return await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert asyncio.run(flight.do("key", succeed)) == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_computation() -> None:
+    flight = SingleFlight()
+
+    async def compute() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run() -> str:
+        first = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
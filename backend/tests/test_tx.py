@@ -0,0 +1,52 @@
+"""Transaction endpoint tests."""
+from secrets import token_hex
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_batch_flags_duplicates_within_the_batch_only() -> None:
+    address = f"0x{token_hex(20)}"
+    logged_hash = f"0x{token_hex(32)}"
+    assert client.post(
+        "/tx/deposit", json={"address": address, "amount": "1", "tx_hash": logged_hash}
+    ).status_code == 200
+
+    repeated_hash = f"0x{token_hex(32)}"
+    items = [
+        {"address": address, "amount": "2", "type": "deposit", "tx_hash": logged_hash},
+        {"address": address, "amount": "3", "type": "deposit", "tx_hash": repeated_hash},
+        {"address": address, "amount": "3", "type": "deposit", "tx_hash": repeated_hash},
+        {"address": address, "amount": "4", "type": "withdraw", "tx_hash": repeated_hash},
+        {"address": address, "amount": "5", "type": "withdraw"},
+    ]
+    response = client.post("/tx/batch", json={"items": items})
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data["items"]] == ["logged", "logged", "duplicate", "logged", "logged"]
+    assert data["logged"] == 4
+    assert data["duplicates"] == 1
+
+    history = client.get(f"/portfolio/{address}/history").json()["items"]
+    assert len(history) == 5
+
+
+def test_batch_rejects_invalid_items_as_a_whole() -> None:
+    address = f"0x{token_hex(20)}"
+    items = [
+        {"address": address, "amount": "1", "type": "deposit"},
+        {"address": address, "amount": "-1", "type": "deposit"},
+    ]
+    assert client.post("/tx/batch", json={"items": items}).status_code == 422
+    assert client.get(f"/portfolio/{address}/history").json()["items"] == []
+
+
+def test_single_deposits_are_all_kept() -> None:
+    address = f"0x{token_hex(20)}"
+    payload = {"address": address, "amount": "1", "tx_hash": f"0x{token_hex(32)}"}
+    for _ in range(2):
+        assert client.post("/tx/deposit", json=payload).json()["status"] == "logged"
+    assert len(client.get(f"/portfolio/{address}/history").json()["items"]) == 2
@@ -0,0 +1,40 @@
+"""Vault endpoint tests."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.vault_client import VaultState, vault_state_cache
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _reset_vault_state() -> None:
+    vault_state_cache.clear()
+
+
+def test_vault_stats_served_from_cache() -> None:
+    vault_state_cache.store(
+        VaultState(block_number=10, total_assets=3 * 10**18, total_supply=2 * 10**18, deposit_cap=10**21, paused=False)
+    )
+    response = client.get("/vault/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["block_number"] == 10
+    assert data["tvl"] == 3.0
+    assert data["share_price"] == 1.5
+    assert data["deposit_cap"] == 1000.0
+    assert data["paused"] is False
+
+
+def test_vault_state_cache_ignores_older_blocks() -> None:
+    vault_state_cache.store(VaultState(block_number=10, total_assets=1, total_supply=1, deposit_cap=1, paused=False))
+    vault_state_cache.store(VaultState(block_number=9, total_assets=2, total_supply=1, deposit_cap=1, paused=False))
+    assert vault_state_cache.peek().block_number == 10
+    assert vault_state_cache.peek(min_block=11) is None
+
+
+def test_vault_stats_unavailable_without_contract(monkeypatch) -> None:
+    monkeypatch.setattr("app.core.vault_client.get_async_vault_contract", lambda: None)
+    response = client.get("/vault/stats")
+    assert response.status_code == 503
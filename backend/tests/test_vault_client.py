@@ -0,0 +1,85 @@
+"""Vault client batching tests."""
+import asyncio
+from typing import Any
+
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from app.core.vault_client import VaultStateCache, _load_abi, aggregate, get_multicall_contract
+
+VAULT = "0x1111111111111111111111111111111111111111"
+OWNER = "0x2222222222222222222222222222222222222222"
+
+
+class _MulticallProvider(BaseProvider):
+    """Answers Multicall3 ``aggregate3`` calls from a selector -> value table."""
+
+    def __init__(self, responses: dict[str, int], block_number: int = 42):
+        self.responses = responses
+        self.block_number = block_number
+        self.requests: list[str] = []
+        self._codec = Web3().codec
+
+    def make_request(self, method: str, params: Any) -> dict[str, Any]:
+        self.requests.append(method)
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": "0xaa36a7"}
+        if method != "eth_call":
+            raise NotImplementedError(method)
+        data = bytes.fromhex(params[0]["data"][2:])
+        (calls,) = self._codec.decode(["(address,bool,bytes)[]"], data[4:])
+        results = []
+        for _, _, call_data in calls:
+            selector = "0x" + call_data[:4].hex()
+            value = self.block_number if selector not in self.responses else self.responses[selector]
+            results.append((True, self._codec.encode(["uint256"], [value])))
+        encoded = self._codec.encode(["(bool,bytes)[]"], [results])
+        return {"jsonrpc": "2.0", "id": 1, "result": "0x" + encoded.hex()}
+
+
+def _selector(signature: str) -> str:
+    return Web3.keccak(text=signature)[:4].hex()
+
+
+def test_aggregate_packs_reads_into_single_call() -> None:
+    provider = _MulticallProvider(
+        {
+            _selector("balanceOf(address)"): 7,
+            _selector("totalAssets()"): 11,
+            _selector("totalSupply()"): 13,
+        }
+    )
+    w3 = Web3(provider)
+    contract = w3.eth.contract(address=Web3.to_checksum_address(VAULT), abi=_load_abi())
+
+    result = aggregate(
+        [
+            contract.functions.balanceOf(Web3.to_checksum_address(OWNER)),
+            contract.functions.totalAssets(),
+            contract.functions.totalSupply(),
+        ]
+    )
+
+    assert result.values == [7, 11, 13]
+    assert result.block_number == 42
+    assert provider.requests.count("eth_call") == 1
+    assert get_multicall_contract(w3) is not None
+
+
+def test_state_cache_lock_is_per_event_loop() -> None:
+    cache = VaultStateCache()
+
+    async def hold() -> asyncio.Lock:
+        lock = cache.async_lock
+        assert cache.async_lock is lock
+        async with lock:
+            # Contention binds the lock to this loop.
+            waiter = asyncio.ensure_future(lock.acquire())
+            await asyncio.sleep(0)
+        await waiter
+        lock.release()
+        return lock
+
+    first = asyncio.run(hold())
+    second = asyncio.run(hold())
+    assert first is not second
@@ -0,0 +1,102 @@
+"""Write-behind transaction log queue tests."""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, func, select
+
+from app.models.tx import TransactionLog
+from app.services import write_behind_service
+from app.services.snapshot_service import PortfolioSnapshot, portfolio_snapshots
+from app.services.write_behind_service import WriteBehindFull, WriteBehindQueue
+
+
+def _row(index: int) -> dict:
+    return {
+        "address": "0x" + "d4" * 20,
+        "tx_type": "deposit",
+        "amount": 1.0,
+        "vault": "SynthVault",
+        "tx_hash": f"0x{index:064x}",
+    }
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    return engine
+
+
+async def _row_count(engine) -> int:
+    async with engine.connect() as connection:
+        return (await connection.execute(select(func.count()).select_from(TransactionLog))).scalar_one()
+
+
+def test_write_behind_group_commits_and_drains_on_stop() -> None:
+    address = _row(0)["address"]
+    stale = PortfolioSnapshot('"stale"', (None, None), {})
+    portfolio_snapshots.store((address, False), stale, portfolio_snapshots.version())
+
+    async def scenario() -> tuple[int, dict]:
+        engine = await _engine()
+        queue = WriteBehindQueue(engine, max_size=100, batch_size=4, flush_interval=0.01)
+        queue.start()
+        for index in range(10):
+            await queue.submit(_row(index))
+        await asyncio.sleep(0.05)
+        await queue.submit(_row(10))
+        await queue.stop()
+        return await _row_count(engine), queue.snapshot()
+
+    rows, snapshot = asyncio.run(scenario())
+    assert rows == 11
+    assert snapshot["rows"] == 11
+    assert snapshot["flushes"] <= 5
+    assert snapshot["depth"] == 0
+    assert portfolio_snapshots.lookup((address, False), (None, None)) == (None, False)
+
+
+def test_write_behind_applies_backpressure_when_full() -> None:
+    async def scenario() -> dict:
+        engine = await _engine()
+        queue = WriteBehindQueue(engine, max_size=2, enqueue_timeout=0.01)
+        await queue.submit(_row(0))
+        await queue.submit(_row(1))
+        with pytest.raises(WriteBehindFull):
+            await queue.submit(_row(2))
+        await queue.stop()
+        assert await _row_count(engine) == 2
+        return queue.snapshot()
+
+    assert asyncio.run(scenario())["rejected"] == 1
+
+
+def test_write_behind_keeps_failed_rows_and_spills_them_at_shutdown(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(write_behind_service, "FLUSH_RETRY_SECONDS", 0.01)
+    spill_path = tmp_path / "spill.jsonl"
+
+    async def scenario() -> tuple[dict, int, dict]:
+        # No tables yet, so every flush fails.
+        broken = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        queue = WriteBehindQueue(broken, batch_size=2, flush_interval=0.01, spill_path=spill_path)
+        queue.start()
+        for index in range(5):
+            await queue.submit(_row(index))
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+        engine = await _engine()
+        recovered = WriteBehindQueue(engine, flush_interval=0.01, spill_path=spill_path)
+        recovered.start()
+        await asyncio.sleep(0.05)
+        await recovered.stop()
+        return queue.snapshot(), await _row_count(engine), recovered.snapshot()
+
+    failed, rows, recovered = asyncio.run(scenario())
+    assert failed["failures"] > 3
+    assert failed["spilled"] == 5
+    assert rows == 5
+    assert recovered["recovered"] == 5
+    assert not spill_path.exists()